@@ -1,10 +1,21 @@
+import functools
+import multiprocessing
+import os
+import tempfile
+import threading
 import unittest
 
 from tictactoe import TicTacToe
 from tictactoe.player.ai.easy import EasyAIPlayer
+from tictactoe.player.ai.mcts import MCTSAIPlayer
 from tictactoe.player.ai.medium import MediumAIPlayer
 from tictactoe.player.ai.hard import HardAIPlayer
+from tictactoe.player.ai.iterative import IterativeDeepeningAIPlayer
+from tictactoe.player.ai.negamax import NegamaxAIPlayer
+from tictactoe.player.ai.table import TableAIPlayer
+from tictactoe.player.ai.table import build_table
 from tictactoe.player.manual import ManualPlayer
+from tictactoe.search import SearchCancelled
 
 
 class TestAIs(unittest.TestCase):
@@ -110,3 +121,244 @@ class TestAIs(unittest.TestCase):
         grid = self._tic_tac_toe.grid
         ai = self._tic_tac_toe.players[1]
         self.assertEqual(ai.get_move(grid), (1, 2))
+    
+    def test_negamax_picks_self_winning_move_if_available(self):
+        self._tic_tac_toe.add_player(NegamaxAIPlayer, "O", "AI")
+
+        # Set up for both players to be able to win
+        self._tic_tac_toe.place(0, 0)
+        self._tic_tac_toe.place(1, 0)
+        self._tic_tac_toe.place(0, 1)
+        self._tic_tac_toe.place(1, 1)
+
+        # Place X in the bottom-right corner to keep it out of the way
+        self._tic_tac_toe.place(2, 2)
+
+        grid = self._tic_tac_toe.grid
+        ai = self._tic_tac_toe.players[1]
+        self.assertEqual(ai.get_move(grid), (1, 2))
+    
+    def test_negamax_picks_opponent_winning_move_if_available(self):
+        self._tic_tac_toe.add_player(NegamaxAIPlayer, "O", "AI")
+
+        self._tic_tac_toe.place(0, 0)
+        self._tic_tac_toe.place(1, 1)
+        self._tic_tac_toe.place(0, 1)
+
+        grid = self._tic_tac_toe.grid
+        ai = self._tic_tac_toe.players[1]
+        self.assertEqual(ai.get_move(grid), (0, 2))
+    
+    def test_negamax_never_loses_as_first_player(self):
+        self._assert_never_loses([NegamaxAIPlayer, ManualPlayer], 0)
+    
+    def test_negamax_never_loses_as_second_player(self):
+        self._assert_never_loses([ManualPlayer, NegamaxAIPlayer], 1)
+    
+    def test_negamax_stops_when_cancelled(self):
+        self._tic_tac_toe.add_player(NegamaxAIPlayer, "O", "AI", verbose=False)
+        ai = self._tic_tac_toe.players[1]
+        self._tic_tac_toe.place(0, 0)
+
+        cancel = threading.Event()
+        cancel.set()
+        with self.assertRaises(SearchCancelled):
+            ai.get_move(self._tic_tac_toe.grid, cancel=cancel)
+
+        # A later search without the event runs as usual
+        self.assertEqual(ai.get_move(self._tic_tac_toe.grid), (1, 1))
+    
+    def test_negamax_rejects_zero_radius(self):
+        self._tic_tac_toe.add_player(NegamaxAIPlayer, "O", "AI", radius=0, verbose=False)
+        self._tic_tac_toe.place(0, 0)
+        with self.assertRaisesRegex(Exception, "Radius must be at least 1"):
+            self._tic_tac_toe.players[1].get_move(self._tic_tac_toe.grid)
+    
+    def test_negamax_counts_nodes_and_cache_hits(self):
+        self._tic_tac_toe.add_player(NegamaxAIPlayer, "O", "AI")
+        ai = self._tic_tac_toe.players[1]
+
+        self._tic_tac_toe.place(0, 0)
+        ai.get_move(self._tic_tac_toe.grid)
+        self.assertGreater(ai.nodes, 0)
+        self.assertGreater(ai.cache_hits, 0)
+    
+    def test_negamax_larger_grid_blocks_open_line(self):
+        tic_tac_toe = TicTacToe(9, 9, 4)
+        tic_tac_toe.add_player(ManualPlayer, "X", "John")
+        tic_tac_toe.add_player(NegamaxAIPlayer, "O", "AI", k=4)
+
+        # X has three in a row in the middle of the grid, and O must block it
+        tic_tac_toe.place(3, 4)
+        tic_tac_toe.place(0, 0)
+        tic_tac_toe.place(4, 4)
+        tic_tac_toe.place(8, 8)
+        tic_tac_toe.place(5, 4)
+
+        ai = tic_tac_toe.players[1]
+        self.assertIn(ai.get_move(tic_tac_toe.grid), [(2, 4), (6, 4)])
+    
+    def test_table_picks_opponent_winning_move_if_available(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "table.bin")
+            build_table(path)
+            self._tic_tac_toe.add_player(TableAIPlayer, "O", "AI", path=path)
+
+            self._tic_tac_toe.place(0, 0)
+            self._tic_tac_toe.place(1, 1)
+            self._tic_tac_toe.place(0, 1)
+
+            grid = self._tic_tac_toe.grid
+            ai = self._tic_tac_toe.players[1]
+            self.assertEqual(ai.get_move(grid), (0, 2))
+    
+    def test_table_never_loses(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "table.bin")
+            build_table(path)
+            table_player = functools.partial(TableAIPlayer, path=path)
+
+            self._assert_never_loses([table_player, ManualPlayer], 0)
+            self._assert_never_loses([ManualPlayer, table_player], 1)
+    
+    def test_table_unreachable_position(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "table.bin")
+            build_table(path)
+            self._tic_tac_toe.add_player(TableAIPlayer, "O", "AI", path=path)
+
+            # X has three in a row, so the game is already over
+            self._tic_tac_toe.place(0, 0)
+            self._tic_tac_toe.place(1, 1)
+            self._tic_tac_toe.place(0, 1)
+            self._tic_tac_toe.place(2, 2)
+            self._tic_tac_toe.place(0, 2)
+
+            grid = self._tic_tac_toe.grid
+            ai = self._tic_tac_toe.players[1]
+            with self.assertRaisesRegex(Exception, "not in the solution table"):
+                ai.get_move(grid)
+    
+    def test_table_rebuilt(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "table.bin")
+            build_table(path)
+            self._tic_tac_toe.add_player(TableAIPlayer, "O", "AI", path=path)
+
+            # A rebuilt table is mapped again rather than read from the cache
+            with open(path, "wb") as f:
+                f.write(b"\0")
+            os.utime(path, ns=(0, 0))
+            with self.assertRaises(Exception):
+                TableAIPlayer(1, "O", "AI", path=path)
+    
+    def test_table_missing(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            with self.assertRaises(Exception):
+                self._tic_tac_toe.add_player(TableAIPlayer, "O", "AI", path=os.path.join(tmp_dir, "table.bin"))
+    
+    def test_iterative_never_loses(self):
+        self._assert_never_loses([IterativeDeepeningAIPlayer, ManualPlayer], 0)
+        self._assert_never_loses([ManualPlayer, IterativeDeepeningAIPlayer], 1)
+    
+    def test_iterative_stays_within_time_budget(self):
+        tic_tac_toe = TicTacToe(15, 15, 5)
+        tic_tac_toe.add_player(ManualPlayer, "X", "John")
+        tic_tac_toe.add_player(IterativeDeepeningAIPlayer, "O", "AI", k=5, time_budget=0.2)
+
+        # X has three in a row with both ends open, and O must block it
+        tic_tac_toe.place(6, 7)
+        tic_tac_toe.place(0, 0)
+        tic_tac_toe.place(7, 7)
+        tic_tac_toe.place(14, 14)
+        tic_tac_toe.place(8, 7)
+
+        # A fake clock that moves on 10ms every time it is read
+        now = [0]
+
+        def clock():
+            now[0] += 0.01
+            return now[0]
+
+        ai = tic_tac_toe.players[1]
+        ai._get_search(15, 15).clock = clock
+        move = ai.get_move(tic_tac_toe.grid)
+        self.assertIn(move, [(5, 7), (9, 7)])
+        self.assertGreaterEqual(ai.depth, 1)
+        # The deadline was set at the first reading, 0.01, and the search
+        # stopped at the first clock check past it
+        self.assertGreaterEqual(now[0], 0.21 - 1e-9)
+        self.assertLessEqual(now[0], 0.22 + 1e-9)
+    
+    def test_mcts_picks_self_winning_move_if_available(self):
+        self._tic_tac_toe.add_player(MCTSAIPlayer, "O", "AI", seed=0)
+
+        # Set up for both players to be able to win
+        self._tic_tac_toe.place(0, 0)
+        self._tic_tac_toe.place(1, 0)
+        self._tic_tac_toe.place(0, 1)
+        self._tic_tac_toe.place(1, 1)
+
+        # Place X in the bottom-right corner to keep it out of the way
+        self._tic_tac_toe.place(2, 2)
+
+        grid = self._tic_tac_toe.grid
+        ai = self._tic_tac_toe.players[1]
+        self.assertEqual(ai.get_move(grid), (1, 2))
+    
+    def test_mcts_picks_opponent_winning_move_if_available(self):
+        self._tic_tac_toe.add_player(MCTSAIPlayer, "O", "AI", seed=0)
+
+        self._tic_tac_toe.place(0, 0)
+        self._tic_tac_toe.place(1, 1)
+        self._tic_tac_toe.place(0, 1)
+
+        grid = self._tic_tac_toe.grid
+        ai = self._tic_tac_toe.players[1]
+        self.assertEqual(ai.get_move(grid), (0, 2))
+    
+    def test_mcts_with_worker_processes(self):
+        self._tic_tac_toe.add_player(MCTSAIPlayer, "O", "AI", seed=0, workers=2)
+
+        self._tic_tac_toe.place(0, 0)
+        self._tic_tac_toe.place(1, 1)
+        self._tic_tac_toe.place(0, 1)
+
+        grid = self._tic_tac_toe.grid
+        with self._tic_tac_toe.players[1] as ai:
+            self.assertEqual(ai.get_move(grid), (0, 2))
+        # Leaving the with block shut the worker processes down
+        self.assertEqual(multiprocessing.active_children(), [])
+    
+    def _assert_never_loses(self, players, ai_idx, moves=()):
+        """
+        Plays every possible sequence of opponent moves against the AI and
+        checks the opponent never wins.
+
+        Arguments:
+            players (list): Player classes, in turn order.
+            ai_idx (int): Index of the AI in the players.
+            moves (tuple): Moves played so far.
+        """
+
+        tic_tac_toe = TicTacToe()
+        tic_tac_toe.add_player(players[0], "X", "Player 1")
+        tic_tac_toe.add_player(players[1], "O", "Player 2")
+        for move in moves:
+            tic_tac_toe.place(*move)
+
+        if tic_tac_toe.game_over:
+            winner = tic_tac_toe.winner
+            self.assertTrue(winner is None or winner is tic_tac_toe.players[ai_idx])
+            return
+
+        grid = tic_tac_toe.grid
+        if len(moves) % 2 == ai_idx:
+            move = tic_tac_toe.players[ai_idx].get_move(grid)
+            self._assert_never_loses(players, ai_idx, moves + (move,))
+            return
+
+        for y in range(len(grid)):
+            for x in range(len(grid[y])):
+                if not grid[y][x]:
+                    self._assert_never_loses(players, ai_idx, moves + ((x, y),))
@@ -0,0 +1,76 @@
+import json
+import os
+import random
+import tempfile
+import unittest
+
+from tictactoe import TicTacToe
+from tictactoe.analyze import Analyzer
+from tictactoe.analyze import analyze_stream
+from tictactoe.player.ai.table import build_table
+from tictactoe.player.manual import ManualPlayer
+
+
+class TestAnalyze(unittest.TestCase):
+
+    def test_matches_game(self):
+        analyzer = Analyzer()
+        rng = random.Random(0)
+
+        for _ in range(200):
+            tic_tac_toe = TicTacToe()
+            tic_tac_toe.add_player(ManualPlayer, "x", "Player 1")
+            tic_tac_toe.add_player(ManualPlayer, "o", "Player 2")
+            cells = rng.sample(range(9), 9)
+            for i in cells[:rng.randint(0, 9)]:
+                if tic_tac_toe.game_over:
+                    break
+                tic_tac_toe.place(i % 3, i // 3)
+
+            line = "".join(cell or "." for row in tic_tac_toe.grid for cell in row)
+            winner = tic_tac_toe.winner
+            self.assertEqual(json.loads(analyzer.analyze(line)), {
+                "winner": winner.letter if winner is not None else None,
+                "game_over": tic_tac_toe.game_over,
+            })
+
+    def test_formats(self):
+        analyzer = Analyzer(width=4, height=3, k=3)
+        self.assertEqual(json.loads(analyzer.analyze("XXX-OO------")),
+                         {"winner": "x", "game_over": True})
+        self.assertEqual(json.loads(analyzer.analyze("x.o/.x./o.x")),
+                         {"winner": "x", "game_over": True})
+        self.assertEqual(json.loads(analyzer.analyze('{"grid": [["X", "O", ""], ["", "", ""]]}')),
+                         {"winner": None, "game_over": False})
+
+    def test_invalid_positions(self):
+        analyzer = Analyzer()
+        for line in ["xxx", "xxxxo....", "xo?......", "xxxooo...", "xx./oo", '{"cells": []}']:
+            self.assertIn("error", json.loads(analyzer.analyze(line)), line)
+
+    def test_best_move(self):
+        analyzer = Analyzer(ai="negamax")
+        self.assertEqual(json.loads(analyzer.analyze("xx.oo....")),
+                         {"winner": None, "game_over": False, "move": [2, 0]})
+        self.assertEqual(json.loads(analyzer.analyze("xx.oo...x")),
+                         {"winner": None, "game_over": False, "move": [2, 1]})
+        self.assertIsNone(json.loads(analyzer.analyze("xxxoo....")).get("move"))
+
+    def test_ai_errors_fail_the_line(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, "table.bin")
+            build_table(path)
+            lines = ["xo.......", "x.../..../..../...o", "xo.......", "xo.x.o..."]
+            for workers in (1, 2):
+                results = [json.loads(result) for result in analyze_stream(
+                    lines, workers=workers, chunk_size=1, ai="table", options={"path": path})]
+                self.assertIn("move", results[0])
+                self.assertEqual(results[1], {"error": "Solution table only covers 3x3 grids"})
+                self.assertEqual(results[2], results[0])
+                self.assertIn("move", results[3])
+
+    def test_stream_keeps_order_across_workers(self):
+        lines = ["xxxoo....\n", "ooo.xx.xx\n", "\n", ".........\n", "xxx\n"] * 50
+        expected = list(analyze_stream(lines))
+        self.assertEqual(len(expected), 200)
+        self.assertEqual(list(analyze_stream(iter(lines), workers=2, chunk_size=7)), expected)
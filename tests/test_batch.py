@@ -0,0 +1,71 @@
+import unittest
+
+from tictactoe import TicTacToe
+from tictactoe.player.manual import ManualPlayer
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+if np is not None:
+    from tictactoe.batch import BatchSimulator
+    from tictactoe.batch import winner_batch
+
+
+@unittest.skipIf(np is None, "NumPy is not installed")
+class TestBatch(unittest.TestCase):
+
+    def test_winner_batch(self):
+        boards = np.zeros((4, 3, 3), dtype=np.int8)
+        boards[0, 1, :] = 1
+        boards[1, :, 2] = 2
+        boards[2] = np.eye(3, dtype=np.int8)
+        boards[3] = [[1, 2, 1], [1, 2, 2], [2, 1, 1]]
+        self.assertEqual(winner_batch(boards).tolist(), [1, 2, 1, 0])
+
+    def test_random_games_match_tictactoe(self):
+        sim = BatchSimulator(200, seed=0)
+        moves = []
+        while sim.active.any():
+            step_moves = sim.random_moves()
+            moves.append(np.where(sim.active, step_moves, -1))
+            sim.step(step_moves)
+        results = sim.results()
+
+        for game in range(200):
+            tic_tac_toe = TicTacToe()
+            tic_tac_toe.add_player(ManualPlayer, "X", "John")
+            tic_tac_toe.add_player(ManualPlayer, "O", "Jill")
+            for step_moves in moves:
+                move = int(step_moves[game])
+                if move >= 0:
+                    self.assertTrue(tic_tac_toe.place(move % 3, move // 3))
+
+            self.assertTrue(tic_tac_toe.game_over)
+            expected = 0
+            if tic_tac_toe.winner is not None:
+                expected = tic_tac_toe.players.index(tic_tac_toe.winner) + 1
+            self.assertEqual(results[game], expected)
+
+    def test_medium_moves_win_then_block(self):
+        sim = BatchSimulator(2)
+        # First game: X can win on the top row, and O can win on the middle row
+        # Second game: only O can win, on the middle row
+        sim.step(np.array([0, 0]))
+        sim.step(np.array([3, 3]))
+        sim.step(np.array([1, 8]))
+        sim.step(np.array([4, 4]))
+        self.assertEqual(sim.medium_moves().tolist(), [2, 5])
+
+    def test_medium_beats_random(self):
+        sim = BatchSimulator(1000, seed=0)
+        results = sim.run(BatchSimulator.medium_moves, BatchSimulator.random_moves)
+        self.assertGreater((results == 1).mean(), 0.8)
+
+    def test_larger_grid(self):
+        sim = BatchSimulator(100, 7, 6, 4, seed=0)
+        results = sim.run(BatchSimulator.random_moves, BatchSimulator.random_moves)
+        self.assertFalse((results == -1).any())
+        winners = winner_batch(sim.boards, 4)
+        self.assertEqual(winners.tolist(), [max(result, 0) for result in results.tolist()])
@@ -0,0 +1,25 @@
+import unittest
+
+from tictactoe.benchmark import suite
+
+
+class TestBenchmark(unittest.TestCase):
+
+    def test_run_engine(self):
+        results = suite.run(min_time=0.001, ais=False)
+        self.assertEqual(results["version"], suite.RESULTS_VERSION)
+        self.assertIn("engine.place.3x3", results["results"])
+        self.assertIn("engine.winner.15x15", results["results"])
+        for seconds in results["results"].values():
+            self.assertGreaterEqual(seconds, 0)
+
+    def test_compare_finds_regressions(self):
+        baseline = {"version": suite.RESULTS_VERSION, "results": {"a": 1.0, "b": 1.0, "c": 1.0}}
+        results = {"version": suite.RESULTS_VERSION, "results": {"a": 1.1, "b": 1.5, "d": 9.0}}
+        self.assertEqual(suite.compare(results, baseline, 0.2), [("b", 1.0, 1.5)])
+
+    def test_compare_different_version(self):
+        baseline = {"version": suite.RESULTS_VERSION + 1, "results": {}}
+        results = {"version": suite.RESULTS_VERSION, "results": {}}
+        with self.assertRaises(Exception):
+            suite.compare(results, baseline, 0.2)
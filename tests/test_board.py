@@ -0,0 +1,72 @@
+import pickle
+import unittest
+
+from tictactoe import TicTacToe
+from tictactoe.board import Board
+from tictactoe.player.manual import ManualPlayer
+
+
+class TestBoard(unittest.TestCase):
+
+    def setUp(self):
+        self._board = Board(3, 2, ("X", "O"))
+
+    def test_empty(self):
+        self.assertEqual(len(self._board), 2)
+        self.assertEqual(list(self._board), [("", "", ""), ("", "", "")])
+        self.assertEqual(self._board.occupied, 0)
+
+    def test_with_move(self):
+        board = self._board.with_move(2, 1, "X").with_move(0, 0, "O")
+        self.assertEqual(board[1][2], "X")
+        self.assertEqual(board.get(0, 0), "O")
+        self.assertEqual(board[0], ("O", "", ""))
+        self.assertEqual(board.bitboard("X"), 1 << 5)
+        self.assertEqual(board.bitboard("O"), 1)
+        self.assertEqual(board.occupied, 1 << 5 | 1)
+
+        # The original board is unchanged
+        self.assertEqual(self._board[1][2], "")
+
+    def test_with_move_invalid(self):
+        board = self._board.with_move(0, 0, "X")
+        self.assertRaises(Exception, board.with_move, 0, 0, "O")
+        self.assertRaises(Exception, board.with_move, 3, 0, "O")
+        self.assertRaises(Exception, board.with_move, 1, 0, "Z")
+
+    def test_legal_moves(self):
+        board = self._board.with_move(0, 0, "X").with_move(2, 1, "O")
+        self.assertEqual(list(board.legal_moves()), [(1, 0), (2, 0), (0, 1), (1, 1)])
+        self.assertEqual(board.empty, 0b011110)
+
+    def test_equality_and_hash(self):
+        one = self._board.with_move(0, 0, "X").with_move(1, 1, "O")
+        two = self._board.with_move(1, 1, "O").with_move(0, 0, "X")
+        self.assertEqual(one, two)
+        self.assertEqual(hash(one), hash(two))
+        self.assertEqual(len({one, two, self._board}), 2)
+        self.assertNotEqual(one, Board(2, 3, ("X", "O"), 1 | 1 << 10))
+
+    def test_immutable(self):
+        with self.assertRaises(TypeError):
+            self._board[0][0] = "X"
+        with self.assertRaises(AttributeError):
+            self._board.extra = 1
+
+    def test_pickle(self):
+        board = self._board.with_move(1, 0, "O")
+        copy = pickle.loads(pickle.dumps(board))
+        self.assertEqual(copy, board)
+        self.assertEqual(copy[0][1], "O")
+
+    def test_game_grid(self):
+        tic_tac_toe = TicTacToe(4, 3, 3)
+        tic_tac_toe.add_player(ManualPlayer, "X", "John")
+        tic_tac_toe.add_player(ManualPlayer, "O", "Jill")
+        tic_tac_toe.place(3, 2)
+        tic_tac_toe.place(0, 1)
+
+        grid = tic_tac_toe.grid
+        self.assertIsInstance(grid, Board)
+        self.assertEqual(grid, Board(4, 3, ("X", "O")).with_move(3, 2, "X").with_move(0, 1, "O"))
+        self.assertIs(tic_tac_toe.grid, grid)
@@ -0,0 +1,105 @@
+import os
+import tempfile
+import unittest
+
+from tictactoe.board import Board
+from tictactoe.book import OpeningBook
+from tictactoe.book import build_book
+from tictactoe.book import load_book
+from tictactoe.player.ai.easy import EasyAIPlayer
+from tictactoe.record import RESULT_DRAW
+from tictactoe.record import RESULT_UNFINISHED
+from tictactoe.record import GameWriter
+
+PLAYERS = [("X", "one"), ("O", "two")]
+
+
+class TestOpeningBook(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self._record = os.path.join(directory.name, "games.rec")
+        self._book = os.path.join(directory.name, "book.bin")
+
+        with GameWriter(self._record) as writer:
+            # The centre wins twice, a corner draws, and an edge loses
+            writer.write_game(3, 3, 3, 1, PLAYERS, [(1, 1), (0, 1), (0, 0), (2, 2), (2, 0),
+                                                    (1, 0), (0, 2)])
+            writer.write_game(3, 3, 3, 1, PLAYERS, [(1, 1), (1, 0), (0, 0), (2, 2), (0, 2),
+                                                    (0, 1), (2, 0)])
+            writer.write_game(3, 3, 3, RESULT_DRAW, PLAYERS, [(2, 2), (1, 1)])
+            writer.write_game(3, 3, 3, 2, PLAYERS, [(1, 0), (0, 0)])
+            writer.write_game(3, 3, 3, RESULT_UNFINISHED, PLAYERS, [(0, 1)])
+
+    def test_lookup(self):
+        self.assertEqual(build_book([self._record], self._book, plies=2), 6)
+        book = OpeningBook(self._book)
+        self.assertEqual((book.width, book.height, book.k, book.plies), (3, 3, 3, 2))
+
+        moves = {idx: stats for idx, *stats in book.lookup(0, 0)}
+        self.assertEqual(moves[4], [2, 0, 0])
+        # Corners and edges are each stored once for all their symmetries
+        self.assertEqual(len(moves), 3)
+        self.assertEqual(book.get_move(0, 0), 4)
+
+        # The second ply is found in every orientation
+        for corner in [0, 2, 6, 8]:
+            moves = book.lookup(0, 1 << corner)
+            self.assertEqual([stats for _, *stats in moves], [[0, 1, 0]])
+            self.assertEqual(moves[0][0], 4)
+        self.assertEqual(book.lookup(1 << 4, 0), [])
+
+    def test_min_games(self):
+        self.assertEqual(build_book([self._record], self._book, plies=1, min_games=2), 1)
+        book = OpeningBook(self._book)
+        self.assertIsNone(book.get_move(1 << 4, 0))
+        self.assertIsNone(book.get_move(0, 0, min_games=3))
+
+    def test_mixed_grids(self):
+        with GameWriter(self._record) as writer:
+            writer.write_game(4, 4, 3, RESULT_DRAW, PLAYERS, [(0, 0)])
+        self.assertRaises(Exception, build_book, [self._record], self._book)
+
+    def test_invalid_books(self):
+        build_book([self._record], self._book)
+        with open(self._book, "rb") as f:
+            data = f.read()
+
+        for contents, error in [(b"", "Not an opening book"),
+                                (b"TTTB", "Not an opening book"),
+                                (data[:-1], "wrong size")]:
+            with open(self._book, "wb") as f:
+                f.write(contents)
+            with self.assertRaisesRegex(Exception, error):
+                OpeningBook(self._book)
+
+    def test_load_book_reloads_rebuilt_book(self):
+        build_book([self._record], self._book, plies=2)
+        book = load_book(self._book)
+        self.addCleanup(book.close)
+        self.assertIs(load_book(self._book), book)
+
+        build_book([self._record], self._book, plies=1)
+        os.utime(self._book, ns=(0, 0))
+        rebuilt = load_book(self._book)
+        self.addCleanup(rebuilt.close)
+        self.assertEqual(rebuilt.plies, 1)
+        # The stale map was closed
+        with self.assertRaises(ValueError):
+            book.lookup(0, 0)
+
+    def test_ai_uses_book(self):
+        build_book([self._record], self._book)
+        grid = Board(3, 3, ("X", "O"))
+        self.assertEqual(EasyAIPlayer(1, "X", "Easy", verbose=False).get_move(grid), (0, 0))
+        self.assertEqual(
+            EasyAIPlayer(1, "X", "Easy", verbose=False, book=self._book).get_move(grid), (1, 1))
+
+        # Positions outside the book, or on other grids, fall back to the AI
+        grid = grid.with_move(1, 0, "X").with_move(2, 2, "O")
+        self.assertEqual(
+            EasyAIPlayer(1, "X", "Easy", verbose=False, book=self._book).get_move(grid), (0, 0))
+        grid = Board(4, 4, ("X", "O"))
+        self.assertEqual(
+            EasyAIPlayer(1, "X", "Easy", verbose=False, book=self._book).get_move(grid), (0, 0))
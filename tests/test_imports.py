@@ -0,0 +1,61 @@
+import subprocess
+import sys
+import unittest
+
+
+def get_import_times(code: str) -> dict[str, int]:
+    """
+    Runs the given code in a new interpreter with ``-X importtime`` and
+    returns the cumulative import time of each module, in microseconds.
+    """
+
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                            capture_output=True, text=True, check=True)
+
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+class TestImports(unittest.TestCase):
+
+    def assertNotImported(self, times, *names):
+        for name in names:
+            imported = [module for module in times if module == name or module.startswith(name + ".")]
+            self.assertEqual(imported, [], f"{name} should not be imported")
+
+    def test_main(self):
+        times = get_import_times("import tictactoe.__main__")
+        self.assertIn("tictactoe.registry", times)
+        self.assertNotImported(times, "tkinter", "tictactoe.player.ai", "tictactoe.selfplay",
+                               "tictactoe.server", "asyncio")
+
+    def test_console_game(self):
+        times = get_import_times(
+            "from tictactoe.registry import PLAYERS\n"
+            "from tictactoe.registry import RENDERERS\n"
+            "PLAYERS['manual'], PLAYERS['hard'], RENDERERS['console']")
+        self.assertIn("tictactoe.renderer.console", times)
+        self.assertIn("tictactoe.player.ai.hard", times)
+        self.assertNotImported(times, "tkinter", "tictactoe.renderer.tkinter",
+                               "tictactoe.player.ai.negamax", "tictactoe.player.ai.mcts")
+
+    def test_headless_commands(self):
+        for module in ("tictactoe.selfplay", "tictactoe.analyze", "tictactoe.server"):
+            with self.subTest(module=module):
+                times = get_import_times(f"import {module}")
+                self.assertIn(module, times)
+                self.assertNotImported(times, "tkinter", "tictactoe.player.ai.easy",
+                                       "tictactoe.player.ai.negamax", "tictactoe.player.ai.mcts",
+                                       "tictactoe.player.ai.table", "numpy")
+
+    def test_registry_imports_on_lookup(self):
+        times = get_import_times("from tictactoe.registry import AI_PLAYERS\n"
+                                 "AI_PLAYERS['negamax']")
+        self.assertIn("tictactoe.player.ai.negamax", times)
+        self.assertIn("tictactoe.search", times)
+        self.assertNotImported(times, "tictactoe.player.ai.mcts")
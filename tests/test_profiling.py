@@ -0,0 +1,82 @@
+import os
+import tempfile
+import threading
+import tracemalloc
+import unittest
+
+from tictactoe import TicTacToe
+from tictactoe.player.ai.easy import EasyAIPlayer
+from tictactoe.player.ai.negamax import NegamaxAIPlayer
+from tictactoe.profiling import GET_MOVE
+from tictactoe.profiling import PLACE
+from tictactoe.profiling import GameProfiler
+from tictactoe.search import SearchCancelled
+from tictactoe.selfplay import play_game
+
+
+class TestProfiling(unittest.TestCase):
+
+    def setUp(self):
+        self._tic_tac_toe = TicTacToe()
+        self._tic_tac_toe.add_player(EasyAIPlayer, "X", "Easy", verbose=False)
+        self._tic_tac_toe.add_player(NegamaxAIPlayer, "O", "Negamax", verbose=False)
+
+    def test_records_every_move(self):
+        profiler = GameProfiler()
+        profiler.attach(self._tic_tac_toe)
+        play_game(self._tic_tac_toe)
+
+        get_moves = [record for record in profiler.records if record.kind == GET_MOVE]
+        places = [record for record in profiler.records if record.kind == PLACE]
+        self.assertEqual(len(get_moves), len(places))
+        self.assertEqual([record.move_number for record in places], list(range(1, len(places) + 1)))
+        self.assertEqual(places[0].player, "EasyAIPlayer")
+        self.assertEqual(places[1].player, "NegamaxAIPlayer")
+        self.assertIsNone(places[0].allocated)
+
+        summary = profiler.summary()
+        self.assertIn("NegamaxAIPlayer.get_move", summary)
+        self.assertIn("EasyAIPlayer.place", summary)
+
+    def test_forwards_cancel(self):
+        profiler = GameProfiler()
+        profiler.attach(self._tic_tac_toe)
+        self._tic_tac_toe.place(0, 0)
+
+        cancel = threading.Event()
+        cancel.set()
+        with self.assertRaises(SearchCancelled):
+            self._tic_tac_toe.players[1].get_move(self._tic_tac_toe.grid, cancel=cancel)
+        self.assertEqual(self._tic_tac_toe.players[1].get_move(self._tic_tac_toe.grid,
+                                                               cancel=threading.Event()), (1, 1))
+
+    def test_move_numbers_restart_after_reset(self):
+        profiler = GameProfiler()
+        profiler.attach(self._tic_tac_toe)
+        play_game(self._tic_tac_toe)
+        play_game(self._tic_tac_toe)
+
+        first_moves = [record for record in profiler.records if record.move_number == 1]
+        self.assertEqual(len(first_moves), 4)
+
+    def test_trace_allocations(self):
+        profiler = GameProfiler(trace_allocations=True)
+        profiler.attach(self._tic_tac_toe)
+        try:
+            play_game(self._tic_tac_toe)
+        finally:
+            tracemalloc.stop()
+
+        for record in profiler.records:
+            self.assertGreaterEqual(record.allocated, 0)
+
+    def test_profile_moves(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            profiler = GameProfiler(profile_moves={2}, profile_dir=tmp_dir)
+            profiler.attach(self._tic_tac_toe)
+            play_game(self._tic_tac_toe)
+
+            profiled = [record for record in profiler.records if record.profile_path]
+            self.assertEqual(len(profiled), 1)
+            self.assertEqual(profiled[0].move_number, 2)
+            self.assertTrue(os.path.exists(profiled[0].profile_path))
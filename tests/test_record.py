@@ -0,0 +1,146 @@
+import gc
+import os
+import tempfile
+import unittest
+import warnings
+
+from tictactoe import TicTacToe
+from tictactoe.player.manual import ManualPlayer
+from tictactoe.record import FILE_HEADER
+from tictactoe.record import RECORD_HEADER
+from tictactoe.record import RESULT_DRAW
+from tictactoe.record import RESULT_UNFINISHED
+from tictactoe.record import GameReader
+from tictactoe.record import GameWriter
+from tictactoe.record import pack_moves
+from tictactoe.record import unpack_moves
+from tictactoe.selfplay import run_selfplay
+
+
+class TestRecord(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self._path = os.path.join(directory.name, "games.rec")
+
+    def test_pack_moves(self):
+        for width, height in [(1, 1), (3, 3), (4, 4), (15, 15), (7, 2)]:
+            moves = [(i % width, (i * 7) % height) for i in range(width * height)]
+            data = pack_moves(moves, width, height)
+            self.assertEqual(unpack_moves(data, len(moves), width, height), moves)
+
+        self.assertEqual(len(pack_moves([(0, 0)] * 9, 3, 3)), 5)
+
+    def test_write_and_read(self):
+        tic_tac_toe = TicTacToe()
+        tic_tac_toe.add_player(ManualPlayer, "X", "John")
+        tic_tac_toe.add_player(ManualPlayer, "O", "Jöll")
+
+        with GameWriter(self._path) as writer:
+            for move in [(0, 0), (1, 1), (1, 0), (2, 2), (2, 0)]:
+                tic_tac_toe.place(*move)
+            writer.write(tic_tac_toe)
+
+            tic_tac_toe.reset()
+            tic_tac_toe.place(1, 1)
+            writer.write(tic_tac_toe)
+
+        # Appending to an existing file
+        with GameWriter(self._path) as writer:
+            writer.write_game(5, 4, 4, RESULT_DRAW, [("a", "A"), ("b", "B")], [(4, 3), (0, 0)])
+
+        with GameReader(self._path) as reader:
+            games = list(reader)
+
+        self.assertEqual(len(games), 3)
+        self.assertEqual(games[0].players, [("X", "John"), ("O", "Jöll")])
+        self.assertEqual(games[0].moves, [(0, 0), (1, 1), (1, 0), (2, 2), (2, 0)])
+        self.assertEqual(games[0].winner, 0)
+        self.assertEqual(games[1].moves, [(1, 1)])
+        self.assertEqual(games[1].result, RESULT_UNFINISHED)
+        self.assertEqual((games[2].width, games[2].height, games[2].k), (5, 4, 4))
+        self.assertEqual(games[2].moves, [(4, 3), (0, 0)])
+        self.assertIsNone(games[2].winner)
+
+    def test_empty_and_invalid_files(self):
+        open(self._path, "wb").close()
+        with GameReader(self._path) as reader:
+            self.assertEqual(list(reader), [])
+
+        with open(self._path, "wb") as f:
+            f.write(b"not a record file")
+        self.assertRaises(Exception, GameReader, self._path)
+        self.assertRaises(Exception, GameWriter, self._path)
+
+    def test_invalid_file_is_closed(self):
+        with open(self._path, "wb") as f:
+            f.write(b"not a record file")
+
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always", ResourceWarning)
+            self.assertRaises(Exception, GameReader, self._path)
+            gc.collect()
+        self.assertEqual([w for w in caught if issubclass(w.category, ResourceWarning)], [])
+
+    def test_truncated_and_corrupt_records(self):
+        with GameWriter(self._path) as writer:
+            writer.write_game(3, 3, 3, RESULT_DRAW, [("x", "One"), ("o", "Two")], [(1, 1), (0, 0)])
+        with open(self._path, "rb") as f:
+            data = f.read()
+
+        # Cut off partway through the record header, and partway through the
+        # record
+        for length in (FILE_HEADER.size + 3, len(data) - 1):
+            with open(self._path, "wb") as f:
+                f.write(data[:length])
+            with GameReader(self._path) as reader:
+                with self.assertRaisesRegex(Exception, "truncated"):
+                    list(reader)
+
+        # A record whose players run past its size
+        corrupt = bytearray(data)
+        RECORD_HEADER.pack_into(corrupt, FILE_HEADER.size, RECORD_HEADER.size + 2, 3, 3, 3,
+                                RESULT_DRAW, 2, 0)
+        with open(self._path, "wb") as f:
+            f.write(corrupt)
+        with GameReader(self._path) as reader:
+            with self.assertRaisesRegex(Exception, "corrupt"):
+                list(reader)
+
+    def test_corrupt_grid_and_moves(self):
+        with GameWriter(self._path) as writer:
+            writer.write_game(3, 3, 3, RESULT_DRAW, [], [(1, 1)])
+        with open(self._path, "rb") as f:
+            data = bytearray(f.read())
+        size = len(data) - FILE_HEADER.size
+
+        # A zero width, and a cell index of 15 on a 3x3 grid
+        for width, move in [(0, b"\x04"), (3, b"\x0f")]:
+            RECORD_HEADER.pack_into(data, FILE_HEADER.size, size, width, 3, 3, RESULT_DRAW, 0, 1)
+            data[-1:] = move
+            with open(self._path, "wb") as f:
+                f.write(data)
+            with GameReader(self._path) as reader:
+                with self.assertRaisesRegex(Exception, "corrupt"):
+                    list(reader)
+
+    def test_write_game_limits(self):
+        with GameWriter(self._path) as writer:
+            with self.assertRaisesRegex(Exception, "at most"):
+                writer.write_game(256, 1, 1, RESULT_DRAW, [], [])
+            with self.assertRaisesRegex(Exception, "at most"):
+                writer.write_game(3, 3, 3, RESULT_DRAW, [], [(0, 0)] * 65536)
+        self.assertEqual(os.path.getsize(self._path), FILE_HEADER.size)
+
+    def test_selfplay_record(self):
+        result = run_selfplay("easy", "negamax", 7, workers=2, alternate=True, record=self._path)
+
+        with GameReader(self._path) as reader:
+            games = list(reader)
+
+        self.assertEqual(len(games), 7)
+        self.assertEqual(os.listdir(os.path.dirname(self._path)), ["games.rec"])
+        self.assertEqual([game.players[0][1] for game in games],
+                         ["easy", "negamax", "easy", "negamax", "easy", "negamax", "easy"])
+        self.assertEqual(sum(game.result == RESULT_DRAW for game in games), result.draws)
@@ -0,0 +1,199 @@
+import io
+import unittest
+from concurrent.futures import wait
+
+from tictactoe import TicTacToe
+from tictactoe.board import Board
+from tictactoe.player.ai import AIPlayer
+from tictactoe.player.ai.hard import HardAIPlayer
+from tictactoe.player.ai.negamax import NegamaxAIPlayer
+from tictactoe.player.manual import ManualPlayer
+from tictactoe.renderer.console import CLEAR_BELOW
+from tictactoe.renderer.console import CLEAR_LINE
+from tictactoe.renderer.console import CLEAR_SCREEN
+from tictactoe.renderer.console import ConsoleRenderer
+from tictactoe.renderer.console import format_board
+from tictactoe.renderer.console import move_cursor
+from tictactoe.renderer.tkinter.canvas.grid import get_changed_cells
+from tictactoe.renderer.tkinter.canvas.grid import get_geometry
+from tictactoe.renderer.tkinter.root import AI_DELAY
+from tictactoe.renderer.tkinter.root import AI_POLL_INTERVAL
+from tictactoe.renderer.tkinter.root import TicTacToeRoot
+from tictactoe.search import SearchCancelled
+
+
+class TestGridCanvas(unittest.TestCase):
+
+    def test_geometry(self):
+        self.assertEqual(get_geometry(300, 300, 3, 3), (100, 0, 0))
+        self.assertEqual(get_geometry(500, 300, 3, 3), (100, 100, 0))
+        self.assertEqual(get_geometry(400, 300, 4, 2), (100, 0, 50))
+        self.assertEqual(get_geometry(0, 0, 3, 3), (1, -1.5, -1.5))
+
+    def test_changed_cells(self):
+        board = Board(3, 3, ("X", "O"))
+        self.assertEqual(get_changed_cells(None, board), 0)
+
+        moved = board.with_move(0, 0, "X").with_move(2, 2, "O")
+        self.assertEqual(get_changed_cells(None, moved), 1 | 1 << 8)
+        self.assertEqual(get_changed_cells(board, moved), 1 | 1 << 8)
+        self.assertEqual(get_changed_cells(moved, moved.with_move(1, 1, "X")), 1 << 4)
+        self.assertEqual(get_changed_cells(moved, board), 1 | 1 << 8)
+
+
+class StubGridCanvas:
+
+    def __init__(self, tic_tac_toe):
+        self._tic_tac_toe = tic_tac_toe
+
+    def place(self, x, y):
+        return self._tic_tac_toe.place(x, y)
+
+
+class WaitingAIPlayer(AIPlayer):
+
+    def _get_move(self, grid):
+        # Searches until cancelled
+        self._cancel.wait()
+        raise SearchCancelled()
+
+
+class TestTicTacToeRoot(unittest.TestCase):
+    """
+    Runs the AI move logic of the window without a display, with
+    :meth:`after` and the clock stubbed.
+    """
+
+    def setUp(self):
+        self.tic_tac_toe = TicTacToe()
+        self.tic_tac_toe.add_player(ManualPlayer, "X", "John")
+        self.grid_canvas = StubGridCanvas(self.tic_tac_toe)
+
+        self.now = 0
+        self.scheduled = []
+        self.root = TicTacToeRoot.__new__(TicTacToeRoot)
+        self.root._tic_tac_toe = self.tic_tac_toe
+        self.root._init_ai_moves()
+        self.root._clock = lambda: self.now
+        self.root.after = lambda delay, callback: self.scheduled.append((delay, callback))
+        self.addCleanup(self.root._executor.shutdown)
+
+    def run_scheduled(self) -> int:
+        """
+        Runs the first callback passed to after and returns its delay.
+        """
+
+        delay, callback = self.scheduled.pop(0)
+        callback()
+        return delay
+
+    def test_ai_move_waits_for_delay(self):
+        self.tic_tac_toe.add_player(NegamaxAIPlayer, "O", "AI", verbose=False)
+        self.tic_tac_toe.place(0, 0)
+        self.root._next_turn(self.grid_canvas)
+        wait([self.root._ai_future])
+
+        self.now = 0.25
+        self.assertEqual(self.run_scheduled(), AI_POLL_INTERVAL)
+        self.assertFalse(self.tic_tac_toe.grid[1][1])
+        self.assertEqual(self.run_scheduled(), AI_DELAY - 250)
+        self.assertEqual(self.tic_tac_toe.grid[1][1], "O")
+        # The human is next, so nothing more is scheduled
+        self.assertEqual(self.scheduled, [])
+
+    def test_poll_reschedules_until_move_arrives(self):
+        self.tic_tac_toe.add_player(WaitingAIPlayer, "O", "AI", verbose=False)
+        self.tic_tac_toe.place(0, 0)
+        self.root._next_turn(self.grid_canvas)
+
+        self.assertEqual(self.run_scheduled(), AI_POLL_INTERVAL)
+        self.assertEqual(len(self.scheduled), 1)
+        self.root._cancel_ai_move()
+
+    def test_new_game_drops_old_move(self):
+        self.tic_tac_toe.add_player(WaitingAIPlayer, "O", "AI", verbose=False)
+        self.tic_tac_toe.place(0, 0)
+        self.root._next_turn(self.grid_canvas)
+        future = self.root._ai_future
+
+        # Starting a new game stops the search and bumps the game number
+        self.root._cancel_ai_move()
+        wait([future], timeout=5)
+        self.assertTrue(future.done())
+
+        self.run_scheduled()
+        self.assertEqual(self.scheduled, [])
+        self.assertEqual(self.tic_tac_toe.grid.occupied.bit_count(), 1)
+
+
+class CountingStringIO(io.StringIO):
+
+    def __init__(self):
+        super().__init__()
+        self.writes = 0
+
+    def write(self, s):
+        self.writes += 1
+        return super().write(s)
+
+
+class TestConsoleRenderer(unittest.TestCase):
+
+    def setUp(self):
+        self.board = Board(3, 3, ("X", "O"))
+        self.out = CountingStringIO()
+
+    def test_format_board(self):
+        board = self.board.with_move(0, 0, "X").with_move(1, 1, "O")
+        self.assertEqual(format_board(board),
+                         " X |   |   \n"
+                         "---+---+---\n"
+                         "   | O |   \n"
+                         "---+---+---\n"
+                         "   |   |   \n")
+
+    def test_plain_text(self):
+        renderer = ConsoleRenderer(out=self.out, ansi=False)
+        board = self.board.with_move(2, 0, "X")
+        renderer.draw(board, "Game 1")
+        self.assertEqual(self.out.getvalue(), format_board(board) + "Game 1\n\n")
+        self.assertEqual(self.out.writes, 1)
+
+    def test_ansi_repaints_changed_cells(self):
+        renderer = ConsoleRenderer(out=self.out, ansi=True)
+        renderer.draw(self.board)
+        self.assertTrue(self.out.getvalue().startswith(CLEAR_SCREEN))
+
+        self.out.seek(0)
+        self.out.truncate()
+        renderer.draw(self.board.with_move(2, 1, "X"))
+        self.assertEqual(self.out.getvalue(), move_cursor(2, 9) + "X" + move_cursor(6, 0) + CLEAR_BELOW)
+
+        self.out.seek(0)
+        self.out.truncate()
+        renderer.draw(self.board, "Reset")
+        self.assertEqual(self.out.getvalue(),
+                         move_cursor(2, 9) + " " + move_cursor(5, 0) + CLEAR_LINE + "Reset" +
+                         move_cursor(6, 0) + CLEAR_BELOW)
+        self.assertEqual(self.out.writes, 3)
+
+    def test_ansi_redraws_new_shape(self):
+        renderer = ConsoleRenderer(out=self.out, ansi=True)
+        renderer.draw(self.board)
+        renderer.draw(Board(4, 4, ("X", "O")))
+        self.assertEqual(self.out.getvalue().count(CLEAR_SCREEN), 2)
+
+    def test_max_fps(self):
+        renderer = ConsoleRenderer(out=self.out, ansi=True, max_fps=1e-3)
+        self.assertTrue(renderer.draw(self.board))
+        self.assertFalse(renderer.draw(self.board.with_move(0, 0, "X")))
+        self.assertTrue(renderer.draw(self.board.with_move(0, 0, "X"), force=True))
+        self.assertEqual(self.out.writes, 2)
+
+    def test_mainloop(self):
+        tic_tac_toe = TicTacToe()
+        tic_tac_toe.add_player(HardAIPlayer, "X", "One", verbose=False)
+        tic_tac_toe.add_player(HardAIPlayer, "O", "Two", verbose=False)
+        ConsoleRenderer(tic_tac_toe, out=self.out, ansi=False).mainloop()
+        self.assertTrue(tic_tac_toe.game_over)
+        self.assertIn(self.out.getvalue().splitlines()[-2], ("Stalemate!", "One wins!", "Two wins!"))
@@ -0,0 +1,38 @@
+import multiprocessing
+import unittest
+
+from tictactoe.selfplay import parse_options
+from tictactoe.selfplay import play_games
+from tictactoe.selfplay import run_selfplay
+
+
+class TestSelfPlay(unittest.TestCase):
+
+    def test_play_games_perfect_play_draws(self):
+        result = play_games("negamax", "negamax", 10, alternate=True)
+        self.assertEqual((result.wins, result.draws, result.losses), (0, 10, 0))
+
+    def test_play_games_easy_loses_to_negamax(self):
+        result = play_games("easy", "negamax", 10, alternate=True)
+        self.assertEqual(result.wins, 0)
+        self.assertEqual(result.games, 10)
+        self.assertGreater(result.losses, 0)
+
+    def test_play_games_larger_grid(self):
+        result = play_games("medium", "negamax", 2, width=5, height=5, k=4,
+                            options_two={"max_depth": 2})
+        self.assertEqual(result.games, 2)
+
+    def test_play_games_closes_players(self):
+        result = play_games("mcts", "easy", 1, options_one={"playouts": 50, "workers": 2})
+        self.assertEqual(result.games, 1)
+        self.assertEqual(multiprocessing.active_children(), [])
+
+    def test_run_selfplay_with_worker_processes(self):
+        result = run_selfplay("easy", "medium", 9, workers=2, alternate=True)
+        self.assertEqual(result.games, 9)
+        self.assertGreater(result.games_per_second, 0)
+
+    def test_parse_options(self):
+        self.assertEqual(parse_options(["max_depth=4", "exploration=1.5", "name=test"]),
+                         {"max_depth": 4, "exploration": 1.5, "name": "test"})
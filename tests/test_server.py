@@ -0,0 +1,171 @@
+import asyncio
+import json
+import unittest
+
+from tictactoe import server
+from tictactoe.board import Board
+from tictactoe.server import GameServer
+from tictactoe.server.loadgen import Client
+from tictactoe.server.loadgen import run
+
+
+class TestGameServer(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.server = GameServer(workers=1)
+        await self.server.start("127.0.0.1", 0)
+
+    async def asyncTearDown(self):
+        await self.server.close()
+
+    async def _connect(self) -> Client:
+        client = await Client.connect("127.0.0.1", self.server.port)
+        self.addAsyncCleanup(client.close)
+        return client
+
+    async def test_human_against_ai(self):
+        client = await self._connect()
+        game = (await client.request("create"))["game"]
+        await client.request("join", game=game, letter="X")
+        state = await client.request("join", game=game, letter="O", ai="negamax")
+        self.assertEqual(state["turn"], "X")
+
+        state = await client.request("move", game=game, x=1, y=1)
+        self.assertTrue(state["ok"])
+        self.assertEqual(state["turn"], "X")
+        self.assertEqual(sum(cell == "O" for row in state["grid"] for cell in row), 1)
+
+    async def test_ai_moving_first(self):
+        client = await self._connect()
+        game = (await client.request("create"))["game"]
+        await client.request("join", game=game, letter="X", ai="hard")
+        state = await client.request("join", game=game, letter="O")
+
+        # The hard AI opens in a corner when it moves first, and in the centre
+        # only as the second player
+        self.assertEqual(state["grid"][0][0], "X")
+
+    async def test_invalid_moves(self):
+        client = await self._connect()
+        game = (await client.request("create"))["game"]
+        await client.request("join", game=game, letter="X")
+
+        state = await client.request("move", game=game, x=0, y=0)
+        self.assertEqual(state["error"], "Waiting for players to join")
+
+        await client.request("join", game=game, letter="O", ai="easy")
+        state = await client.request("move", game=game, x=3, y=0)
+        self.assertEqual(state["error"], "Invalid move")
+
+        await client.request("move", game=game, x=0, y=0)
+        state = await client.request("move", game=game, x=0, y=0)
+        self.assertEqual(state["error"], "Invalid move")
+
+        # An invalid move doesn't use up the turn
+        state = await client.request("state", game=game)
+        self.assertEqual(state["turn"], "X")
+
+    async def test_two_humans(self):
+        one = await self._connect()
+        two = await self._connect()
+        game = (await one.request("create"))["game"]
+        await one.request("join", game=game, letter="X")
+        await two.request("join", game=game, letter="O")
+
+        state = await two.request("move", game=game, x=0, y=0)
+        self.assertEqual(state["error"], "It is not your turn")
+
+        for client, x, y in [(one, 0, 0), (two, 0, 1), (one, 1, 0), (two, 1, 1), (one, 2, 0)]:
+            state = await client.request("move", game=game, x=x, y=y)
+            self.assertTrue(state["ok"])
+
+        self.assertTrue(state["game_over"])
+        self.assertEqual(state["winner"], "X")
+        state = await two.request("move", game=game, x=2, y=2)
+        self.assertEqual(state["error"], "The game is over")
+
+    async def test_game_ends_when_connections_close(self):
+        client = await Client.connect("127.0.0.1", self.server.port)
+        game = (await client.request("create"))["game"]
+        self.assertIn(game, self.server.sessions)
+
+        await client.close()
+        for _ in range(100):
+            if game not in self.server.sessions:
+                break
+            await asyncio.sleep(0.01)
+        self.assertNotIn(game, self.server.sessions)
+
+    async def test_bad_requests(self):
+        client = await self._connect()
+        self.assertEqual((await client.request("nonsense"))["error"], "Unknown op")
+        self.assertEqual((await client.request("state", game=99))["error"], "Unknown game")
+        self.assertEqual((await client.request("create", width=0))["ok"], False)
+        self.assertEqual((await client.request("create", width=1500, height=1500))["error"],
+                         "Width, height and k must be at most 32")
+        self.assertEqual((await client.request("create", width="3"))["ok"], False)
+
+        game = (await client.request("create"))["game"]
+        self.assertEqual((await client.request("state", game=[game]))["error"],
+                         "Game must be an integer id")
+        self.assertEqual((await client.request("join", game=game, letter="X", ai=["easy"]))["error"],
+                         "Unknown AI")
+
+        for options, error in [
+                ([1], "Options must be an object"),
+                ({"path": "/etc/passwd"}, "Unknown option for negamax: path"),
+                ({"book": "book.bin"}, "Unknown option for negamax: book"),
+                ({"max_depth": 1000}, "Option max_depth must be an integer from 1 to 9"),
+                ({"max_depth": 2.5}, "Option max_depth must be an integer from 1 to 9"),
+                ({"symmetry": 1}, "Option symmetry must be true or false")]:
+            state = await client.request("join", game=game, letter="O", ai="negamax",
+                                         options=options)
+            self.assertEqual(state["error"], error)
+        state = await client.request("join", game=game, letter="O", ai="mcts",
+                                     options={"workers": 8})
+        self.assertEqual(state["error"], "Unknown option for mcts: workers")
+
+        await client.request("join", game=game, letter="X")
+        await client.request("join", game=game, letter="O", ai="negamax", options={"max_depth": 2})
+        for x, y in [(1.9, 0), ("1", 0), (True, 0)]:
+            state = await client.request("move", game=game, x=x, y=y)
+            self.assertEqual(state["error"], "Move needs integer x and y")
+
+        # The connection survives bad requests, along with its game
+        self.assertTrue((await client.request("state", game=game))["ok"])
+
+    async def test_close(self):
+        one = await self._connect()
+        two = await self._connect()
+        game = (await one.request("create"))["game"]
+
+        state = await two.request("close", game=game)
+        self.assertEqual(state["error"], "Only a connection in the game can close it")
+        self.assertIn(game, self.server.sessions)
+
+        self.assertTrue((await one.request("close", game=game))["ok"])
+        self.assertNotIn(game, self.server.sessions)
+
+    async def test_loadgen(self):
+        results = await run("127.0.0.1", self.server.port, 20, 5, "easy", 3, 3, 3, seed=1)
+        self.assertEqual(results["sessions"], 20)
+        self.assertGreaterEqual(results["moves"], 20 * 3)
+        self.assertLessEqual(results["p50"], results["p99"])
+
+
+class TestWorkerPlayers(unittest.TestCase):
+
+    def setUp(self):
+        self.addCleanup(server._close_worker_players)
+
+    def test_cache_is_capped(self):
+        board = Board(3, 3, ("X", "O"))
+        for seed in range(server.MAX_WORKER_PLAYERS + 5):
+            options = json.dumps({"playouts": 10, "seed": seed})
+            server._get_ai_move("mcts", options, 1, "X", 3, board)
+        self.assertEqual(len(server._worker_players), server.MAX_WORKER_PLAYERS)
+
+        # The least recently used player is the one dropped
+        first = next(iter(server._worker_players))
+        server._get_ai_move("easy", "{}", 1, "X", 3, board)
+        self.assertNotIn(first, server._worker_players)
@@ -0,0 +1,54 @@
+import unittest
+
+from tictactoe.bitboard import cell_bit
+from tictactoe.bitboard import cell_index
+from tictactoe.symmetry import canonical_key
+from tictactoe.symmetry import canonicalize
+from tictactoe.symmetry import to_original
+from tictactoe.symmetry import transform_board
+from tictactoe.symmetry import transforms
+
+
+class TestSymmetry(unittest.TestCase):
+
+    def test_square_grid_has_eight_symmetries(self):
+        self.assertEqual(len(set(transforms(3, 3))), 8)
+
+    def test_rectangular_grid_has_four_symmetries(self):
+        self.assertEqual(len(set(transforms(4, 3))), 4)
+
+    def test_corners_share_canonical_position(self):
+        corners = [(0, 0), (2, 0), (0, 2), (2, 2)]
+        keys = set()
+        for x, y in corners:
+            mine, theirs, _ = canonicalize(0, cell_bit(x, y, 3), 3, 3)
+            keys.add((mine, theirs))
+        self.assertEqual(len(keys), 1)
+
+    def test_canonical_key(self):
+        # Every corner is the same position
+        keys = {canonical_key(1 << corner, 0, 3, 3)[0] for corner in [0, 2, 6, 8]}
+        self.assertEqual(len(keys), 1)
+        self.assertNotEqual(canonical_key(1 << 4, 0, 3, 3)[0], canonical_key(0, 1 << 4, 3, 3)[0])
+
+        # The key packs the representative's bitmasks
+        mine = cell_bit(2, 2, 3)
+        theirs = cell_bit(1, 0, 3)
+        key, transform = canonical_key(mine, theirs, 3, 3)
+        perm = transforms(3, 3)[transform]
+        self.assertEqual(key, transform_board(mine, perm) | transform_board(theirs, perm) << 9)
+
+    def test_canonical_move_maps_back_to_original(self):
+        # X in the bottom-right corner, O in the center
+        mine = cell_bit(2, 2, 3)
+        theirs = cell_bit(1, 1, 3)
+        canonical_mine, _, transform = canonicalize(mine, theirs, 3, 3)
+
+        # The canonical position's X maps back to the original X
+        canonical_idx = canonical_mine.bit_length() - 1
+        self.assertEqual(to_original(canonical_idx, transform, 3, 3), cell_index(2, 2, 3))
+
+    def test_transform_board_keeps_letter_count(self):
+        board = cell_bit(0, 0, 4) | cell_bit(1, 2, 4) | cell_bit(3, 1, 4)
+        for perm in transforms(4, 3):
+            self.assertEqual(transform_board(board, perm).bit_count(), 3)
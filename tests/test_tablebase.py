@@ -0,0 +1,125 @@
+import itertools
+import os
+import tempfile
+import unittest
+
+from tictactoe import TicTacToe
+from tictactoe.player.ai.easy import EasyAIPlayer
+from tictactoe.player.ai.tablebase import TablebaseAIPlayer
+from tictactoe.search import DRAW
+from tictactoe.search import LOSS
+from tictactoe.search import WIN
+from tictactoe.search import Negamax
+from tictactoe.search import get_result
+from tictactoe.selfplay import play_game
+from tictactoe.tablebase import Tablebase
+from tictactoe.tablebase import build_tablebase
+from tictactoe.tablebase import load_tablebase
+
+
+class TestTablebase(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self._path = os.path.join(directory.name, "tablebase.bin")
+
+    def _open(self, path: str) -> Tablebase:
+        tablebase = Tablebase(path)
+        self.addCleanup(tablebase.close)
+        return tablebase
+
+    def test_3x3(self):
+        # 765 positions up to symmetry, of which 138 are over
+        self.assertEqual(build_tablebase(3, 3, path=self._path), 627)
+        tablebase = self._open(self._path)
+        self.assertEqual((tablebase.width, tablebase.height, tablebase.k), (3, 3, 3))
+
+        self.assertEqual(tablebase.probe(0, 0)[:2], (DRAW, 9))
+        self.assertEqual(tablebase.probe(0b000000011, 0b000011000), (WIN, 1, 2))
+        # X has two ways to win, so O loses whatever it plays
+        self.assertEqual(tablebase.probe(0b000001010, 0b000010101)[:2], (LOSS, 2))
+        # The only reply to a centre letter that doesn't lose is a corner
+        self.assertIn(tablebase.get_move(0, 1 << 4), [0, 2, 6, 8])
+        # Finished and unreachable positions aren't stored
+        self.assertIsNone(tablebase.probe(0b000111000, 0b000000011))
+        self.assertIsNone(tablebase.probe(0b111, 0))
+
+    def test_matches_search(self):
+        build_tablebase(3, 3, path=self._path)
+        tablebase = self._open(self._path)
+        search = Negamax(3, 3, 3)
+
+        found = 0
+        for cells in itertools.product(range(3), repeat=9):
+            mine = sum(1 << idx for idx, cell in enumerate(cells) if cell == 1)
+            theirs = sum(1 << idx for idx, cell in enumerate(cells) if cell == 2)
+            entry = tablebase.probe(mine, theirs)
+            if entry is None:
+                continue
+
+            found += 1
+            _, score = search.search(mine, theirs)
+            self.assertEqual(entry[0], get_result(score))
+            self.assertFalse((mine | theirs) >> entry[2] & 1)
+
+        # Every reachable position that isn't over
+        self.assertEqual(found, 4520)
+
+    def test_workers(self):
+        build_tablebase(3, 3, path=self._path)
+        other = self._path + ".workers"
+        build_tablebase(3, 3, path=other, workers=2, chunk_size=50)
+        with open(self._path, "rb") as f, open(other, "rb") as g:
+            self.assertEqual(f.read(), g.read())
+
+    def test_other_grids(self):
+        self.assertGreater(build_tablebase(4, 3, 3, path=self._path), 0)
+        tablebase = self._open(self._path)
+        self.assertEqual((tablebase.width, tablebase.height, tablebase.k), (4, 3, 3))
+        # The first player wins 3 in a row on a 4x3 grid
+        self.assertEqual(tablebase.probe(0, 0)[0], WIN)
+
+        with self.assertRaises(Exception):
+            build_tablebase(6, 6, 4, path=self._path)
+
+    def test_player(self):
+        build_tablebase(3, 3, path=self._path)
+
+        tic_tac_toe = TicTacToe()
+        tic_tac_toe.add_player(TablebaseAIPlayer, "X", "one", path=self._path, verbose=False)
+        tic_tac_toe.add_player(TablebaseAIPlayer, "O", "two", path=self._path, verbose=False)
+        self.assertIsNone(play_game(tic_tac_toe))
+
+        # The easy AI never wins, whoever moves first
+        for tablebase_first in [True, False]:
+            players = [(TablebaseAIPlayer, {"path": self._path}), (EasyAIPlayer, {})]
+            if not tablebase_first:
+                players.reverse()
+
+            tic_tac_toe = TicTacToe()
+            for letter, (player_class, options) in zip(["X", "O"], players):
+                tic_tac_toe.add_player(player_class, letter, letter, verbose=False, **options)
+            self.assertNotEqual(play_game(tic_tac_toe), 1 if tablebase_first else 0)
+
+        # Finished positions aren't in the tablebase
+        tic_tac_toe = TicTacToe()
+        tic_tac_toe.add_player(EasyAIPlayer, "X", "one", verbose=False)
+        tic_tac_toe.add_player(TablebaseAIPlayer, "O", "two", path=self._path, verbose=False)
+        for x, y in [(0, 0), (1, 1), (0, 1), (2, 2), (0, 2)]:
+            tic_tac_toe.place(x, y)
+        with self.assertRaisesRegex(Exception, "not in the tablebase"):
+            tic_tac_toe.players[1].get_move(tic_tac_toe.grid)
+
+    def test_load_tablebase(self):
+        build_tablebase(3, 3, path=self._path)
+        tablebase = load_tablebase(self._path)
+        self.addCleanup(tablebase.close)
+        self.assertIs(load_tablebase(self._path), tablebase)
+
+        # A rebuilt tablebase is loaded again
+        build_tablebase(4, 3, 3, path=self._path)
+        os.utime(self._path, ns=(0, 0))
+        rebuilt = load_tablebase(self._path)
+        self.addCleanup(rebuilt.close)
+        self.assertEqual((rebuilt.width, rebuilt.height), (4, 3))
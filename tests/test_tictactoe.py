@@ -1,7 +1,10 @@
+import random
 import unittest
 
 from tictactoe import TicTacToe
+from tictactoe.bitboard import cell_bit
 from tictactoe.player.manual import ManualPlayer
+from tictactoe.zobrist import zobrist_hash
 
 
 class TestTicTacToe(unittest.TestCase):
@@ -37,6 +40,12 @@ class TestTicTacToe(unittest.TestCase):
         self.assertTrue(self._tic_tac_toe.place(2, 2))
         self.assertEqual(self._tic_tac_toe.grid[2][2], "O")
             
+    def test_grid_changes_do_not_affect_game(self):
+        with self.assertRaises(TypeError):
+            self._tic_tac_toe.grid[0][0] = "O"
+        self.assertTrue(self._tic_tac_toe.place(0, 0))
+        self.assertEqual(self._tic_tac_toe.grid[0][0], "X")
+            
     def test_place_accepts_capitals(self):
         self.assertTrue(self._tic_tac_toe.place(0, 0))
         self.assertTrue(self._tic_tac_toe.place(1, 0))
@@ -355,6 +364,144 @@ class TestTicTacToe(unittest.TestCase):
     def test_game_over_board_not_full(self):
         self.assertFalse(self._tic_tac_toe.game_over)
     
+    def test_check_incremental_random_games(self):
+        rng = random.Random(0)
+        for _ in range(200):
+            tic_tac_toe = TicTacToe(check_incremental=True)
+            tic_tac_toe.add_player(ManualPlayer, "X", "John")
+            tic_tac_toe.add_player(ManualPlayer, "O", "Jill")
+
+            moves = [(x, y) for x in range(3) for y in range(3)]
+            rng.shuffle(moves)
+            for x, y in moves:
+                if tic_tac_toe.game_over:
+                    break
+                self.assertTrue(tic_tac_toe.place(x, y))
+                self.assertIs(tic_tac_toe.winner, tic_tac_toe._scan_winner())
+                self.assertEqual(tic_tac_toe.game_over, tic_tac_toe._scan_game_over())
+    
+    def test_custom_grid_size(self):
+        tic_tac_toe = TicTacToe(4, 2, 3)
+        self.assertEqual(tic_tac_toe.width, 4)
+        self.assertEqual(tic_tac_toe.height, 2)
+        self.assertEqual(tic_tac_toe.k, 3)
+        self.assertEqual(len(tic_tac_toe.grid), 2)
+        self.assertEqual(len(tic_tac_toe.grid[0]), 4)
+    
+    def test_custom_grid_size_k_too_long(self):
+        with self.assertRaises(Exception):
+            TicTacToe(3, 3, 4)
+    
+    def test_winner_k_in_a_row_on_larger_grid(self):
+        tic_tac_toe = TicTacToe(15, 15, 5, check_incremental=True)
+        tic_tac_toe.add_player(ManualPlayer, "X", "John")
+        tic_tac_toe.add_player(ManualPlayer, "O", "Jill")
+        for i in range(4):
+            # Place X on the anti-diagonal, filling in from both ends
+            tic_tac_toe.place(10 - [0, 4, 1, 3][i], 3 + [0, 4, 1, 3][i])
+            tic_tac_toe.place(i, 0)
+            self.assertIsNone(tic_tac_toe.winner)
+        tic_tac_toe.place(8, 5)
+        self.assertEqual("X", tic_tac_toe.winner.letter)
+        self.assertTrue(tic_tac_toe.game_over)
+    
+    def test_winner_rectangular_grid(self):
+        tic_tac_toe = TicTacToe(5, 3, 3, check_incremental=True)
+        tic_tac_toe.add_player(ManualPlayer, "X", "John")
+        tic_tac_toe.add_player(ManualPlayer, "O", "Jill")
+        for i in range(2):
+            tic_tac_toe.place(i + 2, 1)
+            tic_tac_toe.place(i, 0)
+        self.assertIsNone(tic_tac_toe.winner)
+        tic_tac_toe.place(4, 1)
+        self.assertEqual("X", tic_tac_toe.winner.letter)
+    
+    def test_position_key_matches_full_hash(self):
+        self.assertEqual(self._tic_tac_toe.position_key, 0)
+        self._tic_tac_toe.place(1, 1)
+        self._tic_tac_toe.place(0, 2)
+        boards = [cell_bit(1, 1, 3), cell_bit(0, 2, 3)]
+        self.assertEqual(self._tic_tac_toe.position_key, zobrist_hash(boards, 9))
+    
+    def test_position_key_same_for_transposed_moves(self):
+        self._tic_tac_toe.place(0, 0)
+        self._tic_tac_toe.place(1, 1)
+        self._tic_tac_toe.place(2, 2)
+
+        tic_tac_toe = TicTacToe()
+        tic_tac_toe.add_player(ManualPlayer, "X", "John")
+        tic_tac_toe.add_player(ManualPlayer, "O", "Jill")
+        tic_tac_toe.place(2, 2)
+        tic_tac_toe.place(1, 1)
+        tic_tac_toe.place(0, 0)
+
+        self.assertEqual(self._tic_tac_toe.position_key, tic_tac_toe.position_key)
+    
+    def test_position_key_reset(self):
+        self._tic_tac_toe.place(0, 0)
+        self.assertNotEqual(self._tic_tac_toe.position_key, 0)
+        self._tic_tac_toe.reset()
+        self.assertEqual(self._tic_tac_toe.position_key, 0)
+    
+    def test_place_invalid_move_keeps_turn(self):
+        self.assertTrue(self._tic_tac_toe.place(0, 0))
+        self.assertFalse(self._tic_tac_toe.place(0, 0))
+        self.assertFalse(self._tic_tac_toe.place(3, 0))
+        self.assertEqual(self._tic_tac_toe.current_player.letter, "O")
+        self.assertTrue(self._tic_tac_toe.place(1, 0))
+        self.assertEqual(self._tic_tac_toe.grid[0][1], "O")
+
+    def test_push_pop(self):
+        tic_tac_toe = TicTacToe(check_incremental=True)
+        tic_tac_toe.add_player(ManualPlayer, "X", "John")
+        tic_tac_toe.add_player(ManualPlayer, "O", "Jill")
+        rng = random.Random(0)
+
+        for _ in range(50):
+            states = []
+            while not tic_tac_toe.game_over:
+                states.append((tic_tac_toe.grid, tic_tac_toe.position_key,
+                               tic_tac_toe.current_player))
+                empty = [(x, y) for y in range(3) for x in range(3) if not tic_tac_toe.grid[y][x]]
+                tic_tac_toe.push(*rng.choice(empty))
+
+            self.assertRaises(Exception, tic_tac_toe.push, 0, 0)
+            for grid, key, player in reversed(states):
+                tic_tac_toe.pop()
+                self.assertEqual(tic_tac_toe.grid, grid)
+                self.assertEqual(tic_tac_toe.position_key, key)
+                self.assertIs(tic_tac_toe.current_player, player)
+                self.assertIsNone(tic_tac_toe.winner)
+                self.assertFalse(tic_tac_toe.game_over)
+
+        self.assertEqual(tic_tac_toe.moves, [])
+        self.assertRaises(Exception, tic_tac_toe.pop)
+
+    def test_push_invalid_move(self):
+        self._tic_tac_toe.push(0, 0)
+        self.assertRaises(Exception, self._tic_tac_toe.push, 0, 0)
+        self.assertRaises(Exception, self._tic_tac_toe.push, -1, 0)
+        self.assertEqual(self._tic_tac_toe.current_player.letter, "O")
+
+    def test_legal_moves(self):
+        self.assertEqual(list(self._tic_tac_toe.legal_moves()),
+                         [(x, y) for y in range(3) for x in range(3)])
+        self._tic_tac_toe.place(1, 1)
+        self._tic_tac_toe.place(0, 0)
+        self.assertEqual(list(self._tic_tac_toe.legal_moves()),
+                         [(1, 0), (2, 0), (0, 1), (2, 1), (0, 2), (1, 2), (2, 2)])
+        self.assertEqual(self._tic_tac_toe.empty, 0b111101110)
+        self._tic_tac_toe.pop()
+        self.assertEqual(self._tic_tac_toe.empty, 0b111101111)
+
+    def test_moves(self):
+        self._tic_tac_toe.place(1, 1)
+        self._tic_tac_toe.place(3, 0)
+        self._tic_tac_toe.place(0, 2)
+        self.assertEqual(self._tic_tac_toe.moves, [(1, 1), (0, 2)])
+        self._tic_tac_toe.reset()
+        self.assertEqual(self._tic_tac_toe.moves, [])
+    
     def _fill_grid(self):
         self._tic_tac_toe.place(1, 0)
         self._tic_tac_toe.place(0, 0)
@@ -1,34 +1,124 @@
 from typing import Type
 
+from tictactoe.bitboard import cell_bit
+from tictactoe.bitboard import cell_index
+from tictactoe.bitboard import full_mask
+from tictactoe.bitboard import has_win
+from tictactoe.bitboard import is_win_at
+from tictactoe.bitboard import iter_cells
+from tictactoe.board import Board
 from tictactoe.player import Player
+from tictactoe.zobrist import zobrist_keys
 
 GRID_SIZE = 3
 MIN_PLAYERS = 2
 MAX_PLAYERS = 2
+VALID_LETTERS = ["x", "o"]
 
 
 class TicTacToe:
     """
     Class for encapsulating the state of the game grid and performing actions
     on it.
+
+    The grid can be any width and height, with a win being k letters in a row
+    horizontally, vertically or diagonally. Wins and stalemates are tracked
+    incrementally as moves are placed: only the lines through the placed cell
+    are checked for a win, and the bitmask of empty cells is updated, which
+    also gives the legal moves without scanning the grid.
+
+    Arguments:
+        width (int): Width of the grid.
+        height (int): Height of the grid.
+        k (int): Number of letters in a row needed to win. Defaults to the
+            smaller of the width and height.
+        check_incremental (bool): If True, every read of :attr:`winner` and
+            :attr:`game_over` is also checked against a full scan of the
+            grid, and an exception is raised if they disagree.
     """
 
-    def __init__(self):
-        self.reset()
+    def __init__(self, width: int = GRID_SIZE, height: int = GRID_SIZE,
+                 k: int = None, check_incremental: bool = False):
+        if k is None:
+            k = min(width, height)
+
+        if width < 1 or height < 1:
+            raise Exception("Grid must have at least one row and column")
+
+        if not 1 <= k <= max(width, height):
+            raise Exception("Win length does not fit on the grid")
+
+        self._width = width
+        self._height = height
+        self._k = k
+        self._zobrist_keys = zobrist_keys(width * height, MAX_PLAYERS)
 
         self._players = []
-        self._current_player_idx = None
+        self._check_incremental = check_incremental
+
+        self.reset()
     
     @property
-    def grid(self) -> list[list[str]]:
+    def grid(self) -> Board:
+        """
+        Returns the grid, as an immutable :class:`~Board` that can be indexed
+        like a list of rows. The board is built from the player bitmasks the
+        first time it is read after a move.
+
+        Returns:
+            :class:`~Board`
+        """
+
+        if self._grid_view is None:
+            letters = [player.letter for player in self._players]
+            self._grid_view = Board.from_bitboards(self._width, self._height, letters,
+                                                   self._boards[:len(letters)])
+        return self._grid_view
+
+    @property
+    def width(self) -> int:
+        """
+        Returns the width of the grid.
+
+        Returns:
+            int
+        """
+
+        return self._width
+
+    @property
+    def height(self) -> int:
+        """
+        Returns the height of the grid.
+
+        Returns:
+            int
+        """
+
+        return self._height
+
+    @property
+    def k(self) -> int:
         """
-        Returns the grid.
+        Returns the number of letters in a row needed to win.
 
         Returns:
-            list[list[str]]
+            int
         """
 
-        return self._grid
+        return self._k
+
+    @property
+    def position_key(self) -> int:
+        """
+        Returns a 64-bit Zobrist hash of the current position. The hash is
+        updated as moves are placed, so reading it costs nothing.
+
+        Returns:
+            int
+        """
+
+        return self._hash
 
     @property
     def players(self) -> list[Player]:
@@ -41,6 +131,53 @@ class TicTacToe:
 
         return self._players
     
+    @property
+    def empty(self) -> int:
+        """
+        Returns the bitmask of the empty cells. It is updated as moves are
+        placed, so reading it costs nothing.
+
+        Returns:
+            int
+        """
+
+        return self._empty
+
+    def legal_moves(self):
+        """
+        Iterates over the empty cells, in row order, as (x, y) coordinates.
+
+        Returns:
+            Iterator[tuple[int]]
+        """
+
+        return iter_cells(self._empty, self._width)
+
+    @property
+    def moves(self) -> list[tuple[int]]:
+        """
+        Returns the moves placed so far, in order, as (x, y) coordinates.
+
+        Returns:
+            list[tuple[int]]
+        """
+
+        return list(self._moves)
+
+    @property
+    def current_player(self) -> Player | None:
+        """
+        Returns the player whose turn it is, or None if not enough players
+        have been added yet.
+
+        Returns:
+            :class:`~Player` or None
+        """
+
+        if len(self._players) < MIN_PLAYERS:
+            return None
+        return self._players[self._turn]
+    
     @property
     def winner(self) -> str | None:
         """
@@ -51,33 +188,14 @@ class TicTacToe:
             str or None
         """
 
-        diag_one = []
-        diag_two = []
+        winner = None
+        if self._winner_idx is not None:
+            winner = self._players[self._winner_idx]
 
-        for i in range(len(self.grid)):
-            # Check rows
-            if len(set(self._grid[i])) == 1 and not not self._grid[i][0]:
-                return self._get_player_from_letter(self._grid[i][0])
-            
-            # Check cols
-            col = []
-            for j in range(len(self.grid)):
-                col.append(self._grid[j][i])
-            if len(set(col)) == 1 and not not col[0]:
-                return self._get_player_from_letter(col[0])
+        if self._check_incremental and winner is not self._scan_winner():
+            raise Exception("Incremental winner does not match the grid")
 
-            diag_one.append(self._grid[i][i])
-            diag_two.append(self._grid[len(self.grid) - i - 1][i])
-        
-        # Check diagonal one
-        if len(set(diag_one)) == 1 and not not diag_one[0]:
-            return self._get_player_from_letter(diag_one[0])
-        
-        # Check diagonal two
-        if len(set(diag_two)) == 1 and not not diag_two[0]:
-            return self._get_player_from_letter(diag_two[0])
-        
-        return None
+        return winner
     
     @property
     def game_over(self) -> bool:
@@ -88,18 +206,18 @@ class TicTacToe:
             bool
         """
 
-        board_full = True
-        for i in range(len(self.grid)):
-            for j in range(len(self.grid)):
-                if not self._grid[i][j]:
-                    board_full = False
-        
-        return board_full or self.winner is not None
+        game_over = not self._empty or self._winner_idx is not None
+
+        if self._check_incremental and game_over != self._scan_game_over():
+            raise Exception("Incremental game over does not match the grid")
+
+        return game_over
     
     def place(self, x: int, y: int) -> bool:
         """
         Places the letter of the current player at the given coordinates.
-        Returns whether the move was successfully placed.
+        Returns whether the move was successfully placed. An invalid move
+        leaves the turn with the same player.
 
         Arguments:
             x (int): X grid coordinate.
@@ -111,21 +229,78 @@ class TicTacToe:
         
         if self.winner is not None:
             raise Exception("A winner has already been declared, please reset the game")
-    
-        if self._current_player_idx is None:
-            self._current_player_idx = 0
-        else:
-            self._current_player_idx = (self._current_player_idx + 1) % len(self._players)
-        
-        current_player = self._players[self._current_player_idx]
 
-        if self._is_valid_move(x, y):
-            self._grid[y][x] = current_player.letter
-            return True
-        
-        return False
+        if not self._is_valid_move(x, y):
+            return False
+
+        self.push(x, y)
+        return True
+
+    def push(self, x: int, y: int):
+        """
+        Places the letter of the current player at the given coordinates, so
+        that it can be taken back with :meth:`pop`. Unlike :meth:`place`,
+        raises an exception for an invalid move, and skips the checks made
+        by :attr:`winner` so searches can push and pop moves cheaply.
+
+        Arguments:
+            x (int): X grid coordinate.
+            y (int): Y grid coordinate.
+        """
+
+        if len(self._players) < MIN_PLAYERS:
+            raise Exception("Not enough players")
+
+        if self._winner_idx is not None:
+            raise Exception("A winner has already been declared, please reset the game")
+
+        if not self._is_valid_move(x, y):
+            raise Exception("Invalid move")
+
+        turn = self._turn
+        idx = cell_index(x, y, self._width)
+        self._boards[turn] |= 1 << idx
+        self._hash ^= self._zobrist_keys[turn][idx]
+        self._grid_view = None
+        self._empty ^= 1 << idx
+        self._moves.append((x, y))
+
+        # Only the lines through the placed cell can have been completed. This
+        # takes the place of keeping a running count of each player's letters
+        # on every line, which doesn't scale to m,n,k grids.
+        if is_win_at(self._boards[turn], x, y, self._width, self._height, self._k):
+            self._winner_idx = turn
+
+        self._turn = (turn + 1) % len(self._players)
+
+    def pop(self) -> tuple[int]:
+        """
+        Takes back the last move and returns its coordinates. The turn, win
+        state and position hash are restored to what they were before the
+        move.
+
+        Returns:
+            tuple[int]
+        """
+
+        if not self._moves:
+            raise Exception("No moves to take back")
+
+        x, y = self._moves.pop()
+        turn = (self._turn - 1) % len(self._players)
+        idx = cell_index(x, y, self._width)
+        self._boards[turn] &= ~(1 << idx)
+        self._hash ^= self._zobrist_keys[turn][idx]
+        self._grid_view = None
+        self._empty |= 1 << idx
 
-    def add_player(self, player_class: Type[Player], letter: str, name: str):
+        # No move can follow a win, so the game was undecided before this one
+        self._winner_idx = None
+        self._turn = turn
+
+        return x, y
+
+    def add_player(self, player_class: Type[Player], letter: str, name: str, **kwargs):
         """
         Adds a player to the game.
 
@@ -133,6 +308,8 @@ class TicTacToe:
             player_class: Class of player to add to the game.
             letter (str): Letter to use for the player.
             name (str): Name to use for the player.
+            **kwargs: Extra options passed on to the player class, such as
+                search settings for AI players.
         """
 
         if len(self._players) == MAX_PLAYERS:
@@ -142,19 +319,22 @@ class TicTacToe:
             if other_player.letter == letter:
                 raise Exception("Letter already used by another player")
 
-        self._players.append(player_class(len(self._players) + 1, letter, name))
+        self._players.append(player_class(len(self._players) + 1, letter, name, **kwargs))
+        self._grid_view = None
     
     def reset(self):
         """
-        Resets the game.
+        Resets the game. The first player added moves first again.
         """
 
-        self._grid = []
-        for i in range(GRID_SIZE):
-            row = []
-            for j in range(GRID_SIZE):
-                row.append("")
-            self._grid.append(row)
+        self._turn = 0
+
+        self._boards = [0] * MAX_PLAYERS
+        self._hash = 0
+        self._grid_view = None
+        self._empty = full_mask(self._width, self._height)
+        self._winner_idx = None
+        self._moves = []
     
     def _is_valid_move(self, x: int, y: int) -> bool:
         """
@@ -170,24 +350,34 @@ class TicTacToe:
             bool
         """
 
-        within_bounds = (0 <= x < len(self.grid)) and (0 <= y < len(self.grid))
+        within_bounds = (0 <= x < self._width) and (0 <= y < self._height)
         if within_bounds:
-            return not self._grid[y][x]
+            return bool(self._empty & cell_bit(x, y, self._width))
         return False
-    
-    def _get_player_from_letter(self, letter: str) -> Player:
+
+    def _scan_winner(self) -> Player | None:
         """
-        Returns the player corresponding with the given letter.
+        Returns the winner of the game by checking every winning line of the
+        grid, without using the incremental state.
 
-        Arguments:
-            letter (str): Letter to get the player of.
-        
         Returns:
-            :class:`~Player`
+            :class:`~Player` or None
         """
 
-        for player in self._players:
-            if player.letter == letter:
-                return player
+        for idx, board in enumerate(self._boards):
+            if has_win(board, self._width, self._height, self._k):
+                return self._players[idx]
 
         return None
+
+    def _scan_game_over(self) -> bool:
+        """
+        Returns whether the game is over by checking every cell and winning
+        line of the grid, without using the incremental state.
+
+        Returns:
+            bool
+        """
+
+        board_full = (self._boards[0] | self._boards[1]) == full_mask(self._width, self._height)
+        return board_full or self._scan_winner() is not None
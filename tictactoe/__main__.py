@@ -1,15 +1,67 @@
+import argparse
+import sys
+
 from tictactoe import TicTacToe
 from tictactoe import VALID_LETTERS
-from tictactoe.player.ai import AIPlayer
-from tictactoe.player.ai.easy import EasyAIPlayer
-from tictactoe.player.ai.medium import MediumAIPlayer
-from tictactoe.player.ai.hard import HardAIPlayer
-from tictactoe.player.manual import ManualPlayer
-from tictactoe.renderer.console import ConsoleRenderer
-from tictactoe.renderer.tkinter import TicTacToeRoot
+from tictactoe.registry import PLAYERS
+from tictactoe.registry import RENDERERS
+
+# Module of each command, imported only when the command is run or help is
+# asked for
+COMMANDS = {
+    "selfplay": "tictactoe.selfplay",
+    "analyze": "tictactoe.analyze",
+    "book": "tictactoe.book",
+    "serve": "tictactoe.server",
+    "tablebase": "tictactoe.tablebase",
+}
+
+
+def get_commands(argv: list[str]) -> list[str]:
+    """
+    Returns the names of the commands whose parsers are needed to parse the
+    given arguments: the command being run, every command when help is asked
+    for, or none when starting a game.
+
+    Arguments:
+        argv (list[str]): Command line arguments, without the program name.
+
+    Returns:
+        list[str]
+    """
+
+    if "-h" in argv or "--help" in argv:
+        return list(COMMANDS)
+
+    for arg in argv:
+        if arg in COMMANDS:
+            return [arg]
+
+    return []
 
 
-def main():
+def main(argv: list[str] = None):
+    if argv is None:
+        argv = sys.argv[1:]
+
+    parser = argparse.ArgumentParser(prog="python -m tictactoe",
+                                     description="Play Tic Tac Toe. With no command, starts a game.")
+    parser.add_argument("--renderer", choices=RENDERERS, default="console",
+                        help="how to show the game (default: console)")
+    parser.add_argument("--opponent", choices=PLAYERS, default="hard",
+                        help="second player (default: hard)")
+    subparsers = parser.add_subparsers()
+    for command in get_commands(argv):
+        __import__(COMMANDS[command], fromlist=["add_parser"]).add_parser(subparsers)
+    args = parser.parse_args(argv)
+
+    if hasattr(args, "command"):
+        args.command(args)
+    else:
+        play(args.renderer, args.opponent)
+
+
+def play(renderer: str = "console", opponent: str = "hard"):
     tic_tac_toe = TicTacToe()
 
     player1_name = input("Player 1's name: ")
@@ -17,42 +69,14 @@ def main():
     while player1_letter not in VALID_LETTERS:
         print("Invalid letter.")
         player1_letter = input("Player 1, would you like to be X or O? ").lower()
-    
+
     player2_name = input("Player 2's name: ")
     player2_letter = VALID_LETTERS[int(not bool(VALID_LETTERS.index(player1_letter)))]
 
-    player1 = ManualPlayer(1, player1_letter, player1_name)
-    player2 = HardAIPlayer(2, player2_letter, player2_name)
-
-    renderer = ConsoleRenderer(tic_tac_toe)
-    renderer.render()
-
-    while not tic_tac_toe.game_over:
-        move = player1.get_move(tic_tac_toe.grid)
-        while not tic_tac_toe.place(player1.letter, *move):
-            if isinstance(player1, AIPlayer):
-                print("An AI player picked an invalid move!", player2_name, "wins!")
-                return
-            print("Invalid move.")
-            move = player1.get_move(tic_tac_toe.grid)
-        renderer.render()
-
-        if not tic_tac_toe.game_over:
-            move = player2.get_move(tic_tac_toe.grid)
-            while not tic_tac_toe.place(player2.letter, *move):
-                if isinstance(player2, AIPlayer):
-                    print("An AI player picked an invalid move!", player1_name, "wins!")
-                    return
-                print("Invalid move.")
-                move = player2.get_move(tic_tac_toe.grid)
-            renderer.render()
-    
-    if tic_tac_toe.winner is None:
-        print("Stalemate!")
-    elif player1_letter == tic_tac_toe.winner:
-        print(player1_name, "wins!")
-    else:
-        print(player2_name, "wins!")
+    tic_tac_toe.add_player(PLAYERS["manual"], player1_letter, player1_name)
+    tic_tac_toe.add_player(PLAYERS[opponent], player2_letter, player2_name)
+
+    RENDERERS[renderer](tic_tac_toe).mainloop()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,373 @@
+"""
+Bulk analysis of positions. Reads one position per line and writes one JSON
+result per line, in the same order, with the winner, whether the game is over
+and optionally the best move from an AI. Run with:
+
+    python -m tictactoe analyze [FILE] [--ai negamax] [--workers N]
+
+Positions are either compact strings, with one character per cell in row
+order and ``.``, ``-`` or ``_`` for an empty cell (rows may be separated by
+``/``), or JSON objects with a ``grid`` of rows of letters, with empty
+strings for empty cells, as sent by the game server. Lines are parsed
+straight into bitboards rather than replaying moves through
+:class:`TicTacToe`, and are processed in chunks across worker processes with
+only a few chunks in flight, so memory use doesn't grow with the input.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.util import Finalize
+
+from tictactoe import VALID_LETTERS
+from tictactoe.bitboard import full_mask
+from tictactoe.bitboard import has_win
+from tictactoe.board import Board
+from tictactoe.registry import AI_PLAYERS
+from tictactoe.selfplay import parse_options
+
+EMPTY_CELLS = ".-_"
+ROW_SEPARATOR = "/"
+
+# Lines sent to a worker process at a time
+DEFAULT_CHUNK_SIZE = 2000
+
+# Chunks queued per worker process before waiting for results
+CHUNKS_PER_WORKER = 2
+
+
+class Analyzer:
+    """
+    Analyzes positions given as lines of text.
+
+    Arguments:
+        width (int): Width of the grid for compact strings without row
+            separators.
+        height (int): Height of the grid for compact strings without row
+            separators.
+        k (int): Number of letters in a row needed to win. Defaults to the
+            smaller of the width and height of each position.
+        letters (list[str]): Letters of the first and second player.
+        ai (str): Name of the AI that picks the best move, from
+            :data:`AI_PLAYERS`, or None to skip it.
+        options (dict): Extra options for the AI.
+
+    Call :meth:`close` when done to close the AI players it created.
+    """
+
+    def __init__(self, width: int = 3, height: int = 3, k: int = None,
+                 letters: list[str] = None, ai: str = None, options: dict = None):
+        if letters is None:
+            letters = VALID_LETTERS
+        first, second = (letter.lower() for letter in letters)
+        reserved = EMPTY_CELLS + ROW_SEPARATOR
+        if len(first) != 1 or len(second) != 1 or first == second or \
+                first in reserved or second in reserved:
+            raise Exception("Letters must be two different single characters")
+
+        self._width = width
+        self._height = height
+        self._k = k
+        self._letters = (first, second)
+        self._ai = ai
+        self._options = dict(options or {}, verbose=False)
+        self._players = {}
+
+        # Each table maps a player's letter to "1" and every other cell to "0",
+        # so a line converts to a bitboard with a single int() call
+        other = {c: "0" for c in EMPTY_CELLS}
+        self._tables = (
+            str.maketrans({first: "1", second: "0", **other}),
+            str.maketrans({first: "0", second: "1", **other}),
+        )
+        self._invalid = str.maketrans("", "", EMPTY_CELLS + first + second)
+
+        # Results are formatted by hand, as json.dumps is most of the cost of
+        # a position without an AI
+        self._winner_json = {letter: json.dumps(letter) for letter in (first, second, None)}
+
+    def analyze(self, line: str) -> str:
+        """
+        Analyzes a single position and returns the result as a JSON line,
+        without the line ending. Invalid positions give a result with an
+        ``error``.
+
+        Arguments:
+            line (str): The position.
+
+        Returns:
+            str
+        """
+
+        try:
+            boards, width, height = self._parse(line.strip())
+        except Exception as e:
+            return json.dumps({"error": str(e)})
+
+        k = self._k
+        if k is None:
+            k = min(width, height)
+        if not 1 <= k <= max(width, height):
+            return json.dumps({"error": "Win length does not fit on the grid"})
+
+        first, second = boards
+        first_count = first.bit_count()
+        second_count = second.bit_count()
+        if first_count - second_count not in (0, 1):
+            return json.dumps({"error": "Invalid number of letters for each player"})
+
+        winner = None
+        if has_win(first, width, height, k):
+            winner = self._letters[0]
+        if has_win(second, width, height, k):
+            if winner is not None:
+                return json.dumps({"error": "Both players have won"})
+            winner = self._letters[1]
+
+        game_over = winner is not None or (first | second) == full_mask(width, height)
+        result = (f'{{"winner": {self._winner_json[winner]}, '
+                  f'"game_over": {"true" if game_over else "false"}')
+
+        if self._ai is None:
+            return result + "}"
+        if game_over:
+            return result + ', "move": null}'
+
+        # An AI that can't handle the position, such as one built for another
+        # grid, fails the line rather than the whole stream
+        try:
+            x, y = self._get_move(boards, first_count - second_count, width, height, k)
+        except Exception as e:
+            return json.dumps({"error": str(e)})
+        return result + f', "move": [{x}, {y}]}}'
+
+    def analyze_lines(self, lines: list[str]) -> list[str]:
+        """
+        Analyzes a chunk of positions.
+
+        Arguments:
+            lines (list[str]): The positions.
+
+        Returns:
+            list[str]
+        """
+
+        return [self.analyze(line) for line in lines]
+
+    def _parse(self, line: str) -> tuple:
+        """
+        Parses a position into the bitboards of the first and second player,
+        along with the width and height of its grid.
+
+        Arguments:
+            line (str): The position, without surrounding whitespace.
+
+        Returns:
+            tuple
+        """
+
+        if line.startswith("{"):
+            grid = json.loads(line).get("grid")
+            if not isinstance(grid, list):
+                raise Exception("Expected a grid")
+            return self._parse_grid(grid)
+
+        line = line.lower()
+        if ROW_SEPARATOR in line:
+            rows = line.split(ROW_SEPARATOR)
+            width, height = len(rows[0]), len(rows)
+            if any(len(row) != width for row in rows):
+                raise Exception("Rows must all be the same length")
+            line = "".join(rows)
+        else:
+            width, height = self._width, self._height
+            if len(line) != width * height:
+                raise Exception(f"Expected {width * height} cells")
+
+        if not line or line.translate(self._invalid):
+            raise Exception("Unknown cell")
+
+        # Bit i is cell i, so the string is reversed to put cell 0 last
+        line = line[::-1]
+        return (
+            (int(line.translate(self._tables[0]), 2), int(line.translate(self._tables[1]), 2)),
+            width,
+            height,
+        )
+
+    def _parse_grid(self, grid: list[list[str]]) -> tuple:
+        """
+        Parses a grid of rows into the bitboards of the first and second
+        player, along with the width and height of the grid.
+
+        Arguments:
+            grid (list[list[str]]): The grid.
+
+        Returns:
+            tuple
+        """
+
+        if not grid or not grid[0]:
+            raise Exception("Grid must have at least one row and column")
+
+        width, height = len(grid[0]), len(grid)
+        boards = [0, 0]
+        bit = 1
+        for row in grid:
+            if len(row) != width:
+                raise Exception("Rows must all be the same length")
+            for cell in row:
+                if cell:
+                    cell = cell.lower()
+                    if cell not in self._letters:
+                        raise Exception("Unknown cell")
+                    boards[self._letters.index(cell)] |= bit
+                bit <<= 1
+
+        return tuple(boards), width, height
+
+    def close(self):
+        """
+        Closes the AI players created so far.
+        """
+
+        for player in self._players.values():
+            player.close()
+        self._players.clear()
+
+    def _get_move(self, boards: tuple[int], turn: int, width: int, height: int,
+                  k: int) -> tuple[int]:
+        """
+        Gets the best move for the player whose turn it is from the AI.
+
+        Arguments:
+            boards (tuple[int]): Bitboards of the first and second player.
+            turn (int): Index of the player whose turn it is.
+            width (int): Width of the grid.
+            height (int): Height of the grid.
+            k (int): Number of letters in a row needed to win.
+
+        Returns:
+            tuple[int]
+        """
+
+        letter = self._letters[turn]
+        key = (letter, k)
+        player = self._players.get(key)
+        if player is None:
+            player = AI_PLAYERS[self._ai](turn + 1, letter, self._ai, k=k, **self._options)
+            self._players[key] = player
+
+        return player.get_move(Board.from_bitboards(width, height, self._letters, boards))
+
+
+# Analyzer for each worker process, created by _init_worker
+_worker_analyzer = None
+
+
+def _init_worker(kwargs: dict):
+    global _worker_analyzer
+    _worker_analyzer = Analyzer(**kwargs)
+    # Worker processes exit without running atexit handlers, so the
+    # analyzer's players are closed from a multiprocessing finalizer
+    Finalize(None, _worker_analyzer.close, exitpriority=0)
+
+
+def _analyze_chunk(lines: list[str]) -> list[str]:
+    return _worker_analyzer.analyze_lines(lines)
+
+
+def analyze_stream(lines, workers: int = 1, chunk_size: int = DEFAULT_CHUNK_SIZE, **kwargs):
+    """
+    Analyzes positions from an iterable of lines, yielding the results in the
+    same order. Blank lines are skipped. With several workers, only a few
+    chunks per worker are read ahead of the results being yielded.
+
+    Arguments:
+        lines: Iterable of positions, such as an open file.
+        workers (int): Number of worker processes. With 1, positions are
+            analyzed in the calling process.
+        chunk_size (int): Number of lines sent to a worker at a time.
+        **kwargs: Options passed on to :class:`~Analyzer`.
+
+    Returns:
+        Iterator[str]
+    """
+
+    lines = (line for line in lines if line.strip())
+
+    if workers == 1:
+        analyzer = Analyzer(**kwargs)
+        try:
+            for line in lines:
+                yield analyzer.analyze(line)
+        finally:
+            analyzer.close()
+        return
+
+    chunks = iter(lambda: list(itertools.islice(lines, chunk_size)), [])
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(kwargs,)) as executor:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(_analyze_chunk, chunk))
+            if len(pending) >= workers * CHUNKS_PER_WORKER:
+                yield from pending.popleft().result()
+
+        while pending:
+            yield from pending.popleft().result()
+
+
+def add_parser(subparsers):
+    """
+    Adds the analyze command to the command line parser.
+
+    Arguments:
+        subparsers: Subparsers of the main command line parser.
+    """
+
+    parser = subparsers.add_parser("analyze", help="analyze positions in bulk",
+                                   description="Analyze positions, one per line.")
+    parser.add_argument("input", nargs="?", default="-",
+                        help="file of positions (default: standard input)")
+    parser.add_argument("--ai", choices=AI_PLAYERS, help="AI to pick the best move with")
+    parser.add_argument("--options", nargs="*", default=[], metavar="KEY=VALUE",
+                        help="options for the AI, e.g. max_depth=4")
+    parser.add_argument("--size", type=int, nargs=2, default=[3, 3], metavar=("WIDTH", "HEIGHT"),
+                        help="grid shape of compact positions without row separators "
+                             "(default: 3 3)")
+    parser.add_argument("--k", type=int, help="letters in a row needed to win "
+                                              "(default: the smaller of the width and height)")
+    parser.add_argument("--letters", nargs=2, default=VALID_LETTERS, metavar=("FIRST", "SECOND"),
+                        help="letters of the first and second player (default: x o)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="number of worker processes (default: one per CPU)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f"positions sent to a worker at a time (default: {DEFAULT_CHUNK_SIZE})")
+    parser.set_defaults(command=main)
+
+
+def main(args: argparse.Namespace):
+    """
+    Runs the analyze command, writing results to standard output.
+
+    Arguments:
+        args (:class:`~argparse.Namespace`): Parsed command line arguments.
+    """
+
+    width, height = args.size
+    kwargs = dict(width=width, height=height, k=args.k, letters=args.letters, ai=args.ai,
+                  options=parse_options(args.options))
+
+    f = sys.stdin if args.input == "-" else open(args.input)
+    try:
+        out = sys.stdout
+        for result in analyze_stream(f, args.workers, args.chunk_size, **kwargs):
+            out.write(result)
+            out.write("\n")
+    finally:
+        if f is not sys.stdin:
+            f.close()
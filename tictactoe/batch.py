@@ -0,0 +1,288 @@
+"""
+Vectorized simulator for playing many games at once with NumPy, for Monte
+Carlo statistics. All N boards are kept in one ``(N, height, width)`` int8
+array, where 0 is an empty cell, 1 is the first player and 2 is the second,
+and every step plays one move in every unfinished game.
+
+NumPy is required for this module, but not for the rest of the game.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+from tictactoe.bitboard import DIRECTIONS
+from tictactoe.bitboard import cell_index
+
+EMPTY = 0
+PLAYER_ONE = 1
+PLAYER_TWO = 2
+
+# Results of a game, as returned by :meth:`BatchSimulator.results`
+IN_PROGRESS = -1
+DRAW = 0
+
+
+@lru_cache(maxsize=None)
+def line_indices(width: int, height: int, k: int) -> np.ndarray:
+    """
+    Returns the flat cell indices of every winning line, as an ``(L, k)``
+    array. Lines are ordered horizontal first, then vertical, then the two
+    diagonals, each from the top left.
+
+    Arguments:
+        width (int): Width of the grid.
+        height (int): Height of the grid.
+        k (int): Number of letters in a row needed to win.
+
+    Returns:
+        :class:`~np.ndarray`
+    """
+
+    lines = []
+    for dx, dy in DIRECTIONS:
+        for y in range(height):
+            for x in range(width):
+                end_x, end_y = x + dx * (k - 1), y + dy * (k - 1)
+                if 0 <= end_x < width and 0 <= end_y < height:
+                    lines.append([cell_index(x + dx * i, y + dy * i, width) for i in range(k)])
+
+    indices = np.array(lines, dtype=np.intp)
+    indices.setflags(write=False)
+    return indices
+
+
+def winner_batch(boards: np.ndarray, k: int = None) -> np.ndarray:
+    """
+    Returns the winner of every board: 1 or 2 for the winning player, or 0 if
+    nobody has won.
+
+    Arguments:
+        boards (:class:`~np.ndarray`): ``(N, height, width)`` array of boards.
+        k (int): Number of letters in a row needed to win. Defaults to the
+            smaller of the width and height.
+
+    Returns:
+        :class:`~np.ndarray`
+    """
+
+    n, height, width = boards.shape
+    if k is None:
+        k = min(width, height)
+
+    cells = boards.reshape(n, -1)[:, line_indices(width, height, k)]
+
+    winners = np.zeros(n, dtype=np.int8)
+    for player in (PLAYER_ONE, PLAYER_TWO):
+        won = (cells == player).all(axis=2).any(axis=1)
+        winners[won] = player
+
+    return winners
+
+
+class BatchSimulator:
+    """
+    Plays N games at once. Players alternate every step, so every unfinished
+    game always has the same player to move.
+
+    Arguments:
+        n (int): Number of games.
+        width (int): Width of the grid.
+        height (int): Height of the grid.
+        k (int): Number of letters in a row needed to win. Defaults to the
+            smaller of the width and height.
+        seed (int): Seed for the random policy.
+    """
+
+    def __init__(self, n: int, width: int = 3, height: int = 3, k: int = None, seed: int = None):
+        if k is None:
+            k = min(width, height)
+
+        self._n = n
+        self._width = width
+        self._height = height
+        self._k = k
+        self._lines = line_indices(width, height, k)
+        self._rng = np.random.default_rng(seed)
+
+        self.reset()
+
+    @property
+    def boards(self) -> np.ndarray:
+        """
+        Returns the ``(N, height, width)`` array of boards.
+
+        Returns:
+            :class:`~np.ndarray`
+        """
+
+        return self._boards
+
+    @property
+    def current_player(self) -> int:
+        """
+        Returns the player to move in every unfinished game.
+
+        Returns:
+            int
+        """
+
+        return PLAYER_ONE if self._ply % 2 == 0 else PLAYER_TWO
+
+    @property
+    def active(self) -> np.ndarray:
+        """
+        Returns a boolean array of which games are still in progress.
+
+        Returns:
+            :class:`~np.ndarray`
+        """
+
+        return self._active
+
+    def results(self) -> np.ndarray:
+        """
+        Returns the result of every game: the winning player, 0 for a draw,
+        or -1 if still in progress.
+
+        Returns:
+            :class:`~np.ndarray`
+        """
+
+        results = self._winners.copy()
+        results[self._active] = IN_PROGRESS
+        return results
+
+    def reset(self):
+        """
+        Resets every game.
+        """
+
+        self._boards = np.zeros((self._n, self._height, self._width), dtype=np.int8)
+        self._winners = np.zeros(self._n, dtype=np.int8)
+        self._active = np.ones(self._n, dtype=bool)
+        self._ply = 0
+
+    def step(self, moves: np.ndarray):
+        """
+        Plays one move in every unfinished game, then checks them all for a
+        win or a full board. Moves for finished games are ignored.
+
+        Arguments:
+            moves (:class:`~np.ndarray`): Flat cell index of the move for
+                each game.
+        """
+
+        flat = self._boards.reshape(self._n, -1)
+        games = np.flatnonzero(self._active)
+        cells = moves[games]
+
+        if (flat[games, cells] != EMPTY).any():
+            raise Exception("A move was played on an occupied cell")
+
+        player = self.current_player
+        flat[games, cells] = player
+        self._ply += 1
+
+        # Only the player who just moved can have won
+        won = (flat[games][:, self._lines] == player).all(axis=2).any(axis=1)
+        self._winners[games[won]] = player
+
+        full = (flat[games] != EMPTY).all(axis=1)
+        self._active[games[won | full]] = False
+
+    def run(self, policy_one, policy_two) -> np.ndarray:
+        """
+        Plays every game to the end and returns the results, as from
+        :meth:`results`.
+
+        Arguments:
+            policy_one: Policy for the first player, such as
+                :meth:`random_moves`. Called with the simulator and returns
+                the flat cell index of each game's move.
+            policy_two: Policy for the second player.
+
+        Returns:
+            :class:`~np.ndarray`
+        """
+
+        while self._active.any():
+            policy = policy_one if self.current_player == PLAYER_ONE else policy_two
+            self.step(policy(self))
+
+        return self.results()
+
+    def random_moves(self) -> np.ndarray:
+        """
+        Policy picking a random empty cell in every game.
+
+        Returns:
+            :class:`~np.ndarray`
+        """
+
+        flat = self._boards.reshape(self._n, -1)
+        scores = self._rng.random(flat.shape)
+        scores[flat != EMPTY] = -1.0
+        return scores.argmax(axis=1)
+
+    def first_available_moves(self) -> np.ndarray:
+        """
+        Policy picking the first empty cell, row by row, in every game, like
+        :class:`~EasyAIPlayer`.
+
+        Returns:
+            :class:`~np.ndarray`
+        """
+
+        flat = self._boards.reshape(self._n, -1)
+        return (flat == EMPTY).argmax(axis=1)
+
+    def medium_moves(self) -> np.ndarray:
+        """
+        Policy following the :class:`~MediumAIPlayer` strategy in every game:
+        complete a line if possible, otherwise block the opponent from
+        completing one, otherwise pick the first empty cell.
+
+        Returns:
+            :class:`~np.ndarray`
+        """
+
+        player = self.current_player
+        opponent = PLAYER_TWO if player == PLAYER_ONE else PLAYER_ONE
+
+        moves = self.first_available_moves()
+        found = np.zeros(self._n, dtype=bool)
+
+        # Winning moves take priority over blocks, so look for them first and
+        # only fill in games without one
+        for letter in (player, opponent):
+            cells, has_move = self._completing_moves(letter)
+            use = has_move & ~found
+            moves[use] = cells[use]
+            found |= has_move
+
+        return moves
+
+    def _completing_moves(self, player: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Finds, in every game, the first line with k - 1 of the given player's
+        letters and one empty cell. Returns the flat index of that empty cell
+        and whether such a line was found.
+
+        Arguments:
+            player (int): Player to find completing moves for.
+
+        Returns:
+            tuple[:class:`~np.ndarray`]
+        """
+
+        flat = self._boards.reshape(self._n, -1)
+        cells = flat[:, self._lines]
+
+        empty = cells == EMPTY
+        completing = ((cells == player).sum(axis=2) == self._k - 1) & (empty.sum(axis=2) == 1)
+
+        has_move = completing.any(axis=1)
+        line = completing.argmax(axis=1)
+        offset = empty[np.arange(self._n), line].argmax(axis=1)
+        return self._lines[line, offset], has_move
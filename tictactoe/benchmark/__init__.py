@@ -0,0 +1 @@
+# __init__.py file needed for package discovery
@@ -0,0 +1,59 @@
+"""
+Runs the benchmark suite, writes the results as JSON and optionally compares
+them against a saved baseline. Run with:
+
+    python -m tictactoe.benchmark [--output FILE] [--baseline FILE] [--threshold 0.2]
+
+Exits with status 1 if any benchmark is slower than the baseline by more than
+the threshold.
+"""
+
+import argparse
+import json
+import sys
+
+from tictactoe.benchmark import suite
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(prog="python -m tictactoe.benchmark",
+                                     description="Benchmark the game engine and AI players.")
+    parser.add_argument("--output", default="benchmark.json",
+                        help="file to write the results to (default: benchmark.json)")
+    parser.add_argument("--baseline", help="results file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="allowed slowdown against the baseline, as a fraction (default: 0.2)")
+    parser.add_argument("--min-time", type=float, default=0.05,
+                        help="minimum length of each timing repeat in seconds (default: 0.05)")
+    parser.add_argument("--only", choices=["engine", "ais"],
+                        help="only run the engine or the AI benchmarks")
+    args = parser.parse_args()
+
+    results = suite.run(args.min_time, engine=args.only != "ais", ais=args.only != "engine")
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+
+    for name, seconds in results["results"].items():
+        print(f"{name:<32} {seconds * 1e6:>12.2f} us")
+
+    if args.baseline is None:
+        return 0
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+
+    regressions = suite.compare(results, baseline, args.threshold)
+    if not regressions:
+        print(f"No regressions against {args.baseline} (threshold {args.threshold:.0%})")
+        return 0
+
+    print(f"Regressions against {args.baseline} (threshold {args.threshold:.0%}):")
+    for name, baseline_seconds, seconds in regressions:
+        print(f"  {name}: {baseline_seconds * 1e6:.2f} us -> {seconds * 1e6:.2f} us "
+              f"({seconds / baseline_seconds - 1:+.0%})")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
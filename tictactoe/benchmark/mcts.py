@@ -0,0 +1,81 @@
+"""
+Measures how MCTS playout throughput scales with the number of worker
+processes. Run with:
+
+    python -m tictactoe.benchmark.mcts [--playouts N] [--workers 1 2 4 ...]
+"""
+
+import argparse
+import os
+import time
+
+from tictactoe import TicTacToe
+from tictactoe.player.ai.mcts import MCTSAIPlayer
+from tictactoe.player.manual import ManualPlayer
+
+
+def benchmark(width: int, height: int, k: int, playouts: int, workers: int,
+              repeats: int) -> float:
+    """
+    Times MCTS moves from the empty grid and returns the best playouts per
+    second seen. The worker processes are started before timing.
+
+    Arguments:
+        width (int): Width of the grid.
+        height (int): Height of the grid.
+        k (int): Number of letters in a row needed to win.
+        playouts (int): Number of playouts per move.
+        workers (int): Number of worker processes.
+        repeats (int): Number of moves to time.
+
+    Returns:
+        float
+    """
+
+    tic_tac_toe = TicTacToe(width, height, k)
+    tic_tac_toe.add_player(MCTSAIPlayer, "X", "AI", k=k, playouts=playouts,
+                           workers=workers, seed=0)
+    tic_tac_toe.add_player(ManualPlayer, "O", "Opponent")
+    ai = tic_tac_toe.players[0]
+
+    try:
+        # Warm up, so starting the processes isn't timed
+        ai._get_move(tic_tac_toe.grid)
+
+        best = 0.0
+        for _ in range(repeats):
+            start = time.perf_counter()
+            ai._get_move(tic_tac_toe.grid)
+            best = max(best, playouts / (time.perf_counter() - start))
+    finally:
+        ai.close()
+
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark MCTS scaling across worker processes.")
+    parser.add_argument("--size", type=int, nargs=3, default=[7, 7, 4],
+                        metavar=("WIDTH", "HEIGHT", "K"), help="grid shape (default: 7 7 4)")
+    parser.add_argument("--playouts", type=int, default=8000,
+                        help="playouts per move (default: 8000)")
+    parser.add_argument("--workers", type=int, nargs="+",
+                        default=sorted({1, 2, 4, os.cpu_count() or 1}),
+                        help="worker counts to measure")
+    parser.add_argument("--repeats", type=int, default=3,
+                        help="timed moves per worker count (default: 3)")
+    args = parser.parse_args()
+
+    print(f"{'workers':>8} {'playouts/s':>12} {'speedup':>8} {'efficiency':>11}")
+
+    baseline = None
+    for workers in args.workers:
+        rate = benchmark(*args.size, args.playouts, workers, args.repeats)
+        if baseline is None:
+            baseline = rate / workers
+        speedup = rate / baseline
+        print(f"{workers:>8} {rate:>12.0f} {speedup:>8.2f} {speedup / workers:>11.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,203 @@
+"""
+Benchmarks of the game engine and AI players, timed on a fixed corpus of
+positions so results can be compared between runs.
+"""
+
+import platform
+import time
+import timeit
+
+from tictactoe import TicTacToe
+from tictactoe.player.ai.easy import EasyAIPlayer
+from tictactoe.player.ai.hard import HardAIPlayer
+from tictactoe.player.ai.medium import MediumAIPlayer
+from tictactoe.player.ai.negamax import NegamaxAIPlayer
+from tictactoe.player.manual import ManualPlayer
+
+# Format version of the results file
+RESULTS_VERSION = 1
+
+# Grid shapes, as (width, height, k), and a fixed game on each, played until
+# just before it would end
+GAMES = {
+    "3x3": ((3, 3, 3), [(1, 1), (0, 0), (2, 0), (0, 2), (0, 1), (2, 1), (1, 0), (1, 2)]),
+    "5x5": ((5, 5, 5), [(2, 2), (0, 0), (1, 1), (3, 3), (0, 4), (4, 0), (1, 3), (3, 1),
+                        (0, 2), (4, 2), (2, 0), (2, 4), (1, 0), (3, 0), (0, 1)]),
+    "15x15": ((15, 15, 5), [(7, 7), (8, 8), (6, 7), (8, 7), (6, 6), (8, 6), (5, 5), (8, 9),
+                            (8, 5), (4, 4), (7, 6), (9, 6), (5, 8), (7, 8), (6, 5), (4, 8)]),
+}
+
+# AI players timed on each grid, with the number of moves into the game of
+# each position in the corpus
+AI_PLAYERS = {
+    "easy": (EasyAIPlayer, {}),
+    "medium": (MediumAIPlayer, {}),
+    "hard": (HardAIPlayer, {}),
+    "negamax": (NegamaxAIPlayer, {}),
+}
+AI_GRIDS = ["3x3", "5x5"]
+AI_POSITIONS = [0, 1, 2, 4]
+
+
+def _new_game(grid: str) -> TicTacToe:
+    """
+    Creates a game on the given grid with two manual players added.
+
+    Arguments:
+        grid (str): Name of the grid, from :data:`GAMES`.
+
+    Returns:
+        :class:`~TicTacToe`
+    """
+
+    shape, _ = GAMES[grid]
+    tic_tac_toe = TicTacToe(*shape)
+    tic_tac_toe.add_player(ManualPlayer, "X", "Player 1")
+    tic_tac_toe.add_player(ManualPlayer, "O", "Player 2")
+    return tic_tac_toe
+
+
+def _time(func, min_time: float) -> float:
+    """
+    Returns the fastest time in seconds of a single call of the given
+    function, over several repeats each lasting at least the given time.
+
+    Arguments:
+        func: Function to time, called with no arguments.
+        min_time (float): Minimum length of each repeat, in seconds.
+
+    Returns:
+        float
+    """
+
+    timer = timeit.Timer(func)
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= min_time:
+            break
+        number *= 2
+
+    return min([elapsed] + timer.repeat(repeat=4, number=number)) / number
+
+
+def benchmark_engine(min_time: float) -> dict[str, float]:
+    """
+    Times :meth:`TicTacToe.place`, :attr:`TicTacToe.winner`,
+    :attr:`TicTacToe.game_over` and :meth:`TicTacToe.reset` on each grid.
+
+    Arguments:
+        min_time (float): Minimum length of each timing repeat, in seconds.
+
+    Returns:
+        dict[str, float]
+    """
+
+    results = {}
+    for grid, (_, moves) in GAMES.items():
+        tic_tac_toe = _new_game(grid)
+
+        reset = _time(tic_tac_toe.reset, min_time)
+
+        def play():
+            tic_tac_toe.reset()
+            for move in moves:
+                tic_tac_toe.place(*move)
+
+        game = _time(play, min_time)
+
+        results[f"engine.reset.{grid}"] = reset
+        results[f"engine.place.{grid}"] = max(game - reset, 0.0) / len(moves)
+        results[f"engine.winner.{grid}"] = _time(lambda: tic_tac_toe.winner, min_time)
+        results[f"engine.game_over.{grid}"] = _time(lambda: tic_tac_toe.game_over, min_time)
+
+    return results
+
+
+def benchmark_ais(min_time: float) -> dict[str, float]:
+    """
+    Times ``get_move`` of each AI player on each position of the corpus. A
+    new player is created for every call, so players that cache results
+    between moves are timed from cold.
+
+    Arguments:
+        min_time (float): Minimum length of each timing repeat, in seconds.
+
+    Returns:
+        dict[str, float]
+    """
+
+    results = {}
+    for name, (player_class, options) in AI_PLAYERS.items():
+        for grid in AI_GRIDS:
+            _, moves = GAMES[grid]
+            for num_moves in AI_POSITIONS:
+                tic_tac_toe = _new_game(grid)
+                for move in moves[:num_moves]:
+                    tic_tac_toe.place(*move)
+                board = tic_tac_toe.grid
+
+                def get_move():
+                    player_class(1 + num_moves % 2, "X" if num_moves % 2 == 0 else "O", name,
+                                 verbose=False, **options).get_move(board)
+
+                results[f"ai.{name}.{grid}.move{num_moves}"] = _time(get_move, min_time)
+
+    return results
+
+
+def run(min_time: float = 0.05, engine: bool = True, ais: bool = True) -> dict:
+    """
+    Runs the benchmarks and returns the results, ready to be written as JSON.
+    Each result is the time in seconds of a single call.
+
+    Arguments:
+        min_time (float): Minimum length of each timing repeat, in seconds.
+        engine (bool): Whether to run the engine benchmarks.
+        ais (bool): Whether to run the AI benchmarks.
+
+    Returns:
+        dict
+    """
+
+    results = {}
+    if engine:
+        results.update(benchmark_engine(min_time))
+    if ais:
+        results.update(benchmark_ais(min_time))
+
+    return {
+        "version": RESULTS_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": results,
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list[tuple[str, float, float]]:
+    """
+    Compares results against a baseline and returns the benchmarks that got
+    slower by more than the threshold, as (name, baseline time, new time).
+    Benchmarks missing from either side are skipped.
+
+    Arguments:
+        results (dict): Results from :func:`run`.
+        baseline (dict): Baseline results from :func:`run`.
+        threshold (float): Allowed slowdown, as a fraction of the baseline
+            time. 0.2 allows benchmarks to be up to 20% slower.
+
+    Returns:
+        list[tuple]
+    """
+
+    if baseline.get("version") != RESULTS_VERSION:
+        raise Exception("Baseline was written by a different version of the benchmarks")
+
+    regressions = []
+    for name, seconds in results["results"].items():
+        baseline_seconds = baseline["results"].get(name)
+        if baseline_seconds and seconds > baseline_seconds * (1 + threshold):
+            regressions.append((name, baseline_seconds, seconds))
+
+    return regressions
@@ -0,0 +1,167 @@
+"""
+Helpers for representing the grid as integer bitmasks. Each player's letters
+are stored in a single int, where cell (x, y) of a grid with the given width
+is bit ``y * width + x``.
+"""
+
+from functools import lru_cache
+
+# Directions of the lines through a cell: horizontal, vertical, and the two
+# diagonals
+DIRECTIONS = ((1, 0), (0, 1), (1, 1), (1, -1))
+
+
+def cell_index(x: int, y: int, width: int) -> int:
+    """
+    Returns the bit index of the cell at the given grid coordinates.
+
+    Arguments:
+        x (int): X grid coordinate.
+        y (int): Y grid coordinate.
+        width (int): Width of the grid.
+
+    Returns:
+        int
+    """
+
+    return y * width + x
+
+
+def cell_bit(x: int, y: int, width: int) -> int:
+    """
+    Returns the bitmask for the cell at the given grid coordinates.
+
+    Arguments:
+        x (int): X grid coordinate.
+        y (int): Y grid coordinate.
+        width (int): Width of the grid.
+
+    Returns:
+        int
+    """
+
+    return 1 << cell_index(x, y, width)
+
+
+def full_mask(width: int, height: int) -> int:
+    """
+    Returns the bitmask with every cell of the grid set.
+
+    Arguments:
+        width (int): Width of the grid.
+        height (int): Height of the grid.
+
+    Returns:
+        int
+    """
+
+    return (1 << (width * height)) - 1
+
+
+def iter_cells(mask: int, width: int):
+    """
+    Iterates over the cells set in a bitmask, in row order, as (x, y)
+    coordinates. Only the set bits are visited.
+
+    Arguments:
+        mask (int): The bitmask.
+        width (int): Width of the grid.
+
+    Returns:
+        Iterator[tuple[int]]
+    """
+
+    while mask:
+        low = mask & -mask
+        idx = low.bit_length() - 1
+        yield idx % width, idx // width
+        mask ^= low
+
+
+@lru_cache(maxsize=None)
+def win_masks(width: int, height: int, k: int) -> tuple[int]:
+    """
+    Returns the bitmasks of every winning line on the grid, i.e. every run of
+    k cells in a row, column or diagonal. The masks are only computed once per
+    grid shape.
+
+    Arguments:
+        width (int): Width of the grid.
+        height (int): Height of the grid.
+        k (int): Number of letters in a row needed to win.
+
+    Returns:
+        tuple[int]
+    """
+
+    masks = []
+
+    for y in range(height):
+        for x in range(width):
+            for dx, dy in DIRECTIONS:
+                end_x, end_y = x + dx * (k - 1), y + dy * (k - 1)
+                if not (0 <= end_x < width and 0 <= end_y < height):
+                    continue
+
+                mask = 0
+                for i in range(k):
+                    mask |= cell_bit(x + dx * i, y + dy * i, width)
+                masks.append(mask)
+
+    return tuple(masks)
+
+
+def has_win(board: int, width: int, height: int, k: int) -> bool:
+    """
+    Returns whether the given player bitmask covers any winning line. This
+    checks the whole grid, see :func:`is_win_at` for checking a single move.
+
+    Arguments:
+        board (int): Bitmask of the cells held by a player.
+        width (int): Width of the grid.
+        height (int): Height of the grid.
+        k (int): Number of letters in a row needed to win.
+
+    Returns:
+        bool
+    """
+
+    for mask in win_masks(width, height, k):
+        if board & mask == mask:
+            return True
+
+    return False
+
+
+def is_win_at(board: int, x: int, y: int, width: int, height: int, k: int) -> bool:
+    """
+    Returns whether the given player bitmask has k in a row through the cell
+    at the given grid coordinates. Only the four lines through that cell are
+    walked, so this costs O(k) regardless of the size of the grid.
+
+    Arguments:
+        board (int): Bitmask of the cells held by a player.
+        x (int): X grid coordinate.
+        y (int): Y grid coordinate.
+        width (int): Width of the grid.
+        height (int): Height of the grid.
+        k (int): Number of letters in a row needed to win.
+
+    Returns:
+        bool
+    """
+
+    for dx, dy in DIRECTIONS:
+        count = 1
+        for step_x, step_y in ((dx, dy), (-dx, -dy)):
+            cur_x, cur_y = x + step_x, y + step_y
+            while (count < k and 0 <= cur_x < width and 0 <= cur_y < height and
+                   board >> cell_index(cur_x, cur_y, width) & 1):
+                count += 1
+                cur_x += step_x
+                cur_y += step_y
+
+        if count >= k:
+            return True
+
+    return False
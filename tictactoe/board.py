@@ -0,0 +1,279 @@
+"""
+Immutable board positions, handed to players in place of a mutable grid.
+"""
+
+from tictactoe.bitboard import cell_bit
+from tictactoe.bitboard import full_mask
+from tictactoe.bitboard import iter_cells
+
+
+
+class Board:
+    """
+    An immutable position, stored as a single integer with 2 bits per cell.
+    The low ``width * height`` bits are the first player's letters and the
+    next ``width * height`` bits are the second player's, so each player's
+    bitmask is a shift and a mask away.
+
+    Boards read like the old nested list grid: ``board[y][x]`` is the letter
+    at (x, y), or an empty string, and ``len(board)`` is the height. Rows are
+    tuples built the first time they are read. Boards compare equal and hash
+    the same when their shape, letters and cells match, so they can be used
+    as dictionary keys.
+
+    Arguments:
+        width (int): Width of the grid.
+        height (int): Height of the grid.
+        letters (tuple[str]): Letters of the players, in turn order.
+        cells (int): The packed cells.
+    """
+
+    __slots__ = ("_width", "_height", "_letters", "_cells", "_rows", "_hash")
+
+    def __init__(self, width: int, height: int, letters: tuple[str] = (), cells: int = 0):
+        self._width = width
+        self._height = height
+        self._letters = tuple(letters)
+        self._cells = cells
+        self._rows = None
+        self._hash = None
+
+    @classmethod
+    def from_bitboards(cls, width: int, height: int, letters: tuple[str],
+                       boards: list[int]) -> "Board":
+        """
+        Creates a board from the bitmask of the cells held by each player.
+
+        Arguments:
+            width (int): Width of the grid.
+            height (int): Height of the grid.
+            letters (tuple[str]): Letters of the players, in turn order.
+            boards (list[int]): Bitmask of the cells held by each player.
+
+        Returns:
+            :class:`~Board`
+        """
+
+        num_cells = width * height
+        cells = 0
+        for idx, board in enumerate(boards):
+            cells |= board << (idx * num_cells)
+        return cls(width, height, letters, cells)
+
+    @property
+    def width(self) -> int:
+        """
+        Returns the width of the grid.
+
+        Returns:
+            int
+        """
+
+        return self._width
+
+    @property
+    def height(self) -> int:
+        """
+        Returns the height of the grid.
+
+        Returns:
+            int
+        """
+
+        return self._height
+
+    @property
+    def letters(self) -> tuple[str]:
+        """
+        Returns the letters of the players, in turn order.
+
+        Returns:
+            tuple[str]
+        """
+
+        return self._letters
+
+    @property
+    def occupied(self) -> int:
+        """
+        Returns the bitmask of the cells held by any player.
+
+        Returns:
+            int
+        """
+
+        num_cells = self._width * self._height
+        mask = full_mask(self._width, self._height)
+        occupied = 0
+        for idx in range(len(self._letters)):
+            occupied |= self._cells >> (idx * num_cells) & mask
+        return occupied
+
+    @property
+    def empty(self) -> int:
+        """
+        Returns the bitmask of the empty cells.
+
+        Returns:
+            int
+        """
+
+        return full_mask(self._width, self._height) & ~self.occupied
+
+    def legal_moves(self):
+        """
+        Iterates over the empty cells, in row order, as (x, y) coordinates.
+
+        Returns:
+            Iterator[tuple[int]]
+        """
+
+        return iter_cells(self.empty, self._width)
+
+    def bitboard(self, letter: str) -> int:
+        """
+        Returns the bitmask of the cells holding the given letter.
+
+        Arguments:
+            letter (str): The letter.
+
+        Returns:
+            int
+        """
+
+        if letter not in self._letters:
+            return 0
+
+        num_cells = self._width * self._height
+        idx = self._letters.index(letter)
+        return self._cells >> (idx * num_cells) & full_mask(self._width, self._height)
+
+    def get(self, x: int, y: int) -> str:
+        """
+        Returns the letter at the given coordinates, or an empty string.
+
+        Arguments:
+            x (int): X grid coordinate.
+            y (int): Y grid coordinate.
+
+        Returns:
+            str
+        """
+
+        bit = cell_bit(x, y, self._width)
+        num_cells = self._width * self._height
+        for idx, letter in enumerate(self._letters):
+            if self._cells >> (idx * num_cells) & bit:
+                return letter
+        return ""
+
+    def with_move(self, x: int, y: int, letter: str) -> "Board":
+        """
+        Returns a new board with the given letter placed at the given
+        coordinates. This board is left unchanged.
+
+        Arguments:
+            x (int): X grid coordinate.
+            y (int): Y grid coordinate.
+            letter (str): Letter to place.
+
+        Returns:
+            :class:`~Board`
+        """
+
+        if not (0 <= x < self._width and 0 <= y < self._height):
+            raise Exception("Move is outside the grid")
+        if letter not in self._letters:
+            raise Exception("Unknown letter")
+
+        bit = cell_bit(x, y, self._width)
+        if self.occupied & bit:
+            raise Exception("Cell is already taken")
+
+        shift = self._letters.index(letter) * self._width * self._height
+        return Board(self._width, self._height, self._letters, self._cells | bit << shift)
+
+    def __getitem__(self, y: int) -> tuple[str]:
+        if self._rows is None:
+            self._rows = self._build_rows()
+        return self._rows[y]
+
+    def __len__(self) -> int:
+        return self._height
+
+    def __iter__(self):
+        if self._rows is None:
+            self._rows = self._build_rows()
+        return iter(self._rows)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Board):
+            return NotImplemented
+        return (self._cells == other._cells and self._width == other._width
+                and self._height == other._height and self._letters == other._letters)
+
+    def __hash__(self) -> int:
+        if self._hash is None:
+            self._hash = hash((self._width, self._height, self._letters, self._cells))
+        return self._hash
+
+    def __repr__(self) -> str:
+        rows = "/".join("".join(cell or "." for cell in row) for row in self)
+        return f"Board({self._width}x{self._height}, {rows!r})"
+
+    def __getstate__(self):
+        return self._width, self._height, self._letters, self._cells
+
+    def __setstate__(self, state):
+        self._width, self._height, self._letters, self._cells = state
+        self._rows = None
+        self._hash = None
+
+    def _build_rows(self) -> tuple[tuple[str]]:
+        """
+        Builds the rows of letters from the packed cells.
+
+        Returns:
+            tuple[tuple[str]]
+        """
+
+        width = self._width
+        num_cells = width * self._height
+        mask = full_mask(width, self._height)
+
+        # Number each cell with its player, counting from 1, visiting only
+        # the occupied cells
+        codes = [0] * num_cells
+        for idx in range(len(self._letters)):
+            board = self._cells >> (idx * num_cells) & mask
+            while board:
+                low = board & -board
+                codes[low.bit_length() - 1] = idx + 1
+                board ^= low
+
+        symbols = ("",) + self._letters
+        cells = [symbols[code] for code in codes]
+        return tuple(tuple(cells[i:i + width]) for i in range(0, num_cells, width))
+
+
+def get_changed_cells(old: Board | None, new: Board) -> int:
+    """
+    Returns the bitmask of the cells that differ between two boards of the
+    same shape. With no old board, every occupied cell of the new board has
+    changed.
+
+    Arguments:
+        old (:class:`~Board`): Board last drawn, or None.
+        new (:class:`~Board`): Board to draw.
+
+    Returns:
+        int
+    """
+
+    if old is None:
+        return new.occupied
+
+    changed = 0
+    for letter in set(old.letters) | set(new.letters):
+        changed |= old.bitboard(letter) ^ new.bitboard(letter)
+    return changed
@@ -0,0 +1,320 @@
+"""
+Opening books mined from game records. For every position in the first few
+plies of the recorded games, the book stores each move played from it along
+with how those games ended for the player making the move. Positions are
+stored once for all their rotations and reflections.
+
+A book file has a header giving the grid shape it was built for, followed by
+fixed-size entries sorted by position key and move, so a position is found
+with a binary search of the memory-mapped file. Build a book with:
+
+    python -m tictactoe book RECORD [RECORD ...] [--output FILE] [--plies N]
+"""
+
+import argparse
+import mmap
+import os
+import struct
+
+from tictactoe.record import GameReader
+from tictactoe.record import RESULT_DRAW
+from tictactoe.record import RESULT_UNFINISHED
+from tictactoe.symmetry import canonicalize
+from tictactoe.symmetry import to_canonical
+from tictactoe.symmetry import to_original
+from tictactoe.symmetry import transform_board
+from tictactoe.symmetry import transforms
+from tictactoe.zobrist import zobrist_hash
+
+MAGIC = b"TTTB"
+VERSION = 1
+
+DEFAULT_PATH = "book.bin"
+DEFAULT_PLIES = 6
+
+# Magic, version, width, height, k, plies and number of entries
+BOOK_HEADER = struct.Struct("<4sBBBBBI")
+
+# Position key, move in the canonical position, wins, draws and losses
+BOOK_ENTRY = struct.Struct("<QHIII")
+
+# Books loaded so far, by path and modification time, shared by every player
+_books = {}
+
+
+def get_key(mine: int, theirs: int, width: int, height: int) -> tuple[int, int]:
+    """
+    Returns the 64-bit book key of a position, the Zobrist hash of its
+    canonical form, along with the symmetry used to reach the canonical
+    form.
+
+    Arguments:
+        mine (int): Bitmask of the cells held by the side to move.
+        theirs (int): Bitmask of the cells held by the opponent.
+        width (int): Width of the grid.
+        height (int): Height of the grid.
+
+    Returns:
+        tuple[int]
+    """
+
+    mine, theirs, transform = canonicalize(mine, theirs, width, height)
+    return zobrist_hash([mine, theirs], width * height), transform
+
+
+def _canonical_move(mine: int, theirs: int, idx: int, width: int, height: int) -> int:
+    """
+    Returns the smallest bit index equivalent to the given move under the
+    symmetries that leave the position unchanged, so symmetric moves from
+    a symmetric position, such as the edges around a centre letter, share a
+    book entry.
+
+    Arguments:
+        mine (int): Bitmask of the cells held by the side to move.
+        theirs (int): Bitmask of the cells held by the opponent.
+        idx (int): Bit index of the move.
+        width (int): Width of the grid.
+        height (int): Height of the grid.
+
+    Returns:
+        int
+    """
+
+    best = idx
+    for perm in transforms(width, height):
+        if transform_board(mine, perm) == mine and transform_board(theirs, perm) == theirs:
+            best = min(best, perm[idx])
+
+    return best
+
+
+def build_book(records: list[str], path: str = DEFAULT_PATH, plies: int = DEFAULT_PLIES,
+               min_games: int = 1) -> int:
+    """
+    Builds an opening book from the finished games in the given record files
+    and writes it to the given path. Every game in the records must be on the
+    same grid. Returns the number of entries written.
+
+    Arguments:
+        records (list[str]): Paths of record files.
+        path (str): Path to write the book to.
+        plies (int): Number of plies from the start of each game to include.
+        min_games (int): Moves played in fewer games than this are left out.
+
+    Returns:
+        int
+    """
+
+    shape = None
+    stats = {}
+    for record in records:
+        with GameReader(record) as reader:
+            for game in reader:
+                if game.result == RESULT_UNFINISHED:
+                    continue
+
+                if shape is None:
+                    shape = (game.width, game.height, game.k)
+                elif shape != (game.width, game.height, game.k):
+                    raise Exception("Every game in an opening book must be on the same grid")
+
+                width, height = game.width, game.height
+                boards = [0, 0]
+                for ply, (x, y) in enumerate(game.moves[:plies]):
+                    turn = ply % 2
+                    mine, theirs, transform = canonicalize(boards[turn], boards[1 - turn],
+                                                           width, height)
+                    key = zobrist_hash([mine, theirs], width * height)
+                    move = _canonical_move(mine, theirs,
+                                           to_canonical(y * width + x, transform, width, height),
+                                           width, height)
+
+                    counts = stats.setdefault((key, move), [0, 0, 0])
+                    if game.result == RESULT_DRAW:
+                        counts[1] += 1
+                    elif game.winner == turn:
+                        counts[0] += 1
+                    else:
+                        counts[2] += 1
+
+                    boards[turn] |= 1 << (y * width + x)
+
+    if shape is None:
+        raise Exception("No finished games to build the book from")
+
+    entries = sorted((key, move, *counts) for (key, move), counts in stats.items()
+                     if sum(counts) >= min_games)
+
+    with open(path, "wb") as f:
+        f.write(BOOK_HEADER.pack(MAGIC, VERSION, *shape, plies, len(entries)))
+        for entry in entries:
+            f.write(BOOK_ENTRY.pack(*entry))
+
+    return len(entries)
+
+
+def load_book(path: str) -> "OpeningBook":
+    """
+    Loads the book at the given path, reusing it if it has already been
+    loaded and hasn't been rebuilt since. Older loads of a rebuilt book are
+    closed, as the file they map has been rewritten.
+
+    Arguments:
+        path (str): Path of the book.
+
+    Returns:
+        :class:`~OpeningBook`
+    """
+
+    # A missing book is reported by OpeningBook
+    try:
+        key = (path, os.stat(path).st_mtime_ns)
+    except OSError:
+        key = (path, None)
+
+    book = _books.get(key)
+    if book is None:
+        for old_key in [old_key for old_key in _books if old_key[0] == path]:
+            _books.pop(old_key).close()
+        book = OpeningBook(path)
+        _books[key] = book
+    return book
+
+
+class OpeningBook:
+    """
+    An opening book, read through a memory map.
+
+    Arguments:
+        path (str): Path of the book.
+    """
+
+    def __init__(self, path: str):
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size < BOOK_HEADER.size:
+                raise Exception("Not an opening book")
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            magic, version, width, height, k, plies, count = \
+                BOOK_HEADER.unpack_from(self._data)
+            if magic != MAGIC:
+                raise Exception("Not an opening book")
+            if version != VERSION:
+                raise Exception("Opening book was written by a different version")
+            if len(self._data) != BOOK_HEADER.size + count * BOOK_ENTRY.size:
+                raise Exception("Opening book is the wrong size, please rebuild it")
+        except BaseException:
+            self.close()
+            raise
+
+        self.width = width
+        self.height = height
+        self.k = k
+        self.plies = plies
+        self._count = count
+
+    def __len__(self) -> int:
+        return self._count
+
+    def lookup(self, mine: int, theirs: int) -> list[tuple[int, int, int, int]]:
+        """
+        Returns the moves recorded for the given position, as (bit index,
+        wins, draws, losses) for the side to move.
+
+        Arguments:
+            mine (int): Bitmask of the cells held by the side to move.
+            theirs (int): Bitmask of the cells held by the opponent.
+
+        Returns:
+            list[tuple[int]]
+        """
+
+        key, transform = get_key(mine, theirs, self.width, self.height)
+
+        # Find the first entry for the key
+        low, high = 0, self._count
+        while low < high:
+            middle = (low + high) // 2
+            if self._entry(middle)[0] < key:
+                low = middle + 1
+            else:
+                high = middle
+
+        moves = []
+        for i in range(low, self._count):
+            entry_key, move, wins, draws, losses = self._entry(i)
+            if entry_key != key:
+                break
+            moves.append((to_original(move, transform, self.width, self.height),
+                          wins, draws, losses))
+
+        return moves
+
+    def get_move(self, mine: int, theirs: int, min_games: int = 1) -> int | None:
+        """
+        Returns the bit index of the move with the best record for the side
+        to move, scoring a draw as half a win, or None if the position isn't
+        in the book.
+
+        Arguments:
+            mine (int): Bitmask of the cells held by the side to move.
+            theirs (int): Bitmask of the cells held by the opponent.
+            min_games (int): Moves played in fewer games than this are
+                ignored.
+
+        Returns:
+            int or None
+        """
+
+        best = None
+        best_score = -1.0
+        for idx, wins, draws, losses in self.lookup(mine, theirs):
+            games = wins + draws + losses
+            if games < min_games or (mine | theirs) >> idx & 1:
+                continue
+
+            score = (wins + draws / 2) / games
+            if score > best_score:
+                best = idx
+                best_score = score
+
+        return best
+
+    def close(self):
+        self._data.close()
+
+    def _entry(self, i: int) -> tuple[int, int, int, int, int]:
+        return BOOK_ENTRY.unpack_from(self._data, BOOK_HEADER.size + i * BOOK_ENTRY.size)
+
+
+def add_parser(subparsers):
+    """
+    Adds the book command to the command line parser.
+
+    Arguments:
+        subparsers: Subparsers of the main command line parser.
+    """
+
+    parser = subparsers.add_parser("book", help="build an opening book from game records",
+                                   description="Build an opening book from game records.")
+    parser.add_argument("records", nargs="+", help="record files written by selfplay --record")
+    parser.add_argument("--output", default=DEFAULT_PATH,
+                        help=f"file to write the book to (default: {DEFAULT_PATH})")
+    parser.add_argument("--plies", type=int, default=DEFAULT_PLIES,
+                        help=f"plies from the start of each game to include (default: {DEFAULT_PLIES})")
+    parser.add_argument("--min-games", type=int, default=1,
+                        help="leave out moves played in fewer games (default: 1)")
+    parser.set_defaults(command=main)
+
+
+def main(args: argparse.Namespace):
+    """
+    Runs the book command.
+
+    Arguments:
+        args (:class:`~argparse.Namespace`): Parsed command line arguments.
+    """
+
+    entries = build_book(args.records, args.output, args.plies, args.min_games)
+    print(f"Wrote {entries} entries to {args.output}")
@@ -0,0 +1,135 @@
+"""
+Monte Carlo tree search over player bitmasks. Positions are seen from the side
+to move, as in :mod:`tictactoe.search`. :func:`run_mcts` is a module-level
+function so it can be run in worker processes, each growing its own tree
+(root parallelism), with the root statistics summed afterwards.
+"""
+
+import math
+import random
+
+from tictactoe.bitboard import full_mask
+from tictactoe.bitboard import is_win_at
+
+
+class _Node:
+    """
+    Node of the search tree, reached by playing :attr:`move`. Wins are counted
+    for the player who played that move.
+    """
+
+    __slots__ = ("move", "children", "untried", "visits", "wins", "terminal_reward")
+
+    def __init__(self, move: int, untried: list[int], terminal_reward: float = None):
+        self.move = move
+        self.children = []
+        self.untried = untried
+        self.visits = 0
+        self.wins = 0.0
+        self.terminal_reward = terminal_reward
+
+
+def _empty_cells(empty: int) -> list[int]:
+    """
+    Returns the bit indices of the set bits of the given bitmask.
+
+    Arguments:
+        empty (int): Bitmask of the empty cells.
+
+    Returns:
+        list[int]
+    """
+
+    cells = []
+    while empty:
+        low = empty & -empty
+        cells.append(low.bit_length() - 1)
+        empty ^= low
+
+    return cells
+
+
+def run_mcts(mine: int, theirs: int, width: int, height: int, k: int, playouts: int,
+             exploration: float, seed: int = None) -> dict[int, tuple[int, float]]:
+    """
+    Runs the given number of playouts from the given position and returns the
+    number of visits and wins of each move from the root.
+
+    Arguments:
+        mine (int): Bitmask of the cells held by the side to move.
+        theirs (int): Bitmask of the cells held by the opponent.
+        width (int): Width of the grid.
+        height (int): Height of the grid.
+        k (int): Number of letters in a row needed to win.
+        playouts (int): Number of playouts to run.
+        exploration (float): Exploration constant of the UCT formula.
+        seed (int): Seed for the random playouts.
+
+    Returns:
+        dict[int, tuple]
+    """
+
+    rng = random.Random(seed)
+    full = full_mask(width, height)
+
+    def is_win(board, idx):
+        return is_win_at(board, idx % width, idx // width, width, height, k)
+
+    root = _Node(None, _empty_cells(full & ~(mine | theirs)))
+
+    for _ in range(playouts):
+        node = root
+        path = [root]
+        to_move, waiting = mine, theirs
+
+        # Selection: descend through fully expanded nodes by UCT
+        while not node.untried and node.children and node.terminal_reward is None:
+            log_visits = math.log(node.visits)
+            node = max(node.children, key=lambda child: (
+                child.wins / child.visits +
+                exploration * math.sqrt(log_visits / child.visits)))
+            path.append(node)
+            to_move, waiting = waiting, to_move | (1 << node.move)
+
+        # Expansion: add one untried move
+        if node.untried and node.terminal_reward is None:
+            idx = node.untried.pop(rng.randrange(len(node.untried)))
+            moved = to_move | (1 << idx)
+            to_move, waiting = waiting, moved
+
+            terminal_reward = None
+            empty = full & ~(to_move | waiting)
+            if is_win(moved, idx):
+                terminal_reward = 1.0
+            elif not empty:
+                terminal_reward = 0.5
+
+            child = _Node(idx, _empty_cells(empty) if terminal_reward is None else [], terminal_reward)
+            node.children.append(child)
+            node = child
+            path.append(node)
+
+        # Simulation: play random moves to the end of the game. The reward is
+        # for the player who moved into the leaf.
+        if node.terminal_reward is not None:
+            reward = node.terminal_reward
+        else:
+            cells = _empty_cells(full & ~(to_move | waiting))
+            rng.shuffle(cells)
+            reward = 0.5
+            leaf_mover_turn = False
+            for idx in cells:
+                to_move |= 1 << idx
+                if is_win(to_move, idx):
+                    reward = 1.0 if leaf_mover_turn else 0.0
+                    break
+                to_move, waiting = waiting, to_move
+                leaf_mover_turn = not leaf_mover_turn
+
+        # Backpropagation, flipping the reward at each ply
+        for path_node in reversed(path):
+            path_node.visits += 1
+            path_node.wins += reward
+            reward = 1.0 - reward
+
+    return {child.move: (child.visits, child.wins) for child in root.children}
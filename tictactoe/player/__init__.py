@@ -1,6 +1,8 @@
 from abc import ABC
 from abc import abstractmethod
 
+from tictactoe.board import Board
+
 
 class Player(ABC):
     """
@@ -41,12 +43,12 @@ class Player(ABC):
         return self._name
 
     @abstractmethod
-    def get_move(self, grid: list[list[str]]) -> tuple[int]:
+    def get_move(self, grid: Board) -> tuple[int]:
         """
         Gets the move from the player given the Tic Tac Toe grid.
 
         Arguments:
-            grid (list[list[str]]): The Tic Tac Toe grid.
+            grid (:class:`~Board`): The Tic Tac Toe grid.
         
         Returns:
             tuple[int]
@@ -1,26 +1,153 @@
+import threading
 from abc import ABC
 from abc import abstractmethod
 
+from tictactoe.board import Board
+from tictactoe.book import OpeningBook
+from tictactoe.book import load_book
 from tictactoe.player import Player
 
 
 class AIPlayer(Player):
+    """
+    Abstract class for an AI player. Announces each move it picks unless
+    created with verbose set to False. With an opening book, positions found
+    in the book are played from it without calling :meth:`_get_move`.
 
-    def get_move(self, grid: list[list[str]]) -> tuple[int]:
-        move = self._get_move(grid)
-        print(self.name + f" plays ({move[0]}, {move[1]})")
+    A move can be searched for on another thread and stopped early by setting
+    the cancel event passed to :meth:`get_move`. Players whose searches can't
+    be stopped early ignore it.
+
+    Players that hold resources, such as worker processes, free them in
+    :meth:`close`. Players can also be used as context managers, which
+    closes them on exit.
+
+    Arguments:
+        k (int): Number of letters in a row needed to win, for AIs that
+            support larger grids. Defaults to the smaller of the width and
+            height of the grid.
+        verbose (bool): Whether to print each move.
+        book (str): Path of an opening book built by :mod:`tictactoe.book`,
+            or the loaded :class:`~OpeningBook`.
+    """
+
+    def __init__(self, player: int, letter: str, name: str, k: int = None,
+                 verbose: bool = True, book: str | OpeningBook = None):
+        super().__init__(player, letter, name)
+
+        self._k = k
+        self._verbose = verbose
+
+        if isinstance(book, str):
+            book = load_book(book)
+        self._book = book
+        self._cancel = None
+
+    def get_move(self, grid: Board, cancel: threading.Event = None) -> tuple[int]:
+        """
+        Gets the move from the player given the Tic Tac Toe grid.
+
+        Arguments:
+            grid (:class:`~Board`): The Tic Tac Toe grid.
+            cancel (:class:`~threading.Event`): Set from another thread to
+                stop the search, which then raises
+                :class:`~tictactoe.search.SearchCancelled`.
+
+        Returns:
+            tuple[int]
+        """
+
+        self._cancel = cancel
+        move = None
+        if self._book is not None:
+            move = self._get_book_move(grid)
+        if move is None:
+            move = self._get_move(grid)
+        if self._verbose and move is not None:
+            print(self.name + f" plays ({move[0]}, {move[1]})")
         return move
 
+    def close(self):
+        """
+        Frees any resources held by the player. Does nothing by default.
+        """
+
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
     @abstractmethod
-    def _get_move(self, grid: list[list[str]]) -> tuple[int]:
+    def _get_move(self, grid: Board) -> tuple[int]:
         """
         Gets the move from the player given the Tic Tac Toe grid.
 
         Arguments:
-            grid (list[list[str]]): The Tic Tac Toe grid.
+            grid (:class:`~Board`): The Tic Tac Toe grid.
         
         Returns:
             tuple[int]
         """
 
         pass
+
+    def _get_book_move(self, grid: Board) -> tuple[int] | None:
+        """
+        Gets the move from the opening book, or None if the book doesn't
+        cover the position or was built for a different grid.
+
+        Arguments:
+            grid (:class:`~Board`): The Tic Tac Toe grid.
+
+        Returns:
+            tuple[int] or None
+        """
+
+        book = self._book
+        width, height = len(grid[0]), len(grid)
+        k = self._k
+        if k is None:
+            k = min(width, height)
+        if (book.width, book.height, book.k) != (width, height, k):
+            return None
+
+        mine, theirs = self._get_bitboards(grid)
+        if (mine | theirs).bit_count() >= book.plies:
+            return None
+
+        idx = book.get_move(mine, theirs)
+        if idx is None:
+            return None
+        return idx % width, idx // width
+
+    def _get_bitboards(self, grid: Board) -> tuple[int]:
+        """
+        Gets the bitmasks of the cells held by this player and by the
+        opponent.
+
+        Arguments:
+            grid (:class:`~Board`): The grid.
+
+        Returns:
+            tuple[int]
+        """
+
+        if isinstance(grid, Board):
+            mine = grid.bitboard(self.letter)
+            return mine, grid.occupied & ~mine
+
+        mine = 0
+        theirs = 0
+        bit = 1
+        for row in grid:
+            for cell in row:
+                if cell == self.letter:
+                    mine |= bit
+                elif cell:
+                    theirs |= bit
+                bit <<= 1
+
+        return mine, theirs
@@ -1,3 +1,4 @@
+from tictactoe.board import Board
 from tictactoe.player.ai.medium import MediumAIPlayer
 
 
@@ -6,7 +7,7 @@ class HardAIPlayer(MediumAIPlayer):
     A hard AI player that uses the following strategies:
     """
 
-    def _get_move(self, grid: list[list[str]]) -> tuple[int]:
+    def _get_move(self, grid: Board) -> tuple[int]:
         # First determine if I can win this turn
         move = self._get_winning_move(self.letter, grid)
         if move is not None:
@@ -43,7 +44,7 @@ class HardAIPlayer(MediumAIPlayer):
                 elif not grid[len(grid) - 1][0]:
                     return 0, len(grid) - 1
                 # Otherwise, pick the last remaining corner
-                return grid[len(grid) - 1][len(grid) - 1]
+                return len(grid) - 1, len(grid) - 1
         else:
             # Second player strategy, more defensive
             if count == 0:
@@ -68,22 +69,16 @@ class HardAIPlayer(MediumAIPlayer):
         # Otherwise, just pick the first available move
         return self._get_first_available_move(grid)
     
-    def _get_count(self, letter: str, grid: list[list[str]]) -> int:
+    def _get_count(self, letter: str, grid: Board) -> int:
         """
         Gets the count of the given letter on the given grid.
 
         Arguments:
             letter (str): The letter to count.
-            grid (list[list[str]]): The grid to count on.
+            grid (:class:`~Board`): The grid to count on.
 
         Returns:
             int
         """
 
-        count = 0
-        for i in range(len(grid)):
-            for j in range(len(grid)):
-                if grid[i][j] == letter:
-                    count += 1
-        
-        return count
+        return grid.bitboard(letter).bit_count()
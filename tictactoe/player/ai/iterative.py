@@ -0,0 +1,50 @@
+from tictactoe.board import Board
+from tictactoe.player.ai.negamax import NegamaxAIPlayer
+
+# Default time budget per move, in seconds
+DEFAULT_TIME_BUDGET = 1.0
+
+
+class IterativeDeepeningAIPlayer(NegamaxAIPlayer):
+    """
+    A search-based AI player that searches one ply deeper at a time until its
+    time budget for the move runs out, then plays the best move from the
+    deepest completed search. Trades strength for a bounded time per move, so
+    it can play on grids too large to search to the end.
+
+    The depth reached for the last move is available from :attr:`depth`.
+
+    Arguments:
+        time_budget (float): Time budget per move, in seconds.
+        **kwargs: Search settings passed on to :class:`~NegamaxAIPlayer`.
+            ``max_depth`` caps the depth, rather than setting it.
+    """
+
+    # Search as deep as the time budget allows on any grid
+    _large_grid_max_depth = None
+
+    def __init__(self, player: int, letter: str, name: str,
+                 time_budget: float = DEFAULT_TIME_BUDGET, **kwargs):
+        super().__init__(player, letter, name, **kwargs)
+
+        self._time_budget = time_budget
+        self._depth = 0
+
+    @property
+    def depth(self) -> int:
+        """
+        Depth of the deepest completed search for the last move.
+
+        Returns:
+            int
+        """
+
+        return self._depth
+
+    def _get_move(self, grid: Board) -> tuple[int]:
+        width, height = len(grid[0]), len(grid)
+        mine, theirs = self._get_bitboards(grid)
+
+        search = self._get_search(width, height)
+        idx, _, self._depth = search.search_timed(mine, theirs, self._time_budget)
+        return idx % width, idx // width
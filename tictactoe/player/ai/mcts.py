@@ -0,0 +1,92 @@
+from concurrent.futures import ProcessPoolExecutor
+
+from tictactoe.board import Board
+from tictactoe.mcts import run_mcts
+from tictactoe.player.ai import AIPlayer
+
+DEFAULT_PLAYOUTS = 2000
+DEFAULT_EXPLORATION = 1.4
+
+
+class MCTSAIPlayer(AIPlayer):
+    """
+    An AI player that uses Monte Carlo tree search with random playouts. With
+    more than one worker, the playouts are split across a process pool, each
+    worker growing its own tree, and the visit counts of the root moves are
+    summed to pick the move.
+
+    Call :meth:`close`, or use the player as a context manager, to shut down
+    the worker processes when done with it. A player that is never closed
+    shuts them down when it is garbage collected.
+
+    Arguments:
+        playouts (int): Number of playouts per move, across all workers.
+        exploration (float): Exploration constant of the UCT formula.
+        workers (int): Number of worker processes. With 1, the search runs in
+            the calling process.
+        seed (int): Seed for the random playouts, for repeatable moves.
+        **kwargs: Options passed on to :class:`~AIPlayer`.
+    """
+
+    def __init__(self, player: int, letter: str, name: str, playouts: int = DEFAULT_PLAYOUTS,
+                 exploration: float = DEFAULT_EXPLORATION, workers: int = 1, seed: int = None,
+                 **kwargs):
+        super().__init__(player, letter, name, **kwargs)
+
+        self._playouts = playouts
+        self._exploration = exploration
+        self._workers = workers
+        self._seed = seed
+        self._moves_played = 0
+        self._executor = None
+
+    def close(self):
+        """
+        Shuts down the worker processes, if any were started.
+        """
+
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __del__(self):
+        # Don't wait for the workers, as this may run during interpreter
+        # shutdown
+        executor = getattr(self, "_executor", None)
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    def _get_move(self, grid: Board) -> tuple[int]:
+        width, height = len(grid[0]), len(grid)
+        k = self._k
+        if k is None:
+            k = min(width, height)
+
+        mine, theirs = self._get_bitboards(grid)
+
+        # Give each worker its own share of the playouts and its own seed
+        seeds = [None] * self._workers
+        if self._seed is not None:
+            base = (self._seed + self._moves_played) * self._workers
+            seeds = [base + i for i in range(self._workers)]
+        shares = [self._playouts // self._workers] * self._workers
+        for i in range(self._playouts % self._workers):
+            shares[i] += 1
+        self._moves_played += 1
+
+        args = [(mine, theirs, width, height, k, share, self._exploration, seed)
+                for share, seed in zip(shares, seeds)]
+        if self._workers == 1:
+            results = [run_mcts(*args[0])]
+        else:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(self._workers)
+            results = list(self._executor.map(run_mcts, *zip(*args)))
+
+        visits = {}
+        for result in results:
+            for idx, (move_visits, _) in result.items():
+                visits[idx] = visits.get(idx, 0) + move_visits
+
+        idx = max(visits, key=visits.get)
+        return idx % width, idx // width
@@ -1,5 +1,6 @@
 import re
 
+from tictactoe.board import Board
 from tictactoe.player.ai.easy import EasyAIPlayer
 
 
@@ -12,7 +13,7 @@ class MediumAIPlayer(EasyAIPlayer):
     3. Picks the first available spot on the grid.
     """
 
-    def _get_move(self, grid: list[list[str]]) -> tuple[int]:
+    def _get_move(self, grid: Board) -> tuple[int]:
         # First determine if I can win this turn
         move = self._get_winning_move(self.letter, grid)
         if move is not None:
@@ -26,14 +27,14 @@ class MediumAIPlayer(EasyAIPlayer):
         # Otherwise, just pick the first available move
         return self._get_first_available_move(grid)
     
-    def _get_winning_move(self, letter: str, grid: list[list[str]]) -> tuple[int]:
+    def _get_winning_move(self, letter: str, grid: Board) -> tuple[int]:
         """
         If the opponent is one move away from winning, returns that winning
         move so the AI can block it.
 
         Arguments:
             letter (str): The letter to get the winning move of.
-            grid (list[list[str]]): The grid.
+            grid (:class:`~Board`): The grid.
         
         Returns:
             tuple[int]
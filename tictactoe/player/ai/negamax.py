@@ -0,0 +1,116 @@
+from tictactoe.board import Board
+from tictactoe.player.ai import AIPlayer
+from tictactoe.search import Negamax
+
+# Grids with more cells than this are not searched to the end of the game by
+# default
+MAX_FULL_SEARCH_CELLS = 9
+
+# Default search settings for larger grids
+LARGE_GRID_MAX_DEPTH = 3
+LARGE_GRID_RADIUS = 1
+
+
+class NegamaxAIPlayer(AIPlayer):
+    """
+    An AI player that searches the game tree using negamax with alpha-beta
+    pruning, move ordering and a transposition table. On a 3x3 grid it
+    searches to the end of the game, so it never loses.
+
+    The number of positions searched and transposition table hits for the last
+    move are available from :attr:`nodes` and :attr:`cache_hits`. Searches
+    stop early when the cancel event passed to :meth:`get_move` is set.
+
+    Arguments:
+        max_depth (int): Maximum number of plies to search. Defaults to the
+            end of the game on small grids, and a shallow search on larger
+            ones.
+        radius (int): Only consider empty cells within this many cells of an
+            occupied cell. Defaults to all cells on small grids.
+        symmetry (bool): Whether to store positions once for all their
+            rotations and reflections. Defaults to True on small grids.
+        **kwargs: Options passed on to :class:`~AIPlayer`.
+    """
+
+    # Default maximum depth on grids too large to search to the end
+    _large_grid_max_depth = LARGE_GRID_MAX_DEPTH
+
+    def __init__(self, player: int, letter: str, name: str, max_depth: int = None,
+                 radius: int = None, symmetry: bool = None, **kwargs):
+        super().__init__(player, letter, name, **kwargs)
+
+        self._max_depth = max_depth
+        self._radius = radius
+        self._symmetry = symmetry
+        self._search = None
+        self._search_shape = None
+
+    @property
+    def nodes(self) -> int:
+        """
+        Number of positions searched for the last move.
+
+        Returns:
+            int
+        """
+
+        if self._search is None:
+            return 0
+        return self._search.nodes
+
+    @property
+    def cache_hits(self) -> int:
+        """
+        Number of transposition table hits for the last move.
+
+        Returns:
+            int
+        """
+
+        if self._search is None:
+            return 0
+        return self._search.cache_hits
+
+    def _get_move(self, grid: Board) -> tuple[int]:
+        width, height = len(grid[0]), len(grid)
+        mine, theirs = self._get_bitboards(grid)
+
+        idx, _ = self._get_search(width, height).search(mine, theirs)
+        return idx % width, idx // width
+
+    def _get_search(self, width: int, height: int) -> Negamax:
+        """
+        Gets the search for the given grid size, creating it the first time or
+        if the grid size has changed.
+
+        Arguments:
+            width (int): Width of the grid.
+            height (int): Height of the grid.
+
+        Returns:
+            :class:`~Negamax`
+        """
+
+        k = self._k
+        if k is None:
+            k = min(width, height)
+
+        if self._search is None or self._search_shape != (width, height, k):
+            max_depth = self._max_depth
+            radius = self._radius
+            symmetry = self._symmetry
+            if width * height > MAX_FULL_SEARCH_CELLS:
+                if max_depth is None:
+                    max_depth = self._large_grid_max_depth
+                if radius is None:
+                    radius = LARGE_GRID_RADIUS
+                if symmetry is None:
+                    symmetry = False
+            elif symmetry is None:
+                symmetry = True
+
+            self._search = Negamax(width, height, k, max_depth, radius, symmetry)
+            self._search_shape = (width, height, k)
+
+        self._search.cancel = self._cancel
+        return self._search
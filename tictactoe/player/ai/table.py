@@ -0,0 +1,163 @@
+"""
+AI player that plays perfectly on a 3x3 grid by looking its move up in a
+precomputed table of every reachable position. Build the table once with:
+
+    python -m tictactoe.player.ai.table [path]
+"""
+
+import mmap
+import os
+import sys
+
+from tictactoe.bitboard import is_win_at
+from tictactoe.board import Board
+from tictactoe.player.ai import AIPlayer
+from tictactoe.search import Negamax
+from tictactoe.search import get_result
+
+GRID_SIZE = 3
+NUM_CELLS = GRID_SIZE * GRID_SIZE
+
+# Default location of the table, alongside this module
+TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "solution3x3.bin")
+
+# Size of the table: one byte for every way of filling the grid with empty
+# cells, the side to move's letters and the opponent's letters
+TABLE_SIZE = 3 ** NUM_CELLS
+
+# Entries hold the move in the low 4 bits and the result for the side to move,
+# as returned by get_result, in the high 4 bits. Positions that are finished
+# or can't be reached are marked as missing.
+MISSING = 0xFF
+
+
+def get_index(mine: int, theirs: int) -> int:
+    """
+    Returns the table index of the given position, reading each cell as a
+    base 3 digit: 0 if empty, 1 if held by the side to move and 2 if held by
+    the opponent.
+
+    Arguments:
+        mine (int): Bitmask of the cells held by the side to move.
+        theirs (int): Bitmask of the cells held by the opponent.
+
+    Returns:
+        int
+    """
+
+    index = 0
+    for idx in range(NUM_CELLS - 1, -1, -1):
+        index *= 3
+        if mine >> idx & 1:
+            index += 1
+        elif theirs >> idx & 1:
+            index += 2
+
+    return index
+
+
+def build_table(path: str = TABLE_PATH):
+    """
+    Solves every reachable position of the 3x3 game and writes the best move
+    and result of each one to the given path.
+
+    Arguments:
+        path (str): Path to write the table to.
+    """
+
+    search = Negamax(GRID_SIZE, GRID_SIZE, GRID_SIZE, symmetry=True)
+    table = bytearray([MISSING]) * TABLE_SIZE
+
+    # Walk every position reachable from the empty grid, always seen from the
+    # side to move
+    seen = set()
+    stack = [(0, 0)]
+    while stack:
+        mine, theirs = stack.pop()
+        if (mine, theirs) in seen:
+            continue
+        seen.add((mine, theirs))
+
+        move, score = search.search(mine, theirs)
+        table[get_index(mine, theirs)] = move | (get_result(score) << 4)
+
+        for idx in range(NUM_CELLS):
+            bit = 1 << idx
+            if (mine | theirs) & bit:
+                continue
+            if is_win_at(mine | bit, idx % GRID_SIZE, idx // GRID_SIZE, GRID_SIZE, GRID_SIZE, GRID_SIZE):
+                continue
+            if (mine | theirs | bit).bit_count() == NUM_CELLS:
+                continue
+            stack.append((theirs, mine | bit))
+
+    with open(path, "wb") as f:
+        f.write(table)
+
+
+def load_table(path: str = TABLE_PATH) -> mmap.mmap:
+    """
+    Memory maps the table at the given path.
+
+    Arguments:
+        path (str): Path of the table.
+
+    Returns:
+        :class:`~mmap.mmap`
+    """
+
+    if not os.path.exists(path):
+        raise Exception("Solution table not found, build it with python -m tictactoe.player.ai.table")
+
+    with open(path, "rb") as f:
+        table = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    if len(table) != TABLE_SIZE:
+        table.close()
+        raise Exception("Solution table is the wrong size, please rebuild it")
+
+    return table
+
+
+class TableAIPlayer(AIPlayer):
+    """
+    An AI player that plays perfectly on a 3x3 grid by looking up its move in
+    the precomputed solution table. The table is memory mapped once per path
+    and shared between players, and mapped again if it has been rebuilt
+    since.
+
+    Arguments:
+        path (str): Path of the table. Defaults to the table built alongside
+            this module.
+        **kwargs: Options passed on to :class:`~AIPlayer`.
+    """
+
+    _tables = {}
+
+    def __init__(self, player: int, letter: str, name: str, path: str = TABLE_PATH, **kwargs):
+        super().__init__(player, letter, name, **kwargs)
+
+        # Keyed by modification time too, so a rebuilt table isn't read from
+        # the old mapping. A missing table is reported by load_table.
+        try:
+            key = (path, os.stat(path).st_mtime_ns)
+        except OSError:
+            key = (path, None)
+        if key not in TableAIPlayer._tables:
+            TableAIPlayer._tables[key] = load_table(path)
+        self._table = TableAIPlayer._tables[key]
+
+    def _get_move(self, grid: Board) -> tuple[int]:
+        if len(grid) != GRID_SIZE or len(grid[0]) != GRID_SIZE:
+            raise Exception("Solution table only covers 3x3 grids")
+
+        entry = self._table[get_index(*self._get_bitboards(grid))]
+        if entry == MISSING:
+            raise Exception("Position is not in the solution table, it is either finished or unreachable")
+
+        move = entry & 0xF
+        return move % GRID_SIZE, move // GRID_SIZE
+
+
+if __name__ == "__main__":
+    build_table(*sys.argv[1:])
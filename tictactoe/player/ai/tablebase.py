@@ -0,0 +1,43 @@
+from tictactoe.board import Board
+from tictactoe.player.ai import AIPlayer
+from tictactoe.tablebase import DEFAULT_PATH
+from tictactoe.tablebase import Tablebase
+from tictactoe.tablebase import load_tablebase
+
+
+class TablebaseAIPlayer(AIPlayer):
+    """
+    An AI player that plays perfectly by looking up its move in a tablebase
+    built by :mod:`tictactoe.tablebase`. Wins are played as quickly as
+    possible and losses put off for as long as possible. The tablebase is
+    loaded once per path and shared between players, and loaded again if it
+    has been rebuilt since.
+
+    Arguments:
+        path (str): Path of the tablebase, or the loaded
+            :class:`~Tablebase`. Defaults to the tablebase built alongside
+            :mod:`tictactoe.tablebase`.
+        **kwargs: Options passed on to :class:`~AIPlayer`.
+    """
+
+    def __init__(self, player: int, letter: str, name: str, path: str | Tablebase = DEFAULT_PATH,
+                 **kwargs):
+        super().__init__(player, letter, name, **kwargs)
+
+        if isinstance(path, str):
+            path = load_tablebase(path)
+        self._tablebase = path
+
+    def _get_move(self, grid: Board) -> tuple[int]:
+        tablebase = self._tablebase
+        width, height = len(grid[0]), len(grid)
+        k = self._k
+        if k is None:
+            k = min(width, height)
+        if (tablebase.width, tablebase.height, tablebase.k) != (width, height, k):
+            raise Exception("Tablebase was built for a different grid")
+
+        idx = tablebase.get_move(*self._get_bitboards(grid))
+        if idx is None:
+            raise Exception("Position is not in the tablebase, it is either finished or unreachable")
+        return idx % width, idx // width
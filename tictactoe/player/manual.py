@@ -1,11 +1,12 @@
 import re
 
+from tictactoe.board import Board
 from tictactoe.player import Player
 
 
 class ManualPlayer(Player):
 
-    def get_move(self, grid: list[list[str]]) -> tuple[int]:
+    def get_move(self, grid: Board) -> tuple[int]:
         while True:
             i = input(self.name + ", enter your move in the form x, y: ")
             parts = re.split(r" *, *| +", i)
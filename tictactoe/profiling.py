@@ -0,0 +1,288 @@
+"""
+Per-move profiling of games. A :class:`GameProfiler` attached to a game
+records the wall time, CPU time and (optionally) memory allocated by every
+call to :meth:`TicTacToe.place` and to each player's ``get_move``, and can
+capture chosen moves with cProfile. The game and players don't need any
+changes, as the profiler wraps their methods on the instances.
+"""
+
+import cProfile
+import math
+import os
+import time
+import tracemalloc
+from dataclasses import dataclass
+
+from tictactoe import TicTacToe
+
+GET_MOVE = "get_move"
+PLACE = "place"
+
+# Width of the histogram bars in the summary, in characters
+HISTOGRAM_WIDTH = 40
+
+
+@dataclass
+class CallRecord:
+    """
+    Measurements of a single profiled call.
+    """
+
+    kind: str
+    player: str
+    move_number: int
+    wall_time: float
+    cpu_time: float
+    allocated: int = None
+    profile_path: str = None
+
+
+class GameProfiler:
+    """
+    Records measurements of every move of the games it is attached to.
+    Records from several games, or several profilers, can be combined with
+    :meth:`merge` before calling :meth:`summary`.
+
+    Arguments:
+        trace_allocations (bool): Whether to measure the peak memory
+            allocated by each call with tracemalloc. Slows calls down a lot.
+        profile_moves (set[int]): Move numbers, counting from 1, for which
+            ``get_move`` is run under cProfile.
+        profile_dir (str): Directory to write cProfile stats files to.
+    """
+
+    def __init__(self, trace_allocations: bool = False, profile_moves: set[int] = None,
+                 profile_dir: str = "profiles"):
+        self._trace_allocations = trace_allocations
+        self._profile_moves = set(profile_moves or ())
+        self._profile_dir = profile_dir
+        self._profiles_written = 0
+
+        self.records = []
+
+    def attach(self, tic_tac_toe: TicTacToe):
+        """
+        Starts profiling the given game. Must be called after the players are
+        added.
+
+        Arguments:
+            tic_tac_toe (:class:`~TicTacToe`): Game to profile.
+        """
+
+        state = {"moves": 0}
+        players = tic_tac_toe.players
+
+        place = tic_tac_toe.place
+        reset = tic_tac_toe.reset
+
+        def profiled_place(x, y):
+            player = players[state["moves"] % len(players)]
+            valid = self._call(PLACE, player, state["moves"] + 1, place, x, y)
+            if valid:
+                state["moves"] += 1
+            return valid
+
+        def profiled_reset():
+            state["moves"] = 0
+            return reset()
+
+        tic_tac_toe.place = profiled_place
+        tic_tac_toe.reset = profiled_reset
+
+        for player in players:
+            player.get_move = self._profile_get_move(player, state)
+
+        if self._trace_allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def merge(self, other: "GameProfiler"):
+        """
+        Adds the records of another profiler to this one.
+
+        Arguments:
+            other (:class:`~GameProfiler`): Profiler to take records from.
+        """
+
+        self.records.extend(other.records)
+
+    def summary(self) -> str:
+        """
+        Returns a text summary of the records: for each kind of call and
+        player class, the distribution of wall times as a histogram, and the
+        mean wall time by move number.
+
+        Returns:
+            str
+        """
+
+        groups = {}
+        for record in self.records:
+            groups.setdefault((record.kind, record.player), []).append(record)
+
+        lines = []
+        for (kind, player), records in sorted(groups.items()):
+            wall_times = sorted(record.wall_time for record in records)
+            cpu_time = sum(record.cpu_time for record in records)
+
+            lines.append(f"{player}.{kind}: {len(records)} calls, "
+                         f"cpu {cpu_time / len(records) * 1e6:.1f} us/call")
+            lines.append("  wall  " + "  ".join(
+                f"{label} {_format_seconds(_percentile(wall_times, pct))}"
+                for label, pct in (("p50", 50), ("p90", 90), ("p99", 99), ("max", 100))))
+
+            allocated = [record.allocated for record in records if record.allocated is not None]
+            if allocated:
+                lines.append(f"  alloc mean {sum(allocated) / len(allocated):.0f} B, "
+                             f"max {max(allocated)} B")
+
+            lines.extend("  " + line for line in _histogram(wall_times))
+
+            by_move = {}
+            for record in records:
+                by_move.setdefault(record.move_number, []).append(record.wall_time)
+            lines.append("  by move: " + ", ".join(
+                f"{move} {_format_seconds(sum(times) / len(times))}"
+                for move, times in sorted(by_move.items())))
+
+        return "\n".join(lines)
+
+    def _profile_get_move(self, player, state: dict):
+        """
+        Returns a wrapper of the player's ``get_move`` that records each
+        call. AI players are passed the cancel event, if one is given.
+
+        Arguments:
+            player (:class:`~Player`): Player to wrap.
+            state (dict): State shared by the wrappers of a game, holding
+                the number of moves placed.
+
+        Returns:
+            Callable
+        """
+
+        get_move = player.get_move
+
+        def profiled_get_move(grid, cancel=None):
+            args = (grid,) if cancel is None else (grid, cancel)
+            return self._call(GET_MOVE, player, state["moves"] + 1, get_move, *args)
+
+        return profiled_get_move
+
+    def _call(self, kind: str, player, move_number: int, func, *args):
+        """
+        Calls the given function, recording its measurements.
+
+        Arguments:
+            kind (str): Kind of call, :data:`GET_MOVE` or :data:`PLACE`.
+            player (:class:`~Player`): Player the call is for.
+            move_number (int): Number of the move, counting from 1.
+            func: Function to call.
+            *args: Arguments to call the function with.
+        """
+
+        profile = None
+        if kind == GET_MOVE and move_number in self._profile_moves:
+            profile = cProfile.Profile()
+
+        if self._trace_allocations:
+            tracemalloc.reset_peak()
+            start_memory = tracemalloc.get_traced_memory()[0]
+
+        start_cpu = time.process_time()
+        start_wall = time.perf_counter()
+        if profile is None:
+            result = func(*args)
+        else:
+            result = profile.runcall(func, *args)
+        wall_time = time.perf_counter() - start_wall
+        cpu_time = time.process_time() - start_cpu
+
+        record = CallRecord(kind, type(player).__name__, move_number, wall_time, cpu_time)
+        if self._trace_allocations:
+            record.allocated = tracemalloc.get_traced_memory()[1] - start_memory
+        if profile is not None:
+            record.profile_path = self._write_profile(profile, record)
+        self.records.append(record)
+
+        return result
+
+    def _write_profile(self, profile: cProfile.Profile, record: CallRecord) -> str:
+        """
+        Writes cProfile stats to the profile directory and returns the path.
+
+        Arguments:
+            profile (:class:`~cProfile.Profile`): Profile to write.
+            record (:class:`~CallRecord`): Record the profile is for.
+
+        Returns:
+            str
+        """
+
+        os.makedirs(self._profile_dir, exist_ok=True)
+        self._profiles_written += 1
+        path = os.path.join(
+            self._profile_dir,
+            f"{record.player}-move{record.move_number}-{os.getpid()}-{self._profiles_written}.prof")
+        profile.dump_stats(path)
+        return path
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    """
+    Returns the given percentile of sorted values, by the nearest rank.
+
+    Arguments:
+        values (list[float]): Sorted values.
+        pct (float): Percentile, from 0 to 100.
+
+    Returns:
+        float
+    """
+
+    rank = max(math.ceil(pct / 100 * len(values)), 1)
+    return values[rank - 1]
+
+
+def _histogram(values: list[float]) -> list[str]:
+    """
+    Returns the lines of a histogram of the given times, with one bucket per
+    power of two microseconds.
+
+    Arguments:
+        values (list[float]): Times in seconds.
+
+    Returns:
+        list[str]
+    """
+
+    buckets = {}
+    for value in values:
+        bucket = max(math.floor(math.log2(max(value * 1e6, 1e-3))), 0)
+        buckets[bucket] = buckets.get(bucket, 0) + 1
+
+    most = max(buckets.values())
+    lines = []
+    for bucket in range(min(buckets), max(buckets) + 1):
+        count = buckets.get(bucket, 0)
+        bar = "#" * math.ceil(count / most * HISTOGRAM_WIDTH)
+        lines.append(f"<{_format_seconds(2 ** (bucket + 1) / 1e6):>9} {bar} {count}")
+
+    return lines
+
+
+def _format_seconds(seconds: float) -> str:
+    """
+    Formats a time in seconds with a readable unit.
+
+    Arguments:
+        seconds (float): Time in seconds.
+
+    Returns:
+        str
+    """
+
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:.1f}us"
+    if seconds < 1:
+        return f"{seconds * 1e3:.1f}ms"
+    return f"{seconds:.2f}s"
@@ -0,0 +1,324 @@
+"""
+Compact binary game records. A record file starts with a short header and is
+followed by any number of games, each stored as:
+
+- a fixed header with the record size, grid width, height, k, result, number
+  of players and number of moves,
+- each player's letter and name, as length-prefixed UTF-8,
+- the moves as cell indexes packed into just enough bits for the grid, so a
+  3x3 game takes 4 bits per move.
+
+Files are only ever appended to. :class:`GameReader` memory-maps a file and
+decodes one game at a time, skipping straight past games using the record
+size, so files don't need to fit in memory.
+"""
+
+import mmap
+import os
+import shutil
+import struct
+from dataclasses import dataclass
+from dataclasses import field
+
+from tictactoe import TicTacToe
+
+MAGIC = b"TTTG"
+VERSION = 1
+
+FILE_HEADER = struct.Struct("<4sB3x")
+
+# Size of the whole record in bytes, width, height, k, result, number of
+# players and number of moves
+RECORD_HEADER = struct.Struct("<IBBBBBH")
+
+RESULT_DRAW = 0
+RESULT_UNFINISHED = 0xFF
+
+# Largest width, height, k or number of players, stored in a byte each
+MAX_SIZE = 0xFF
+
+# Most moves in a record, stored in two bytes
+MAX_MOVES = 0xFFFF
+
+
+def move_bits(width: int, height: int) -> int:
+    """
+    Returns the number of bits used to store each move on the given grid.
+
+    Arguments:
+        width (int): Width of the grid.
+        height (int): Height of the grid.
+
+    Returns:
+        int
+    """
+
+    return max((width * height - 1).bit_length(), 1)
+
+
+def pack_moves(moves: list[tuple[int]], width: int, height: int) -> bytes:
+    """
+    Packs moves into bytes, with each move's cell index taking
+    :func:`move_bits` bits.
+
+    Arguments:
+        moves (list[tuple[int]]): Moves as (x, y) coordinates.
+        width (int): Width of the grid.
+        height (int): Height of the grid.
+
+    Returns:
+        bytes
+    """
+
+    bits = move_bits(width, height)
+    packed = 0
+    for i, (x, y) in enumerate(moves):
+        packed |= (y * width + x) << (i * bits)
+
+    return packed.to_bytes((len(moves) * bits + 7) // 8, "little")
+
+
+def unpack_moves(data: bytes, num_moves: int, width: int, height: int) -> list[tuple[int]]:
+    """
+    Unpacks moves packed by :func:`pack_moves`.
+
+    Arguments:
+        data (bytes): Packed moves.
+        num_moves (int): Number of moves.
+        width (int): Width of the grid.
+        height (int): Height of the grid.
+
+    Returns:
+        list[tuple[int]]
+    """
+
+    bits = move_bits(width, height)
+    mask = (1 << bits) - 1
+    packed = int.from_bytes(data, "little")
+
+    moves = []
+    for _ in range(num_moves):
+        idx = packed & mask
+        moves.append((idx % width, idx // width))
+        packed >>= bits
+
+    return moves
+
+
+@dataclass
+class GameRecord:
+    """
+    A game read from a record file. The result is the number of the winning
+    player, counting from 1, or :data:`RESULT_DRAW` or
+    :data:`RESULT_UNFINISHED`.
+    """
+
+    width: int
+    height: int
+    k: int
+    result: int
+    players: list[tuple[str, str]] = field(default_factory=list)
+    moves: list[tuple[int]] = field(default_factory=list)
+
+    @property
+    def winner(self) -> int | None:
+        """
+        Returns the index of the winning player, or None for a stalemate or
+        an unfinished game.
+
+        Returns:
+            int or None
+        """
+
+        if self.result in (RESULT_DRAW, RESULT_UNFINISHED):
+            return None
+        return self.result - 1
+
+
+def _check_header(header: bytes):
+    if len(header) < FILE_HEADER.size:
+        raise Exception("Not a game record file")
+
+    magic, version = FILE_HEADER.unpack_from(header)
+    if magic != MAGIC:
+        raise Exception("Not a game record file")
+    if version != VERSION:
+        raise Exception("Game record file was written by a different version")
+
+
+class GameWriter:
+    """
+    Appends games to a record file, creating it if it doesn't exist.
+
+    Arguments:
+        path (str): Path of the record file.
+    """
+
+    def __init__(self, path: str):
+        if os.path.exists(path) and os.path.getsize(path):
+            with open(path, "rb") as f:
+                _check_header(f.read(FILE_HEADER.size))
+
+        self._file = open(path, "ab")
+        if self._file.tell() == 0:
+            self._file.write(FILE_HEADER.pack(MAGIC, VERSION))
+
+    def __enter__(self) -> "GameWriter":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def write(self, tic_tac_toe: TicTacToe, result: int = None):
+        """
+        Appends a game. The result is taken from the game unless given, for
+        games that ended some other way, such as a forfeit.
+
+        Arguments:
+            tic_tac_toe (:class:`~TicTacToe`): The game.
+            result (int): Number of the winning player, counting from 1, or
+                :data:`RESULT_DRAW` or :data:`RESULT_UNFINISHED`.
+        """
+
+        if result is None:
+            winner = tic_tac_toe.winner
+            if winner is not None:
+                result = tic_tac_toe.players.index(winner) + 1
+            elif tic_tac_toe.game_over:
+                result = RESULT_DRAW
+            else:
+                result = RESULT_UNFINISHED
+
+        players = [(player.letter, player.name) for player in tic_tac_toe.players]
+        self.write_game(tic_tac_toe.width, tic_tac_toe.height, tic_tac_toe.k, result, players,
+                        tic_tac_toe.moves)
+
+    def write_game(self, width: int, height: int, k: int, result: int,
+                   players: list[tuple[str, str]], moves: list[tuple[int]]):
+        """
+        Appends a game from its parts.
+
+        Arguments:
+            width (int): Width of the grid.
+            height (int): Height of the grid.
+            k (int): Number of letters in a row needed to win.
+            result (int): Number of the winning player, counting from 1, or
+                :data:`RESULT_DRAW` or :data:`RESULT_UNFINISHED`.
+            players (list[tuple[str, str]]): Letter and name of each player.
+            moves (list[tuple[int]]): Moves as (x, y) coordinates.
+        """
+
+        if max(width, height, k, len(players)) > MAX_SIZE:
+            raise Exception(f"Grid width, height, k and number of players must be at most {MAX_SIZE}")
+        if len(moves) > MAX_MOVES:
+            raise Exception(f"Games must have at most {MAX_MOVES} moves")
+
+        body = bytearray()
+        for letter, name in players:
+            for text in (letter, name):
+                encoded = text.encode()
+                if len(encoded) > 255:
+                    raise Exception("Player letters and names must be at most 255 bytes")
+                body.append(len(encoded))
+                body += encoded
+        body += pack_moves(moves, width, height)
+
+        header = RECORD_HEADER.pack(RECORD_HEADER.size + len(body), width, height, k, result,
+                                    len(players), len(moves))
+        self._file.write(header + body)
+
+    def write_from(self, path: str):
+        """
+        Appends every game from another record file.
+
+        Arguments:
+            path (str): Path of the record file to copy from.
+        """
+
+        with open(path, "rb") as f:
+            _check_header(f.read(FILE_HEADER.size))
+            shutil.copyfileobj(f, self._file)
+
+    def close(self):
+        self._file.close()
+
+
+class GameReader:
+    """
+    Reads games from a record file through a memory map. A file that ends
+    partway through a game, or whose records don't fit together, raises an
+    exception when the bad record is reached.
+
+    Arguments:
+        path (str): Path of the record file.
+    """
+
+    def __init__(self, path: str):
+        self._file = open(path, "rb")
+        self._map = None
+        try:
+            if os.fstat(self._file.fileno()).st_size:
+                self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+                _check_header(self._map[:FILE_HEADER.size])
+        except BaseException:
+            self.close()
+            raise
+
+    def __enter__(self) -> "GameReader":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __iter__(self):
+        """
+        Iterates over the games in the file, decoding each one as it is
+        reached.
+
+        Returns:
+            Iterator[:class:`~GameRecord`]
+        """
+
+        if self._map is None:
+            return
+
+        data = self._map
+        offset = FILE_HEADER.size
+        end = len(data)
+        while offset < end:
+            if offset + RECORD_HEADER.size > end:
+                raise Exception("Game record file is truncated")
+            size, width, height, k, result, num_players, num_moves = \
+                RECORD_HEADER.unpack_from(data, offset)
+            if size < RECORD_HEADER.size or width < 1 or height < 1:
+                raise Exception("Game record file is corrupt")
+            if offset + size > end:
+                raise Exception("Game record file is truncated")
+
+            pos = offset + RECORD_HEADER.size
+            offset += size
+            players = []
+            for _ in range(num_players):
+                texts = []
+                for _ in range(2):
+                    if pos >= offset:
+                        raise Exception("Game record file is corrupt")
+                    length = data[pos]
+                    texts.append(data[pos + 1:pos + 1 + length].decode())
+                    pos += 1 + length
+                players.append(tuple(texts))
+
+            # The moves must fill the rest of the record
+            if pos + (num_moves * move_bits(width, height) + 7) // 8 != offset:
+                raise Exception("Game record file is corrupt")
+
+            # A cell index past the end of the grid decodes to a row below it
+            moves = unpack_moves(data[pos:offset], num_moves, width, height)
+            if any(y >= height for _, y in moves):
+                raise Exception("Game record file is corrupt")
+            yield GameRecord(width, height, k, result, players, moves)
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+        self._file.close()
@@ -0,0 +1,66 @@
+"""
+Players and renderers by name. Classes are given as import paths and are only
+imported the first time they are looked up, so a console game never loads
+tkinter and headless runs only import the AI players they use.
+"""
+
+from collections.abc import Mapping
+
+
+class Registry(Mapping):
+    """
+    Read-only mapping from names to classes, importing each class the first
+    time it is looked up. Checking for a name or listing the names doesn't
+    import anything, so registries can be used as argparse choices.
+
+    Arguments:
+        paths (dict[str, str]): Import path of each class, as
+            ``"package.module:ClassName"``, by name.
+    """
+
+    def __init__(self, paths: dict[str, str]):
+        self._paths = dict(paths)
+        self._classes = {}
+
+    def __getitem__(self, name: str) -> type:
+        cls = self._classes.get(name)
+        if cls is None:
+            module, _, attr = self._paths[name].partition(":")
+            # __import__ rather than importlib, so the import shows up in
+            # python -X importtime
+            cls = getattr(__import__(module, fromlist=[attr]), attr)
+            self._classes[name] = cls
+        return cls
+
+    def __contains__(self, name) -> bool:
+        return name in self._paths
+
+    def __iter__(self):
+        return iter(self._paths)
+
+    def __len__(self) -> int:
+        return len(self._paths)
+
+
+_AI_PLAYER_PATHS = {
+    "easy": "tictactoe.player.ai.easy:EasyAIPlayer",
+    "medium": "tictactoe.player.ai.medium:MediumAIPlayer",
+    "hard": "tictactoe.player.ai.hard:HardAIPlayer",
+    "negamax": "tictactoe.player.ai.negamax:NegamaxAIPlayer",
+    "iterative": "tictactoe.player.ai.iterative:IterativeDeepeningAIPlayer",
+    "mcts": "tictactoe.player.ai.mcts:MCTSAIPlayer",
+    "table": "tictactoe.player.ai.table:TableAIPlayer",
+    "tablebase": "tictactoe.player.ai.tablebase:TablebaseAIPlayer",
+}
+
+AI_PLAYERS = Registry(_AI_PLAYER_PATHS)
+
+PLAYERS = Registry({
+    "manual": "tictactoe.player.manual:ManualPlayer",
+    **_AI_PLAYER_PATHS,
+})
+
+RENDERERS = Registry({
+    "console": "tictactoe.renderer.console:ConsoleRenderer",
+    "tkinter": "tictactoe.renderer.tkinter:TkinterRenderer",
+})
@@ -1,16 +1,183 @@
+"""
+Console renderer. On a terminal the board is drawn once and then only the
+cells that changed are repainted, using ANSI escape codes to move the cursor
+to them. Each frame is sent with a single write, so spectating fast games,
+such as a self-play run over SSH, doesn't flood the terminal. When the output
+isn't a terminal, the whole board is written as plain text every frame.
+"""
+
+import os
+import sys
+import time
+
 from tictactoe import TicTacToe
+from tictactoe.bitboard import iter_cells
+from tictactoe.board import Board
+from tictactoe.board import get_changed_cells
 from tictactoe.player.ai import AIPlayer
-from tictactoe.player.ai.easy import EasyAIPlayer
-from tictactoe.player.ai.medium import MediumAIPlayer
-from tictactoe.player.ai.hard import HardAIPlayer
-from tictactoe.player.manual import ManualPlayer
 from tictactoe.renderer import Renderer
-from tictactoe.renderer.console import ConsoleRenderer
-from tictactoe.renderer.tkinter import TicTacToeRoot
+
+CLEAR_SCREEN = "\x1b[H\x1b[2J"
+CLEAR_LINE = "\x1b[2K"
+CLEAR_BELOW = "\x1b[J"
+
+# Characters between the left edges of two cells, and the column of the
+# letter within a cell
+CELL_WIDTH = 4
+LETTER_OFFSET = 1
+
+
+def move_cursor(row: int, column: int) -> str:
+    """
+    Returns the ANSI escape code moving the cursor to the given screen row and
+    column, counting from 0.
+
+    Arguments:
+        row (int): Screen row.
+        column (int): Screen column.
+
+    Returns:
+        str
+    """
+
+    return f"\x1b[{row + 1};{column + 1}H"
+
+
+def format_board(board: Board) -> str:
+    """
+    Returns the board as plain text, with rows of cells separated by lines.
+
+    Arguments:
+        board (:class:`~Board`): The board.
+
+    Returns:
+        str
+    """
+
+    separator = "+".join(["-" * (CELL_WIDTH - 1)] * board.width)
+    rows = ["|".join(f" {cell or ' '} " for cell in row) for row in board]
+    return f"\n{separator}\n".join(rows) + "\n"
 
 
 class ConsoleRenderer(Renderer):
+    """
+    Renders the game as text.
+
+    Arguments:
+        tic_tac_toe (:class:`~TicTacToe`): Tic tac toe object for business
+            logic. May be None when only :meth:`draw` is used, such as to
+            spectate several games.
+        out: File to write to. Defaults to standard output.
+        ansi (bool): Whether to repaint changed cells with ANSI escape codes.
+            Defaults to whether the output is a terminal.
+        max_fps (float): If given, frames drawn sooner than this allows after
+            the last one are skipped, unless forced.
+    """
+
+    def __init__(self, tic_tac_toe: TicTacToe = None, out=None, ansi: bool = None,
+                 max_fps: float = None):
+        super().__init__(tic_tac_toe)
+
+        self._out = out if out is not None else sys.stdout
+        if ansi is None:
+            ansi = self._out.isatty() and os.environ.get("TERM") != "dumb"
+        self._ansi = ansi
+        self._interval = 1 / max_fps if max_fps else 0
+
+        self._drawn = None
+        self._status = None
+        self._last_frame = None
+
+    def render(self, status: str = ""):
+        """
+        Draws the current state of the game, always sending the frame.
+
+        Arguments:
+            status (str): Line shown under the board.
+        """
+
+        self.draw(self._tic_tac_toe.grid, status, force=True)
+
+    def draw(self, board: Board, status: str = "", force: bool = False) -> bool:
+        """
+        Draws the given board with a status line under it, as a single write.
+        Returns whether the frame was sent, rather than skipped for the frame
+        rate.
+
+        Arguments:
+            board (:class:`~Board`): Board to draw.
+            status (str): Line shown under the board.
+            force (bool): Whether to send the frame regardless of the frame
+                rate.
+
+        Returns:
+            bool
+        """
+
+        now = time.monotonic()
+        if not force and self._last_frame is not None and now - self._last_frame < self._interval:
+            return False
+        self._last_frame = now
+
+        if not self._ansi:
+            frame = format_board(board) + (status + "\n" if status else "") + "\n"
+        elif self._drawn is None or (self._drawn.width, self._drawn.height) != \
+                (board.width, board.height):
+            frame = CLEAR_SCREEN + format_board(board) + status + "\n"
+        else:
+            frame = self._repaint(board, status)
+
+        self._drawn = board
+        self._status = status
+        self._out.write(frame)
+        self._out.flush()
+        return True
+
+    def mainloop(self):
+        """
+        Plays the game in the console until it is over, asking each player
+        for their move in turn.
+        """
+
+        tic_tac_toe = self._tic_tac_toe
+        self.render()
+
+        while not tic_tac_toe.game_over:
+            player = tic_tac_toe.current_player
+            move = player.get_move(tic_tac_toe.grid)
+            if move is not None and tic_tac_toe.place(*move):
+                self.render()
+            elif isinstance(player, AIPlayer):
+                self.render(f"An AI player picked an invalid move! {player.name} forfeits.")
+                return
+            else:
+                self.render("Invalid move.")
+
+        winner = tic_tac_toe.winner
+        self.render("Stalemate!" if winner is None else f"{winner.name} wins!")
+
+    def _repaint(self, board: Board, status: str) -> str:
+        """
+        Returns the escape codes and letters repainting the cells and status
+        line that changed since the last frame, leaving the cursor on the
+        line under the status line.
+
+        Arguments:
+            board (:class:`~Board`): Board to draw.
+            status (str): Line shown under the board.
+
+        Returns:
+            str
+        """
+
+        parts = []
+        for x, y in iter_cells(get_changed_cells(self._drawn, board), board.width):
+            parts.append(move_cursor(y * 2, x * CELL_WIDTH + LETTER_OFFSET))
+            parts.append(board.get(x, y) or " ")
 
-    def render(self):
-        for row in self._tic_tac_toe.grid:
-            print(row)
+        # Input typed under the board since the last frame is cleared too
+        status_row = board.height * 2 - 1
+        if status != self._status:
+            parts.append(move_cursor(status_row, 0) + CLEAR_LINE + status)
+        parts.append(move_cursor(status_row + 1, 0) + CLEAR_BELOW)
+        return "".join(parts)
@@ -4,12 +4,5 @@ from tictactoe.renderer.tkinter.root import TicTacToeRoot
 
 class TkinterRenderer(Renderer):
 
-    def __init__(self, *args):
-        super().__init__(*args)
-
-        self._app = None
-    
-    def render(self):
-        if self._app is None:
-            self._app = TicTacToeRoot()
-            self._app.mainloop()
+    def mainloop(self):
+        TicTacToeRoot(self._tic_tac_toe, self._tic_tac_toe.players).mainloop()
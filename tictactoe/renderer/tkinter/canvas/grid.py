@@ -1,12 +1,48 @@
 import tkinter as tk
 
-TILE_SIZE = 100
+from tictactoe.bitboard import iter_cells
+from tictactoe.board import get_changed_cells
+from tictactoe.renderer.tkinter.style import BLACK
+
+# Share of a tile taken up by the letter in it
+LETTER_SCALE = 0.6
+
+LINE_WIDTH = 2
+
+
+def get_geometry(canvas_width: int, canvas_height: int, grid_width: int,
+                 grid_height: int) -> tuple[float, float, float]:
+    """
+    Returns the size of a tile and the canvas coordinates of the top left
+    corner of the grid, fitting the grid in the middle of the canvas with
+    square tiles.
+
+    Arguments:
+        canvas_width (int): Width of the canvas in pixels.
+        canvas_height (int): Height of the canvas in pixels.
+        grid_width (int): Width of the grid in tiles.
+        grid_height (int): Height of the grid in tiles.
+
+    Returns:
+        tuple[float]
+    """
+
+    tile_size = max(min(canvas_width / grid_width, canvas_height / grid_height), 1)
+    left = (canvas_width - tile_size * grid_width) / 2
+    top = (canvas_height - tile_size * grid_height) / 2
+    return tile_size, left, top
 
 
 class GridCanvas(tk.Canvas):
     """
     Tkinter canvas specifically for the grid.
 
+    Canvas items are created once and kept: the grid lines are moved when
+    the canvas is resized, and letters are only created, changed or deleted
+    for the cells that changed since the last draw. Resizes are combined, so
+    a burst of ``<Configure>`` events while the window is dragged results in
+    a single relayout once Tkinter is idle.
+
     Arguments:
         tic_tac_toe (:class:`~TicTacToe`): Tic tac toe object for business
             logic.
@@ -18,46 +54,79 @@ class GridCanvas(tk.Canvas):
 
         self._tic_tac_toe = tic_tac_toe
 
+        self._line_ids = []
+        self._letter_ids = {}
+        self._drawn = None
+        self._geometry = (1, 0, 0)
+        self._relayout_id = None
+
     def redraw(self):
         """
-        Redraws the grid.
+        Schedules a relayout of the grid for when Tkinter is idle. Calls made
+        before then are combined into the same relayout.
         """
-        
-        # Clear the canvas and start with a fresh slate
-        self.delete(tk.ALL)
 
-        for i in range(len(self._tic_tac_toe.grid)):
-            canvas_y = TILE_SIZE * i
-            
-            for j in range(self._grid_size):
-                canvas_x = TILE_SIZE * j
+        if self._relayout_id is None:
+            self._relayout_id = self.after_idle(self._relayout)
 
-                cell = self._tic_tac_toe.grid[i][j]
-                if cell:
-                    self.create_text(canvas_x, canvas_y, text=cell)
+    def refresh(self):
+        """
+        Updates the letters of the cells that changed since the last draw.
+        """
 
-    def on_click(self, canvas_x, canvas_y):
+        board = self._tic_tac_toe.grid
+        if self._drawn is not None and (self._drawn.width, self._drawn.height) != \
+                (board.width, board.height):
+            self._clear()
+            self.redraw()
+
+        tile_size, left, top = self._geometry
+        font = self._get_font(tile_size)
+
+        for x, y in iter_cells(get_changed_cells(self._drawn, board), board.width):
+            idx = y * board.width + x
+            letter = board[y][x]
+            item = self._letter_ids.get(idx)
+
+            if not letter:
+                if item is not None:
+                    self.delete(item)
+                    del self._letter_ids[idx]
+            elif item is None:
+                self._letter_ids[idx] = self.create_text(
+                    left + (x + 0.5) * tile_size, top + (y + 0.5) * tile_size,
+                    text=letter, font=font, fill=BLACK)
+            else:
+                self.itemconfigure(item, text=letter)
+
+        self._drawn = board
+
+    def on_click(self, canvas_x, canvas_y) -> bool:
         """
-        Handles canvas click events.
+        Handles canvas click events. Returns whether a move was placed.
 
         Arguments:
             canvas_x (int): Canvas X coordinate.
             canvas_y (int): Canvas Y coordinate.
+
+        Returns:
+            bool
         """
 
-        x_grid, y_grid = canvas_x // TILE_SIZE, canvas_y // TILE_SIZE
+        tile_size, left, top = self._geometry
+        x_grid = int((canvas_x - left) // tile_size)
+        y_grid = int((canvas_y - top) // tile_size)
 
         # Don't allow input outside the grid
-        grid_size = len(self._tic_tac_toe.grid)
-        if 0 <= x_grid < grid_size and 0 <= y_grid < grid_size:
-            self.select(x_grid, y_grid)
+        if 0 <= x_grid < self._tic_tac_toe.width and 0 <= y_grid < self._tic_tac_toe.height:
+            return self.place(x_grid, y_grid)
+        return False
 
-    def place(self, letter, x, y):
+    def place(self, x, y):
         """
-        Places a position on the grid and returns the result.
+        Places the current player's letter on the grid and returns the result.
 
         Arguments:
-            letter (str): The letter to place.
             x (int): Grid X coordinate.
             y (int): Grid Y coordinate.
 
@@ -65,9 +134,63 @@ class GridCanvas(tk.Canvas):
             bool
         """
 
-        valid = self._tic_tac_toe.place(letter, x, y)
+        valid = self._tic_tac_toe.place(x, y)
         if valid:
-            canvas_x, canvas_y = x * TILE_SIZE, y * TILE_SIZE
-            self.create_text(canvas_x, canvas_y, text=letter)
-        
+            self.refresh()
+
         return valid
+
+    def _relayout(self):
+        """
+        Moves the grid lines and letters to fit the current canvas size,
+        creating the grid lines the first time.
+        """
+
+        self._relayout_id = None
+
+        width, height = self._tic_tac_toe.width, self._tic_tac_toe.height
+        tile_size, left, top = get_geometry(self.winfo_width(), self.winfo_height(), width, height)
+        self._geometry = (tile_size, left, top)
+
+        if not self._line_ids:
+            for _ in range(width + height - 2):
+                self._line_ids.append(self.create_line(0, 0, 0, 0, width=LINE_WIDTH, fill=BLACK))
+
+        right, bottom = left + tile_size * width, top + tile_size * height
+        lines = iter(self._line_ids)
+        for i in range(1, width):
+            self.coords(next(lines), left + i * tile_size, top, left + i * tile_size, bottom)
+        for i in range(1, height):
+            self.coords(next(lines), left, top + i * tile_size, right, top + i * tile_size)
+
+        font = self._get_font(tile_size)
+        for idx, item in self._letter_ids.items():
+            x, y = idx % width, idx // width
+            self.coords(item, left + (x + 0.5) * tile_size, top + (y + 0.5) * tile_size)
+            self.itemconfigure(item, font=font)
+
+        self.refresh()
+
+    def _clear(self):
+        """
+        Deletes every canvas item, for when the grid changes shape.
+        """
+
+        self.delete(tk.ALL)
+        self._line_ids = []
+        self._letter_ids = {}
+        self._drawn = None
+
+    def _get_font(self, tile_size: float) -> tuple:
+        """
+        Returns the font for letters on tiles of the given size.
+
+        Arguments:
+            tile_size (float): Size of a tile in pixels.
+
+        Returns:
+            tuple
+        """
+
+        # Negative sizes are in pixels rather than points
+        return None, -max(int(tile_size * LETTER_SCALE), 1)
@@ -1,7 +1,12 @@
+import queue
+import threading
+import time
 import tkinter as tk
+from concurrent.futures import ThreadPoolExecutor
 
 from tictactoe import TicTacToe
 from tictactoe.player import Player
+from tictactoe.player.ai import AIPlayer
 from tictactoe.renderer.tkinter.canvas.grid import GridCanvas
 from tictactoe.renderer.tkinter.event import BUTTON_1
 from tictactoe.renderer.tkinter.event import CONFIGURE
@@ -16,14 +21,30 @@ PLAY = "PLAY"
 PLAY_AGAIN = "PLAY AGAIN"
 
 GAME_OVER_DELAY = 3500
+
+# Minimum time an AI move takes to appear, in milliseconds, so the player can
+# follow the game. Slower searches are shown as soon as they finish.
 AI_DELAY = 1000
 
+# How often to check for a finished AI move, in milliseconds
+AI_POLL_INTERVAL = 20
+
 
 class TicTacToeRoot(tk.Tk):
     """
     Root widget of the Tkinter window.
+
+    AI moves are computed on a worker thread so the window stays responsive
+    during long searches. Finished moves are passed back through a queue that
+    is polled with :meth:`after`. Each game has its own number. Starting a
+    new game or closing the window moves on to a new number and sets the
+    cancel event of the search under way, so AIs that can stop early do, and
+    any move still arriving for an old game is dropped.
     """
 
+    # Clock used to time AI moves against AI_DELAY
+    _clock = staticmethod(time.monotonic)
+
     def __init__(self, tic_tac_toe: TicTacToe, players: list[Player]):
         super().__init__()
 
@@ -33,6 +54,7 @@ class TicTacToeRoot(tk.Tk):
 
         self._tic_tac_toe = tic_tac_toe
         self._players = players
+        self._init_ai_moves()
 
         game_container = tk.Frame(self)
 
@@ -45,7 +67,21 @@ class TicTacToeRoot(tk.Tk):
 
         grid_canvas.bind(BUTTON_1, lambda event: self._on_grid_canvas_click(event, grid_canvas))
         grid_canvas.bind(CONFIGURE, lambda *args: grid_canvas.redraw())
+
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
     
+    def _init_ai_moves(self):
+        """
+        Sets up the worker thread and queue for AI moves.
+        """
+
+        self._executor = ThreadPoolExecutor(1)
+        self._ai_moves = queue.Queue()
+        self._game = 0
+        self._ai_future = None
+        self._ai_cancel = None
+        self._poll_id = None
+
     def _show_start_frame(self, grid_canvas):
         """
         Shows the starting screen with the "play" button.
@@ -54,11 +90,11 @@ class TicTacToeRoot(tk.Tk):
             grid_canvas (:class:`~GridCanvas`): Grid canvas object.
         """
 
-        frame = tk.Frame(self, bg=PRIMARY_COLOR)
-        label_container = tk.Frame(frame, bg=PRIMARY_COLOR)
-        play_button_border = tk.Frame(label_container, borderwidth=2, bg=SECONDARY_COLOR, relief=tk.FLAT)
-        play_button_padding = tk.Frame(play_button_border, bg=PRIMARY_COLOR)
-        play_button_label = tk.Label(play_button_padding, text=PLAY, width=10, bg=PRIMARY_COLOR, fg=SECONDARY_COLOR, font=(None, 16, BOLD), relief=tk.FLAT)
+        frame = tk.Frame(self, bg=WHITE)
+        label_container = tk.Frame(frame, bg=WHITE)
+        play_button_border = tk.Frame(label_container, borderwidth=2, bg=BLACK, relief=tk.FLAT)
+        play_button_padding = tk.Frame(play_button_border, bg=WHITE)
+        play_button_label = tk.Label(play_button_padding, text=PLAY, width=10, bg=WHITE, fg=BLACK, font=(None, 16, BOLD), relief=tk.FLAT)
         play_button_label.pack(padx=10, pady=10)
         play_button_padding.pack()
         play_button_border.pack(side=tk.TOP, pady=(20, 0))
@@ -80,11 +116,7 @@ class TicTacToeRoot(tk.Tk):
         frame = tk.Frame(self, bg=WHITE)
         label_container = tk.Frame(frame, bg=WHITE)
 
-        winner = None
-        for player in self._players:
-            if player.letter == self._tic_tac_toe.winner:
-                winner = player
-        
+        winner = self._tic_tac_toe.winner
         if winner is None:
             winner_text = "Stalemate!"
         else:
@@ -117,9 +149,11 @@ class TicTacToeRoot(tk.Tk):
             grid_canvas (:class:`~GridCanvas`): Grid canvas object.
         """
 
+        self._cancel_ai_move()
         self._tic_tac_toe.reset()
         start_frame.place_forget()
-        grid_canvas.redraw()
+        grid_canvas.refresh()
+        self._next_turn(grid_canvas)
     
     def _on_grid_canvas_click(self, event, grid_canvas):
         """
@@ -130,7 +164,122 @@ class TicTacToeRoot(tk.Tk):
             grid_canvas (:class:`~GridCanvas`): Grid grid_canvas object.
         """
 
-        grid_canvas.on_click(event.x, event.y)
+        # Clicks are ignored while an AI is picking its move
+        if self._tic_tac_toe.game_over or isinstance(self._tic_tac_toe.current_player, AIPlayer):
+            return
+
+        if grid_canvas.on_click(event.x, event.y):
+            self._next_turn(grid_canvas)
+
+    def _on_close(self):
+        """
+        Called when the window is closed. Cancels any AI move being searched
+        for and stops the worker thread once it is done.
+        """
+
+        self._cancel_ai_move()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self.destroy()
+
+    def _next_turn(self, grid_canvas):
+        """
+        Moves on to the next turn: shows the game over frame if the game has
+        ended, or starts the AI's search if it is an AI's turn.
+
+        Arguments:
+            grid_canvas (:class:`~GridCanvas`): Grid canvas object.
+        """
 
         if self._tic_tac_toe.game_over:
-            self.after(GAME_OVER_DELAY, lambda: self._show_game_over(grid_canvas))
+            game = self._game
+            self.after(GAME_OVER_DELAY,
+                       lambda: game == self._game and self._show_game_over(grid_canvas))
+            return
+
+        player = self._tic_tac_toe.current_player
+        if not isinstance(player, AIPlayer):
+            return
+
+        game = self._game
+        started = self._clock()
+        grid = self._tic_tac_toe.grid
+        cancel = threading.Event()
+
+        def get_move():
+            # Runs on the worker thread. The board is immutable, so the AI can
+            # read it while the game carries on. A cancelled search raises.
+            try:
+                move = player.get_move(grid, cancel=cancel)
+            except Exception:
+                move = None
+            self._ai_moves.put((game, started, move))
+
+        self._ai_cancel = cancel
+        self._ai_future = self._executor.submit(get_move)
+        if self._poll_id is None:
+            self._poll_id = self.after(AI_POLL_INTERVAL, lambda: self._poll_ai_move(grid_canvas))
+
+    def _poll_ai_move(self, grid_canvas):
+        """
+        Checks whether the AI has picked its move. The move is placed once at
+        least :data:`AI_DELAY` has passed since the search started.
+
+        Arguments:
+            grid_canvas (:class:`~GridCanvas`): Grid canvas object.
+        """
+
+        self._poll_id = None
+
+        try:
+            game, started, move = self._ai_moves.get_nowait()
+        except queue.Empty:
+            if self._ai_future is not None:
+                self._poll_id = self.after(AI_POLL_INTERVAL,
+                                           lambda: self._poll_ai_move(grid_canvas))
+            return
+
+        # Moves searched for an earlier game are dropped
+        if game != self._game:
+            self._poll_ai_move(grid_canvas)
+            return
+
+        self._ai_future = None
+        self._ai_cancel = None
+        remaining = int(AI_DELAY - (self._clock() - started) * 1000)
+        self.after(max(remaining, 0), lambda: self._place_ai_move(game, move, grid_canvas))
+
+    def _place_ai_move(self, game, move, grid_canvas):
+        """
+        Places a move picked by the AI, unless a new game has been started
+        since. An AI that fails to pick a valid move ends the game.
+
+        Arguments:
+            game (int): Number of the game the move was picked for.
+            move (tuple[int]): The move, or None if the AI failed.
+            grid_canvas (:class:`~GridCanvas`): Grid canvas object.
+        """
+
+        if game != self._game:
+            return
+
+        if move is None or not grid_canvas.place(*move):
+            print("An AI player picked an invalid move!")
+            self._show_game_over(grid_canvas)
+            return
+
+        self._next_turn(grid_canvas)
+
+    def _cancel_ai_move(self):
+        """
+        Drops the AI move being searched for, if any, by moving on to a new
+        game number. A search that hasn't started yet is cancelled outright,
+        and one under way is asked to stop through its cancel event.
+        """
+
+        self._game += 1
+        if self._ai_future is not None:
+            self._ai_future.cancel()
+            self._ai_future = None
+        if self._ai_cancel is not None:
+            self._ai_cancel.set()
+            self._ai_cancel = None
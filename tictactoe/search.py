@@ -0,0 +1,440 @@
+"""
+Game tree search over player bitmasks, used by the search-based AI players.
+Positions are always seen from the side to move: ``mine`` holds the cells of
+the player about to move, and ``theirs`` the cells of their opponent.
+"""
+
+import time
+
+from tictactoe.bitboard import cell_index
+from tictactoe.bitboard import full_mask
+from tictactoe.bitboard import is_win_at
+from tictactoe.bitboard import win_masks
+from tictactoe.symmetry import canonicalize
+from tictactoe.symmetry import to_canonical
+from tictactoe.symmetry import to_original
+
+# Scores at or above WIN_SCORE are forced wins. The number of cells left empty
+# is added on, so quicker wins score higher. Heuristic scores always stay
+# strictly between -WIN_SCORE and WIN_SCORE.
+WIN_SCORE = 1 << 20
+
+# Results for the side to move, as stored by the solution table and
+# tablebases
+LOSS = 0
+DRAW = 1
+WIN = 2
+
+# Flags for transposition table entries, depending on whether the stored
+# score is exact or only a bound from an alpha-beta cutoff
+EXACT = 0
+LOWER_BOUND = 1
+UPPER_BOUND = 2
+
+# The transposition table is cleared once it holds this many positions
+MAX_TABLE_SIZE = 1 << 20
+
+# How many positions are searched between checks of the clock in timed
+# searches, and of the cancel event. Must be one less than a power of two.
+CLOCK_CHECK_INTERVAL = 63
+
+
+def get_result(score: int) -> int:
+    """
+    Returns the result for the side to move of a position given its score
+    from a full-depth search: :data:`WIN`, :data:`LOSS` or :data:`DRAW`.
+
+    Arguments:
+        score (int): Score from :meth:`Negamax.search`.
+
+    Returns:
+        int
+    """
+
+    if score >= WIN_SCORE:
+        return WIN
+    if score <= -WIN_SCORE:
+        return LOSS
+    return DRAW
+
+
+class SearchTimeout(Exception):
+    """
+    Raised inside a timed search when its time budget runs out.
+    """
+
+    pass
+
+
+class SearchCancelled(Exception):
+    """
+    Raised out of a search when its cancel event is set.
+    """
+
+    pass
+
+
+class Negamax:
+    """
+    Negamax search with alpha-beta pruning, move ordering and a transposition
+    table. The transposition table is kept between searches, so positions
+    reached again on later moves are not searched twice.
+
+    Arguments:
+        width (int): Width of the grid.
+        height (int): Height of the grid.
+        k (int): Number of letters in a row needed to win.
+        max_depth (int): Maximum number of plies to search. If None, searches
+            to the end of the game, which gives perfect play.
+        radius (int): If given, only empty cells within this many cells of an
+            occupied cell are searched. Keeps the branching factor down on
+            large grids. Must be at least 1.
+        symmetry (bool): If True, positions are stored in the transposition
+            table once for all their rotations and reflections. Raises the
+            hit rate, at the cost of canonicalizing every position searched.
+    """
+
+    def __init__(self, width: int, height: int, k: int, max_depth: int = None,
+                 radius: int = None, symmetry: bool = False):
+        self._width = width
+        self._height = height
+        self._k = k
+        self._max_depth = max_depth
+        self._symmetry = symmetry
+        self._full = full_mask(width, height)
+        self._table = {}
+
+        self._neighbours = None
+        if radius is not None:
+            # Every candidate move would be filtered out
+            if radius < 1:
+                raise Exception("Radius must be at least 1")
+            self._neighbours = self._build_neighbours(radius)
+
+        # Order cells from the center outwards, as central cells take part in
+        # the most lines
+        center_x, center_y = (width - 1) / 2, (height - 1) / 2
+        self._cell_order = sorted(
+            range(width * height),
+            key=lambda idx: abs(idx % width - center_x) + abs(idx // width - center_y))
+
+        self._deadline = None
+
+        # Clock for timed searches, in seconds. Can be replaced, such as by a
+        # fake clock in tests.
+        self.clock = time.perf_counter
+
+        # Set from another thread to stop the search with SearchCancelled
+        self.cancel = None
+
+        self.nodes = 0
+        self.cache_hits = 0
+
+    def search(self, mine: int, theirs: int) -> tuple[int, int]:
+        """
+        Searches the given position and returns the bit index of the best move
+        along with its score. The node and cache hit counters are reset at the
+        start of each search.
+
+        Arguments:
+            mine (int): Bitmask of the cells held by the side to move.
+            theirs (int): Bitmask of the cells held by the opponent.
+
+        Returns:
+            tuple[int]
+        """
+
+        self.nodes = 0
+        self.cache_hits = 0
+
+        depth = self._max_depth
+        if depth is None:
+            depth = self._width * self._height
+
+        return self.search_depth(mine, theirs, depth)
+
+    def search_depth(self, mine: int, theirs: int, depth: int) -> tuple[int, int]:
+        """
+        Searches the given position to the given depth and returns the bit
+        index of the best move along with its score. Unlike :meth:`search`, the
+        counters are not reset.
+
+        Arguments:
+            mine (int): Bitmask of the cells held by the side to move.
+            theirs (int): Bitmask of the cells held by the opponent.
+            depth (int): Number of plies to search.
+
+        Returns:
+            tuple[int]
+        """
+
+        if len(self._table) >= MAX_TABLE_SIZE:
+            self._table.clear()
+
+        score = self._negamax(mine, theirs, max(depth, 1), -WIN_SCORE * 2, WIN_SCORE * 2)
+        return self._lookup(mine, theirs)[3], score
+
+    def search_timed(self, mine: int, theirs: int, time_budget: float) -> tuple[int, int, int]:
+        """
+        Searches the given position one ply deeper at a time until the time
+        budget runs out, and returns the bit index of the best move and its
+        score from the deepest completed search, along with that depth. The
+        first ply is always searched in full, even if it overruns the budget.
+
+        Arguments:
+            mine (int): Bitmask of the cells held by the side to move.
+            theirs (int): Bitmask of the cells held by the opponent.
+            time_budget (float): Time budget in seconds.
+
+        Returns:
+            tuple[int]
+        """
+
+        self.nodes = 0
+        self.cache_hits = 0
+
+        max_depth = (self._full & ~(mine | theirs)).bit_count()
+        if self._max_depth is not None:
+            max_depth = min(max_depth, self._max_depth)
+
+        deadline = self.clock() + time_budget
+        move, score = self.search_depth(mine, theirs, 1)
+        depth = 1
+
+        self._deadline = deadline
+        try:
+            while depth < max_depth and abs(score) < WIN_SCORE:
+                move, score = self.search_depth(mine, theirs, depth + 1)
+                depth += 1
+        except SearchTimeout:
+            pass
+        finally:
+            self._deadline = None
+
+        return move, score, depth
+
+    def _negamax(self, mine: int, theirs: int, depth: int, alpha: int, beta: int) -> int:
+        """
+        Returns the score of the given position for the side to move.
+
+        Arguments:
+            mine (int): Bitmask of the cells held by the side to move.
+            theirs (int): Bitmask of the cells held by the opponent.
+            depth (int): Number of plies left to search.
+            alpha (int): Lowest score the side to move is already assured of.
+            beta (int): Highest score the opponent will allow.
+
+        Returns:
+            int
+        """
+
+        self.nodes += 1
+        if not self.nodes & CLOCK_CHECK_INTERVAL:
+            if self._deadline is not None and self.clock() >= self._deadline:
+                raise SearchTimeout()
+            if self.cancel is not None and self.cancel.is_set():
+                raise SearchCancelled()
+
+        empty = self._full & ~(mine | theirs)
+        if not empty:
+            return 0
+        if depth == 0:
+            return self._evaluate(mine, theirs)
+
+        table_move = None
+        entry = self._lookup(mine, theirs)
+        if entry is not None:
+            entry_depth, entry_score, entry_flag, table_move = entry
+            if entry_depth >= depth:
+                self.cache_hits += 1
+                if entry_flag == EXACT:
+                    return entry_score
+                if entry_flag == LOWER_BOUND:
+                    alpha = max(alpha, entry_score)
+                else:
+                    beta = min(beta, entry_score)
+                if alpha >= beta:
+                    return entry_score
+
+        alpha_orig = alpha
+        best_score = None
+        best_move = None
+        empty_count = empty.bit_count()
+
+        for idx in self._ordered_moves(mine, theirs, empty, table_move):
+            bit = 1 << idx
+            if self._is_win(mine | bit, idx):
+                score = WIN_SCORE + empty_count - 1
+            else:
+                score = -self._negamax(theirs, mine | bit, depth - 1, -beta, -alpha)
+
+            if best_score is None or score > best_score:
+                best_score = score
+                best_move = idx
+            alpha = max(alpha, score)
+            if alpha >= beta:
+                break
+
+        if best_score <= alpha_orig:
+            flag = UPPER_BOUND
+        elif best_score >= beta:
+            flag = LOWER_BOUND
+        else:
+            flag = EXACT
+        self._store(mine, theirs, (depth, best_score, flag, best_move))
+
+        return best_score
+
+    def _lookup(self, mine: int, theirs: int) -> tuple | None:
+        """
+        Returns the transposition table entry for the given position, with its
+        best move mapped to the position's orientation, or None if there is no
+        entry.
+
+        Arguments:
+            mine (int): Bitmask of the cells held by the side to move.
+            theirs (int): Bitmask of the cells held by the opponent.
+
+        Returns:
+            tuple or None
+        """
+
+        if not self._symmetry:
+            return self._table.get((mine, theirs))
+
+        canonical_mine, canonical_theirs, transform = canonicalize(
+            mine, theirs, self._width, self._height)
+        entry = self._table.get((canonical_mine, canonical_theirs))
+        if entry is None:
+            return None
+
+        move = to_original(entry[3], transform, self._width, self._height)
+        return entry[0], entry[1], entry[2], move
+
+    def _store(self, mine: int, theirs: int, entry: tuple):
+        """
+        Stores a transposition table entry for the given position.
+
+        Arguments:
+            mine (int): Bitmask of the cells held by the side to move.
+            theirs (int): Bitmask of the cells held by the opponent.
+            entry (tuple): Depth, score, flag and best move.
+        """
+
+        if not self._symmetry:
+            self._table[(mine, theirs)] = entry
+            return
+
+        canonical_mine, canonical_theirs, transform = canonicalize(
+            mine, theirs, self._width, self._height)
+        move = to_canonical(entry[3], transform, self._width, self._height)
+        self._table[(canonical_mine, canonical_theirs)] = (entry[0], entry[1], entry[2], move)
+
+    def _ordered_moves(self, mine: int, theirs: int, empty: int, table_move: int) -> list[int]:
+        """
+        Returns the bit indices of the moves to search, best candidates first:
+        the move stored in the transposition table, then winning moves, then
+        moves blocking an opponent win, then the rest from the center out.
+
+        Arguments:
+            mine (int): Bitmask of the cells held by the side to move.
+            theirs (int): Bitmask of the cells held by the opponent.
+            empty (int): Bitmask of the empty cells.
+            table_move (int): Best move from the transposition table, if any.
+
+        Returns:
+            list[int]
+        """
+
+        candidates = empty
+        if self._neighbours is not None and (mine | theirs):
+            near = 0
+            occupied = mine | theirs
+            while occupied:
+                low = occupied & -occupied
+                near |= self._neighbours[low.bit_length() - 1]
+                occupied ^= low
+            candidates &= near
+
+        wins = []
+        blocks = []
+        rest = []
+        for idx in self._cell_order:
+            bit = 1 << idx
+            if not candidates & bit:
+                continue
+            if idx == table_move:
+                continue
+            if self._is_win(mine | bit, idx):
+                wins.append(idx)
+            elif self._is_win(theirs | bit, idx):
+                blocks.append(idx)
+            else:
+                rest.append(idx)
+
+        moves = wins + blocks + rest
+        if table_move is not None and candidates & (1 << table_move):
+            moves.insert(0, table_move)
+        return moves
+
+    def _is_win(self, board: int, idx: int) -> bool:
+        """
+        Returns whether the given bitmask has k in a row through the given
+        bit index.
+
+        Arguments:
+            board (int): Bitmask of the cells held by a player.
+            idx (int): Bit index of the last move.
+
+        Returns:
+            bool
+        """
+
+        return is_win_at(board, idx % self._width, idx // self._width,
+                         self._width, self._height, self._k)
+
+    def _evaluate(self, mine: int, theirs: int) -> int:
+        """
+        Returns a heuristic score for a position that was not searched to the
+        end. Each line still open to only one player counts for that player,
+        weighted by the square of the number of letters already on it.
+
+        Arguments:
+            mine (int): Bitmask of the cells held by the side to move.
+            theirs (int): Bitmask of the cells held by the opponent.
+
+        Returns:
+            int
+        """
+
+        score = 0
+        for mask in win_masks(self._width, self._height, self._k):
+            if not mask & theirs:
+                score += (mask & mine).bit_count() ** 2
+            elif not mask & mine:
+                score -= (mask & theirs).bit_count() ** 2
+
+        return max(-WIN_SCORE + 1, min(WIN_SCORE - 1, score))
+
+    def _build_neighbours(self, radius: int) -> list[int]:
+        """
+        Builds, for each bit index, the bitmask of cells within the given
+        radius of that cell.
+
+        Arguments:
+            radius (int): Radius around each cell.
+
+        Returns:
+            list[int]
+        """
+
+        neighbours = []
+        for y in range(self._height):
+            for x in range(self._width):
+                mask = 0
+                for near_y in range(max(0, y - radius), min(self._height, y + radius + 1)):
+                    for near_x in range(max(0, x - radius), min(self._width, x + radius + 1)):
+                        mask |= 1 << cell_index(near_x, near_y, self._width)
+                neighbours.append(mask)
+
+        return neighbours
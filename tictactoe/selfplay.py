@@ -0,0 +1,348 @@
+"""
+Headless AI-vs-AI games, for running many games quickly. Games are split
+across worker processes and nothing is printed until every game is done.
+Run with:
+
+    python -m tictactoe selfplay PLAYER_ONE PLAYER_TWO [--games N] [--workers N]
+"""
+
+import argparse
+import ast
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+
+from tictactoe import TicTacToe
+from tictactoe.profiling import GameProfiler
+from tictactoe.record import RESULT_DRAW
+from tictactoe.record import GameWriter
+from tictactoe.registry import AI_PLAYERS
+from tictactoe.renderer.console import ConsoleRenderer
+
+# Most frames drawn per second when watching games
+WATCH_FPS = 20
+
+
+@dataclass
+class SelfPlayResult:
+    """
+    Totals from a self-play run, from the point of view of player one, along
+    with the profiler if the games were profiled.
+    """
+
+    wins: int = 0
+    draws: int = 0
+    losses: int = 0
+    seconds: float = 0.0
+    profiler: GameProfiler = None
+
+    @property
+    def games(self) -> int:
+        return self.wins + self.draws + self.losses
+
+    @property
+    def games_per_second(self) -> float:
+        if not self.seconds:
+            return 0.0
+        return self.games / self.seconds
+
+    def merge(self, other: "SelfPlayResult"):
+        """
+        Adds the totals and profiler records from another batch of games.
+
+        Arguments:
+            other (:class:`~SelfPlayResult`): Results to add.
+        """
+
+        self.wins += other.wins
+        self.draws += other.draws
+        self.losses += other.losses
+
+        if other.profiler is not None:
+            if self.profiler is None:
+                self.profiler = GameProfiler()
+            self.profiler.merge(other.profiler)
+
+
+def play_game(tic_tac_toe: TicTacToe, renderer: ConsoleRenderer = None,
+              status: str = "") -> int:
+    """
+    Plays a game between the two players of the given game, from a reset
+    grid, and returns the player index of the winner or None for a stalemate.
+    A player who picks an invalid move loses.
+
+    Arguments:
+        tic_tac_toe (:class:`~TicTacToe`): Game with both players added.
+        renderer (:class:`~ConsoleRenderer`): If given, the board is drawn
+            after every move.
+        status (str): Line shown under the board.
+
+    Returns:
+        int or None
+    """
+
+    tic_tac_toe.reset()
+    players = tic_tac_toe.players
+
+    turn = 0
+    while not tic_tac_toe.game_over:
+        move = players[turn].get_move(tic_tac_toe.grid)
+        if move is None or not tic_tac_toe.place(*move):
+            return 1 - turn
+        if renderer is not None:
+            renderer.draw(tic_tac_toe.grid, status)
+        turn = 1 - turn
+
+    winner = tic_tac_toe.winner
+    if winner is None:
+        return None
+    return players.index(winner)
+
+
+def play_games(player_one: str, player_two: str, games: int, first_game: int = 0,
+               alternate: bool = False, width: int = 3, height: int = 3, k: int = None,
+               options_one: dict = None, options_two: dict = None,
+               profiler: GameProfiler = None, record: str = None,
+               watch: bool = False) -> SelfPlayResult:
+    """
+    Plays a batch of games and returns the totals for player one. Players are
+    created once and reused for every game, so any caches they keep carry
+    over, and are closed once the games are done.
+
+    Arguments:
+        player_one (str): Name of the first AI, from :data:`AI_PLAYERS`.
+        player_two (str): Name of the second AI.
+        games (int): Number of games to play.
+        first_game (int): Number of the first game in the whole run. With
+            alternate, decides which player starts.
+        alternate (bool): Whether to swap who moves first every game.
+        width (int): Width of the grid.
+        height (int): Height of the grid.
+        k (int): Number of letters in a row needed to win.
+        options_one (dict): Extra options for the first AI.
+        options_two (dict): Extra options for the second AI.
+        profiler (:class:`~GameProfiler`): If given, every game is profiled
+            and the profiler is returned with the results.
+        record (str): If given, every game is appended to this record file.
+        watch (bool): Whether to draw the games in the console as they are
+            played, at up to :data:`WATCH_FPS` frames per second.
+
+    Returns:
+        :class:`~SelfPlayResult`
+    """
+
+    options_one = dict(options_one or {}, verbose=False)
+    options_two = dict(options_two or {}, verbose=False)
+    if k is not None:
+        options_one.setdefault("k", k)
+        options_two.setdefault("k", k)
+
+    # One game with player one moving first, and one with player two first
+    one_first = TicTacToe(width, height, k)
+    one_first.add_player(AI_PLAYERS[player_one], "X", player_one, **options_one)
+    one_first.add_player(AI_PLAYERS[player_two], "O", player_two, **options_two)
+
+    two_first = TicTacToe(width, height, k)
+    if alternate:
+        two_first.add_player(AI_PLAYERS[player_two], "X", player_two, **options_two)
+        two_first.add_player(AI_PLAYERS[player_one], "O", player_one, **options_one)
+
+    writer = None
+    try:
+        if profiler is not None:
+            profiler.attach(one_first)
+            if alternate:
+                profiler.attach(two_first)
+
+        if record is not None:
+            writer = GameWriter(record)
+
+        renderer = None
+        if watch:
+            renderer = ConsoleRenderer(max_fps=WATCH_FPS)
+
+        result = SelfPlayResult(profiler=profiler)
+        for game in range(first_game, first_game + games):
+            swapped = alternate and game % 2 == 1
+            tic_tac_toe = two_first if swapped else one_first
+            status = (f"Game {game - first_game + 1}/{games}: {result.wins} wins, "
+                      f"{result.draws} draws, {result.losses} losses") if watch else ""
+            winner = play_game(tic_tac_toe, renderer, status)
+
+            if writer is not None:
+                writer.write(tic_tac_toe, RESULT_DRAW if winner is None else winner + 1)
+
+            if winner is None:
+                result.draws += 1
+            elif (winner == 0) != swapped:
+                result.wins += 1
+            else:
+                result.losses += 1
+    finally:
+        if writer is not None:
+            writer.close()
+        # Shut down any worker processes the players started
+        for player in one_first.players + two_first.players:
+            player.close()
+
+    if renderer is not None and games:
+        renderer.draw(tic_tac_toe.grid, f"{result.games} games: {result.wins} wins, "
+                                        f"{result.draws} draws, {result.losses} losses", force=True)
+
+    return result
+
+
+def run_selfplay(player_one: str, player_two: str, games: int, workers: int = 1,
+                 record: str = None, **kwargs) -> SelfPlayResult:
+    """
+    Plays the given number of games, split into one batch per worker process.
+    When recording, each worker writes its games to a file of its own, which
+    are appended to the record file in order once every game is done.
+
+    Arguments:
+        player_one (str): Name of the first AI, from :data:`AI_PLAYERS`.
+        player_two (str): Name of the second AI.
+        games (int): Number of games to play.
+        workers (int): Number of worker processes. With 1, the games are
+            played in the calling process.
+        record (str): If given, every game is appended to this record file.
+        **kwargs: Options passed on to :func:`play_games`.
+
+    Returns:
+        :class:`~SelfPlayResult`
+    """
+
+    result = SelfPlayResult()
+    start = time.perf_counter()
+
+    if workers == 1:
+        result.merge(play_games(player_one, player_two, games, record=record, **kwargs))
+    else:
+        batches = []
+        first_game = 0
+        for i in range(workers):
+            size = games // workers + (1 if i < games % workers else 0)
+            batches.append((first_game, size))
+            first_game += size
+
+        parts = []
+        with ProcessPoolExecutor(workers) as executor:
+            futures = []
+            for first_game, size in batches:
+                if not size:
+                    continue
+                part = None
+                if record is not None:
+                    part = f"{record}.{first_game}.part"
+                    parts.append(part)
+                futures.append(executor.submit(play_games, player_one, player_two, size,
+                                               first_game, record=part, **kwargs))
+            for future in futures:
+                result.merge(future.result())
+
+        if record is not None:
+            with GameWriter(record) as writer:
+                for part in parts:
+                    writer.write_from(part)
+                    os.remove(part)
+
+    result.seconds = time.perf_counter() - start
+    return result
+
+
+def parse_options(options: list[str]) -> dict:
+    """
+    Parses player options given as key=value, with values read as Python
+    literals where possible.
+
+    Arguments:
+        options (list[str]): Options to parse.
+
+    Returns:
+        dict
+    """
+
+    parsed = {}
+    for option in options:
+        key, _, value = option.partition("=")
+        try:
+            parsed[key] = ast.literal_eval(value)
+        except (ValueError, SyntaxError):
+            parsed[key] = value
+
+    return parsed
+
+
+def add_parser(subparsers):
+    """
+    Adds the selfplay command to the command line parser.
+
+    Arguments:
+        subparsers: Subparsers of the main command line parser.
+    """
+
+    parser = subparsers.add_parser("selfplay", help="play AI players against each other",
+                                   description="Play AI players against each other.")
+    parser.add_argument("player_one", choices=AI_PLAYERS, help="first AI")
+    parser.add_argument("player_two", choices=AI_PLAYERS, help="second AI")
+    parser.add_argument("--games", type=int, default=1000, help="number of games (default: 1000)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="number of worker processes (default: one per CPU)")
+    parser.add_argument("--size", type=int, nargs=3, default=[3, 3, 3],
+                        metavar=("WIDTH", "HEIGHT", "K"), help="grid shape (default: 3 3 3)")
+    parser.add_argument("--alternate", action="store_true",
+                        help="swap which player moves first every game")
+    parser.add_argument("--options-one", nargs="*", default=[], metavar="KEY=VALUE",
+                        help="options for the first AI, e.g. max_depth=4")
+    parser.add_argument("--options-two", nargs="*", default=[], metavar="KEY=VALUE",
+                        help="options for the second AI")
+    parser.add_argument("--record", metavar="FILE", help="append every game to a record file")
+    parser.add_argument("--watch", action="store_true",
+                        help="draw the games in the console as they are played (uses one worker)")
+    parser.add_argument("--profile", action="store_true",
+                        help="time every move and print a summary")
+    parser.add_argument("--profile-allocations", action="store_true",
+                        help="also measure memory allocated by every move (slow)")
+    parser.add_argument("--profile-moves", type=int, nargs="*", default=[], metavar="MOVE",
+                        help="move numbers to capture with cProfile")
+    parser.add_argument("--profile-dir", default="profiles",
+                        help="directory for cProfile stats files (default: profiles)")
+    parser.set_defaults(command=main)
+
+
+def main(args: argparse.Namespace):
+    """
+    Runs the selfplay command and prints the results.
+
+    Arguments:
+        args (:class:`~argparse.Namespace`): Parsed command line arguments.
+    """
+
+    profiler = None
+    if args.profile or args.profile_allocations or args.profile_moves:
+        profiler = GameProfiler(args.profile_allocations, args.profile_moves, args.profile_dir)
+
+    # Games are drawn from a single process, so several workers can't share the console
+    workers = 1 if args.watch else args.workers
+
+    width, height, k = args.size
+    result = run_selfplay(
+        args.player_one, args.player_two, args.games, workers,
+        alternate=args.alternate, width=width, height=height, k=k,
+        options_one=parse_options(args.options_one),
+        options_two=parse_options(args.options_two),
+        profiler=profiler, record=args.record, watch=args.watch)
+
+    games = max(result.games, 1)
+    print(f"{args.player_one} vs {args.player_two}: {result.games} games on {width}x{height}, "
+          f"{k} in a row")
+    print(f"  {args.player_one} wins: {result.wins} ({result.wins / games:.1%})")
+    print(f"  draws: {result.draws} ({result.draws / games:.1%})")
+    print(f"  {args.player_two} wins: {result.losses} ({result.losses / games:.1%})")
+    print(f"  {result.games_per_second:.0f} games/s over {workers} worker(s), "
+          f"{result.seconds:.2f}s")
+
+    if result.profiler is not None:
+        print()
+        print(result.profiler.summary())
@@ -0,0 +1,600 @@
+"""
+Asyncio game server hosting many games in a single event loop. Clients speak
+line-delimited JSON: each request is one JSON object on its own line, with an
+``op`` and an optional ``id`` echoed back in the response. Operations:
+
+- ``{"op": "create", "width": 3, "height": 3, "k": 3}`` creates a game and
+  returns its ``game`` id. Sizes are limited to :data:`MAX_GRID_SIZE`.
+- ``{"op": "join", "game": ID, "letter": "X", "name": "John"}`` adds the
+  connection as a human player. Add ``"ai": "negamax"`` (and optionally
+  ``"options"``) to add an AI player instead. Only the options in
+  :data:`AI_OPTIONS` are accepted, within their bounds.
+- ``{"op": "move", "game": ID, "x": 0, "y": 0}`` places the connection's
+  letter. Any AI moves that follow are played before responding.
+- ``{"op": "state", "game": ID}`` returns the state of the game.
+- ``{"op": "close", "game": ID}`` ends the game. Only connections in the game
+  can close it.
+
+Responses have ``"ok": true`` and the result, or ``"ok": false`` and an
+``error``. Connections in a game also receive ``{"event": "move", ...}`` lines
+when another player moves. AI moves are computed on a process pool, so slow
+searches don't hold up other games.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing.util import Finalize
+
+from tictactoe import TicTacToe
+from tictactoe.board import Board
+from tictactoe.player import Player
+from tictactoe.registry import AI_PLAYERS
+from tictactoe.renderer.console import ConsoleRenderer
+from tictactoe.selfplay import WATCH_FPS
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+# Longest request line accepted, in bytes
+MAX_LINE_LENGTH = 1 << 16
+
+# Largest width, height or k a game can be created with, so a single request
+# can't tie up the event loop or send back a state bigger than a line
+MAX_GRID_SIZE = 32
+
+# Options clients can give each AI, as the type and the smallest and largest
+# value. Options that open files or start processes are left out, and the
+# bounds keep a single move from tying up a worker.
+AI_OPTIONS = {
+    "easy": {},
+    "medium": {},
+    "hard": {},
+    "negamax": {
+        "max_depth": (int, 1, 9),
+        "radius": (int, 1, MAX_GRID_SIZE),
+        "symmetry": (bool, False, True),
+    },
+    "iterative": {
+        "time_budget": (float, 0.0, 5.0),
+        "max_depth": (int, 1, MAX_GRID_SIZE * MAX_GRID_SIZE),
+        "radius": (int, 1, MAX_GRID_SIZE),
+        "symmetry": (bool, False, True),
+    },
+    "mcts": {
+        "playouts": (int, 1, 20000),
+        "exploration": (float, 0.0, 10.0),
+        "seed": (int, 0, 2 ** 32 - 1),
+    },
+    "table": {},
+    "tablebase": {},
+}
+
+# Most AI players kept by each worker process. The least recently used is
+# closed to make room for a new one.
+MAX_WORKER_PLAYERS = 64
+
+# AI players created in each worker process, reused between moves so they
+# keep any caches
+_worker_players = {}
+
+
+def _init_worker():
+    # Worker processes exit without running atexit handlers, so players are
+    # closed from a multiprocessing finalizer
+    Finalize(None, _close_worker_players, exitpriority=0)
+
+
+def _close_worker_players():
+    for player in _worker_players.values():
+        player.close()
+    _worker_players.clear()
+
+
+def _is_int(value) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _check_ai_options(ai: str, options) -> dict:
+    """
+    Checks the options a client gave for an AI against :data:`AI_OPTIONS`,
+    raising a :class:`~ClientError` for anything not allowed.
+
+    Arguments:
+        ai (str): Name of the AI, from :data:`AI_PLAYERS`.
+        options: Options from the request.
+
+    Returns:
+        dict
+    """
+
+    if not isinstance(options, dict):
+        raise ClientError("Options must be an object")
+
+    allowed = AI_OPTIONS.get(ai, {})
+    for name, value in options.items():
+        if name not in allowed:
+            raise ClientError(f"Unknown option for {ai}: {name}")
+
+        option_type, low, high = allowed[name]
+        if option_type is bool:
+            if not isinstance(value, bool):
+                raise ClientError(f"Option {name} must be true or false")
+            continue
+
+        if option_type is float:
+            valid = _is_int(value) or isinstance(value, float)
+            description = "a number"
+        else:
+            valid = _is_int(value)
+            description = "an integer"
+        if not valid or not low <= value <= high:
+            raise ClientError(f"Option {name} must be {description} from {low} to {high}")
+
+    return options
+
+
+def _get_ai_move(ai: str, options: str, player_number: int, letter: str, k: int,
+                 grid: Board) -> tuple[int]:
+    """
+    Gets an AI move, in a worker process.
+
+    Arguments:
+        ai (str): Name of the AI, from :data:`AI_PLAYERS`.
+        options (str): Options for the AI, as JSON.
+        player_number (int): Player 1 or 2, which some AIs base their
+            strategy on.
+        letter (str): Letter of the AI.
+        k (int): Number of letters in a row needed to win.
+        grid (:class:`~Board`): The grid.
+
+    Returns:
+        tuple[int]
+    """
+
+    key = (ai, options, player_number, letter, k)
+    player = _worker_players.pop(key, None)
+    if player is None:
+        if len(_worker_players) >= MAX_WORKER_PLAYERS:
+            _worker_players.pop(next(iter(_worker_players))).close()
+        player = AI_PLAYERS[ai](player_number, letter, ai, k=k, verbose=False,
+                                **json.loads(options))
+    # Kept in order of use, most recent last
+    _worker_players[key] = player
+
+    return player.get_move(grid)
+
+
+class RemotePlayer(Player):
+    """
+    Player whose moves arrive through the server rather than from
+    :meth:`get_move`.
+
+    Arguments:
+        ai (str): Name of the AI playing, or None for a human over the wire.
+        options (str): Options for the AI, as JSON.
+    """
+
+    def __init__(self, player: int, letter: str, name: str, ai: str = None, options: str = "{}"):
+        super().__init__(player, letter, name)
+
+        self.ai = ai
+        self.options = options
+        self.connection = None
+
+    def get_move(self, grid: Board) -> tuple[int]:
+        raise Exception("Remote players move through the server")
+
+
+class ClientError(Exception):
+    """
+    Raised for a request that can't be carried out, and sent back to the
+    client as an error response.
+    """
+
+    pass
+
+
+class Session:
+    """
+    A game hosted by the server, along with the connections playing in it.
+
+    Arguments:
+        game_id (int): Id of the game.
+        tic_tac_toe (:class:`~TicTacToe`): The game.
+    """
+
+    def __init__(self, game_id: int, tic_tac_toe: TicTacToe):
+        self.game_id = game_id
+        self.tic_tac_toe = tic_tac_toe
+        self.lock = asyncio.Lock()
+        self.connections = set()
+
+    def state(self) -> dict:
+        """
+        Returns the state of the game, to send to clients.
+
+        Returns:
+            dict
+        """
+
+        tic_tac_toe = self.tic_tac_toe
+        current_player = tic_tac_toe.current_player
+        winner = tic_tac_toe.winner
+
+        return {
+            "game": self.game_id,
+            "grid": [list(row) for row in tic_tac_toe.grid],
+            "turn": current_player.letter if current_player is not None else None,
+            "game_over": tic_tac_toe.game_over,
+            "winner": winner.letter if winner is not None else None,
+        }
+
+
+class GameServer:
+    """
+    Server hosting any number of games in one event loop.
+
+    Arguments:
+        workers (int): Number of worker processes for AI moves.
+        renderer (:class:`~ConsoleRenderer`): If given, the board of each
+            game is drawn after every move, to spectate the server.
+    """
+
+    def __init__(self, workers: int = None, renderer: ConsoleRenderer = None):
+        self._executor = ProcessPoolExecutor(workers or os.cpu_count() or 1,
+                                             initializer=_init_worker)
+        self._renderer = renderer
+        self._sessions = {}
+        self._game_ids = itertools.count(1)
+        self._server = None
+        self._handlers = set()
+
+        self._ops = {
+            "create": self._create,
+            "join": self._join,
+            "move": self._move,
+            "state": self._state,
+            "close": self._close,
+        }
+
+    @property
+    def port(self) -> int:
+        """
+        Returns the port the server is listening on.
+
+        Returns:
+            int
+        """
+
+        return self._server.sockets[0].getsockname()[1]
+
+    @property
+    def sessions(self) -> dict[int, Session]:
+        """
+        Returns the games being hosted, by id.
+
+        Returns:
+            dict[int, :class:`~Session`]
+        """
+
+        return self._sessions
+
+    async def start(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT):
+        """
+        Starts listening for connections. Use port 0 to pick a free port.
+
+        Arguments:
+            host (str): Host to listen on.
+            port (int): Port to listen on.
+        """
+
+        self._server = await asyncio.start_server(self._handle_connection, host, port,
+                                                  limit=MAX_LINE_LENGTH)
+
+    async def serve_forever(self):
+        """
+        Serves connections until cancelled.
+        """
+
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self):
+        """
+        Stops the server and shuts down the worker processes.
+        """
+
+        if self._server is not None:
+            self._server.close()
+            for handler in self._handlers:
+                handler.cancel()
+            await asyncio.gather(*self._handlers, return_exceptions=True)
+            await self._server.wait_closed()
+        self._executor.shutdown(cancel_futures=True)
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """
+        Handles requests from a connection until it closes.
+
+        Arguments:
+            reader (:class:`~asyncio.StreamReader`): Reader for the connection.
+            writer (:class:`~asyncio.StreamWriter`): Writer for the connection.
+        """
+
+        handler = asyncio.current_task()
+        self._handlers.add(handler)
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ValueError, ConnectionError):
+                    break
+                if not line:
+                    break
+
+                response = await self._handle_line(line, writer)
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+        except (ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            self._handlers.discard(handler)
+            self._disconnect(writer)
+            writer.close()
+
+    async def _handle_line(self, line: bytes, writer: asyncio.StreamWriter) -> dict:
+        """
+        Handles a single request line and returns the response.
+
+        Arguments:
+            line (bytes): The request line.
+            writer (:class:`~asyncio.StreamWriter`): Writer for the connection.
+
+        Returns:
+            dict
+        """
+
+        request_id = None
+        try:
+            try:
+                request = json.loads(line)
+            except ValueError:
+                raise ClientError("Request is not valid JSON")
+            if not isinstance(request, dict):
+                raise ClientError("Request must be a JSON object")
+
+            request_id = request.get("id")
+            op = self._ops.get(request.get("op"))
+            if op is None:
+                raise ClientError("Unknown op")
+
+            result = await op(request, writer)
+            response = {"ok": True, **result}
+        except ClientError as e:
+            response = {"ok": False, "error": str(e)}
+        except Exception:
+            # A bug handling one request shouldn't end the connection, and
+            # with it the connection's games
+            traceback.print_exc()
+            response = {"ok": False, "error": "Internal server error"}
+
+        if request_id is not None:
+            response["id"] = request_id
+        return response
+
+    async def _create(self, request: dict, writer: asyncio.StreamWriter) -> dict:
+        width, height, k = request.get("width", 3), request.get("height", 3), request.get("k")
+        for value in (width, height, k):
+            if value is not None and not _is_int(value):
+                raise ClientError("Width, height and k must be integers")
+            if value is not None and value > MAX_GRID_SIZE:
+                raise ClientError(f"Width, height and k must be at most {MAX_GRID_SIZE}")
+
+        try:
+            tic_tac_toe = TicTacToe(width, height, k)
+        except Exception as e:
+            raise ClientError(str(e))
+
+        # The game ends if its creator disconnects before anyone else joins
+        session = Session(next(self._game_ids), tic_tac_toe)
+        session.connections.add(writer)
+        self._sessions[session.game_id] = session
+        return session.state()
+
+    async def _join(self, request: dict, writer: asyncio.StreamWriter) -> dict:
+        session = self._get_session(request)
+        letter = request.get("letter")
+        if not isinstance(letter, str) or not letter:
+            raise ClientError("A letter is required")
+
+        ai = request.get("ai")
+        if ai is not None and (not isinstance(ai, str) or ai not in AI_PLAYERS):
+            raise ClientError("Unknown AI")
+        options = _check_ai_options(ai, request.get("options", {}))
+
+        async with session.lock:
+            try:
+                session.tic_tac_toe.add_player(
+                    RemotePlayer, letter, str(request.get("name", letter)),
+                    ai=ai, options=json.dumps(options, sort_keys=True))
+            except Exception as e:
+                raise ClientError(str(e))
+
+            player = session.tic_tac_toe.players[-1]
+            if ai is None:
+                player.connection = writer
+                session.connections.add(writer)
+
+            # The AI might be first to move
+            await self._play_ai_moves(session)
+            return session.state()
+
+    async def _move(self, request: dict, writer: asyncio.StreamWriter) -> dict:
+        session = self._get_session(request)
+
+        async with session.lock:
+            tic_tac_toe = session.tic_tac_toe
+            player = tic_tac_toe.current_player
+            if player is None:
+                raise ClientError("Waiting for players to join")
+            if tic_tac_toe.game_over:
+                raise ClientError("The game is over")
+            if player.connection is not writer:
+                raise ClientError("It is not your turn")
+
+            x, y = request.get("x"), request.get("y")
+            if not _is_int(x) or not _is_int(y):
+                raise ClientError("Move needs integer x and y")
+
+            self._place(session, player, x, y)
+            await self._play_ai_moves(session)
+            return session.state()
+
+    async def _state(self, request: dict, writer: asyncio.StreamWriter) -> dict:
+        return self._get_session(request).state()
+
+    async def _close(self, request: dict, writer: asyncio.StreamWriter) -> dict:
+        session = self._get_session(request)
+        if writer not in session.connections:
+            raise ClientError("Only a connection in the game can close it")
+
+        # Wait for any AI moves being played in the game to finish
+        async with session.lock:
+            self._sessions.pop(session.game_id, None)
+        return {"game": session.game_id}
+
+    def _get_session(self, request: dict) -> Session:
+        """
+        Gets the session for the game in the request.
+
+        Arguments:
+            request (dict): The request.
+
+        Returns:
+            :class:`~Session`
+        """
+
+        game_id = request.get("game")
+        if not _is_int(game_id):
+            raise ClientError("Game must be an integer id")
+
+        session = self._sessions.get(game_id)
+        if session is None:
+            raise ClientError("Unknown game")
+        return session
+
+    def _place(self, session: Session, player: RemotePlayer, x: int, y: int):
+        """
+        Places a move for the given player and notifies the other connections
+        in the game.
+
+        Arguments:
+            session (:class:`~Session`): The game.
+            player (:class:`~RemotePlayer`): Player moving.
+            x (int): X grid coordinate.
+            y (int): Y grid coordinate.
+        """
+
+        if not session.tic_tac_toe.place(x, y):
+            raise ClientError("Invalid move")
+
+        if self._renderer is not None:
+            self._renderer.draw(session.tic_tac_toe.grid,
+                                f"Game {session.game_id} ({len(self._sessions)} open)")
+
+        event = json.dumps({"event": "move", "game": session.game_id,
+                            "letter": player.letter, "x": x, "y": y}).encode() + b"\n"
+        for connection in session.connections:
+            if connection is not player.connection and not connection.is_closing():
+                connection.write(event)
+
+    async def _play_ai_moves(self, session: Session):
+        """
+        Plays moves for AI players until it is a human's turn or the game is
+        over. Must be called with the session lock held.
+
+        Arguments:
+            session (:class:`~Session`): The game.
+        """
+
+        tic_tac_toe = session.tic_tac_toe
+        loop = asyncio.get_running_loop()
+
+        while not tic_tac_toe.game_over:
+            player = tic_tac_toe.current_player
+            if player is None or player.ai is None:
+                return
+
+            try:
+                move = await loop.run_in_executor(
+                    self._executor, _get_ai_move, player.ai, player.options,
+                    tic_tac_toe.players.index(player) + 1, player.letter, tic_tac_toe.k,
+                    tic_tac_toe.grid)
+            except Exception as e:
+                raise ClientError(f"AI player failed: {e}")
+            if move is None:
+                raise ClientError("AI player could not find a move")
+            self._place(session, player, *move)
+
+    def _disconnect(self, writer: asyncio.StreamWriter):
+        """
+        Removes a closed connection from its games, ending any game left with
+        no connections.
+
+        Arguments:
+            writer (:class:`~asyncio.StreamWriter`): Writer for the connection.
+        """
+
+        for game_id, session in list(self._sessions.items()):
+            if writer in session.connections:
+                session.connections.discard(writer)
+                if not session.connections:
+                    del self._sessions[game_id]
+
+
+def add_parser(subparsers):
+    """
+    Adds the serve command to the command line parser.
+
+    Arguments:
+        subparsers: Subparsers of the main command line parser.
+    """
+
+    parser = subparsers.add_parser("serve", help="host games over the network",
+                                   description="Host games over line-delimited JSON.")
+    parser.add_argument("--host", default=DEFAULT_HOST, help=f"host (default: {DEFAULT_HOST})")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"port (default: {DEFAULT_PORT})")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="worker processes for AI moves (default: one per CPU)")
+    parser.add_argument("--watch", action="store_true",
+                        help="draw the board of each game in the console after every move")
+    parser.set_defaults(command=main)
+
+
+def main(args: argparse.Namespace):
+    """
+    Runs the serve command until interrupted.
+
+    Arguments:
+        args (:class:`~argparse.Namespace`): Parsed command line arguments.
+    """
+
+    async def serve():
+        renderer = ConsoleRenderer(max_fps=WATCH_FPS) if args.watch else None
+        server = GameServer(args.workers, renderer)
+        await server.start(args.host, args.port)
+        print(f"Serving on {args.host}:{server.port}")
+        try:
+            await server.serve_forever()
+        finally:
+            await server.close()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
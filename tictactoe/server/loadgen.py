@@ -0,0 +1,205 @@
+"""
+Load generator for the game server. Plays many concurrent sessions of a
+human-over-the-wire player against a server-side AI, picking random moves,
+and reports session throughput and move latency. Run with:
+
+    python -m tictactoe.server.loadgen [--sessions N] [--concurrency N] [--ai easy]
+
+Without --port, a server is started in the same process on a free port.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from tictactoe.server import DEFAULT_HOST
+from tictactoe.server import GameServer
+
+
+class Client:
+    """
+    Minimal client for the game server, matching responses to requests by id
+    and ignoring move events.
+
+    Arguments:
+        reader (:class:`~asyncio.StreamReader`): Reader for the connection.
+        writer (:class:`~asyncio.StreamWriter`): Writer for the connection.
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._reader = reader
+        self._writer = writer
+        self._next_id = 0
+
+    @classmethod
+    async def connect(cls, host: str, port: int) -> "Client":
+        reader, writer = await asyncio.open_connection(host, port)
+        return cls(reader, writer)
+
+    async def request(self, op: str, **kwargs) -> dict:
+        """
+        Sends a request and waits for its response.
+
+        Arguments:
+            op (str): Operation to request.
+            **kwargs: Fields of the request.
+
+        Returns:
+            dict
+        """
+
+        self._next_id += 1
+        request_id = self._next_id
+        self._writer.write(json.dumps({"op": op, "id": request_id, **kwargs}).encode() + b"\n")
+        await self._writer.drain()
+
+        while True:
+            line = await self._reader.readline()
+            if not line:
+                raise ConnectionError("Server closed the connection")
+            response = json.loads(line)
+            if response.get("id") == request_id:
+                return response
+
+    async def close(self):
+        self._writer.close()
+        await self._writer.wait_closed()
+
+
+async def play_session(host: str, port: int, ai: str, width: int, height: int, k: int,
+                       rng: random.Random, latencies: list[float]):
+    """
+    Plays one game against a server-side AI with random moves, recording the
+    latency of every move request.
+
+    Arguments:
+        host (str): Server host.
+        port (int): Server port.
+        ai (str): Name of the AI to play against.
+        width (int): Width of the grid.
+        height (int): Height of the grid.
+        k (int): Number of letters in a row needed to win.
+        rng (:class:`~random.Random`): Random number generator for moves.
+        latencies (list[float]): List to add move latencies to, in seconds.
+    """
+
+    client = await Client.connect(host, port)
+    try:
+        state = await client.request("create", width=width, height=height, k=k)
+        game = state["game"]
+        await client.request("join", game=game, letter="X", name="loadgen")
+        state = await client.request("join", game=game, letter="O", ai=ai)
+
+        while not state["game_over"]:
+            empty = [(x, y) for y, row in enumerate(state["grid"]) for x, cell in enumerate(row)
+                     if not cell]
+            x, y = rng.choice(empty)
+
+            start = time.perf_counter()
+            state = await client.request("move", game=game, x=x, y=y)
+            latencies.append(time.perf_counter() - start)
+            if not state["ok"]:
+                raise Exception(state["error"])
+
+        await client.request("close", game=game)
+    finally:
+        await client.close()
+
+
+async def run(host: str, port: int, sessions: int, concurrency: int, ai: str,
+              width: int, height: int, k: int, seed: int = None) -> dict:
+    """
+    Plays the given number of sessions, with up to the given number running
+    at once, and returns the throughput and latency figures.
+
+    Arguments:
+        host (str): Server host.
+        port (int): Server port.
+        sessions (int): Number of sessions to play.
+        concurrency (int): Number of sessions running at once.
+        ai (str): Name of the AI to play against.
+        width (int): Width of the grid.
+        height (int): Height of the grid.
+        k (int): Number of letters in a row needed to win.
+        seed (int): Seed for the random moves.
+
+    Returns:
+        dict
+    """
+
+    rng = random.Random(seed)
+    latencies = []
+    remaining = iter(range(sessions))
+
+    async def worker():
+        for _ in remaining:
+            await play_session(host, port, ai, width, height, k, rng, latencies)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(min(concurrency, sessions))))
+    seconds = time.perf_counter() - start
+
+    latencies.sort()
+
+    def percentile(pct):
+        if not latencies:
+            return 0.0
+        return latencies[min(int(pct / 100 * len(latencies)), len(latencies) - 1)]
+
+    return {
+        "sessions": sessions,
+        "moves": len(latencies),
+        "seconds": seconds,
+        "sessions_per_second": sessions / seconds,
+        "moves_per_second": len(latencies) / seconds,
+        "p50": percentile(50),
+        "p99": percentile(99),
+        "max": latencies[-1] if latencies else 0.0,
+    }
+
+
+async def _main(args: argparse.Namespace) -> dict:
+    server = None
+    port = args.port
+    if port is None:
+        server = GameServer(args.workers)
+        await server.start(args.host, 0)
+        port = server.port
+
+    try:
+        return await run(args.host, port, args.sessions, args.concurrency, args.ai,
+                         *args.size, seed=args.seed)
+    finally:
+        if server is not None:
+            await server.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m tictactoe.server.loadgen",
+                                     description="Generate load against the game server.")
+    parser.add_argument("--host", default=DEFAULT_HOST, help=f"server host (default: {DEFAULT_HOST})")
+    parser.add_argument("--port", type=int,
+                        help="server port (default: start a server in this process)")
+    parser.add_argument("--workers", type=int,
+                        help="worker processes for the in-process server (default: one per CPU)")
+    parser.add_argument("--sessions", type=int, default=1000, help="sessions to play (default: 1000)")
+    parser.add_argument("--concurrency", type=int, default=100,
+                        help="sessions running at once (default: 100)")
+    parser.add_argument("--ai", default="easy", help="AI to play against (default: easy)")
+    parser.add_argument("--size", type=int, nargs=3, default=[3, 3, 3],
+                        metavar=("WIDTH", "HEIGHT", "K"), help="grid shape (default: 3 3 3)")
+    parser.add_argument("--seed", type=int, help="seed for the random moves")
+    args = parser.parse_args()
+
+    results = asyncio.run(_main(args))
+    print(f"{results['sessions']} sessions, {results['moves']} moves in {results['seconds']:.2f}s")
+    print(f"  {results['sessions_per_second']:.0f} sessions/s, "
+          f"{results['moves_per_second']:.0f} moves/s")
+    print(f"  move latency p50 {results['p50'] * 1e3:.2f}ms, p99 {results['p99'] * 1e3:.2f}ms, "
+          f"max {results['max'] * 1e3:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,233 @@
+"""
+Symmetries of the grid, used to store positions once per equivalence class.
+A square grid has 8 symmetries (rotations and reflections), and any other
+grid has 4. Each symmetry is identified by its index into
+:func:`transforms`, with 0 always being the identity.
+
+:func:`canonicalize` keeps the two bitmasks apart. :func:`canonical_key`
+packs them into a single key and transforms it with byte lookup tables,
+which is quicker when many positions are canonicalized on one grid shape.
+"""
+
+from functools import lru_cache
+
+from tictactoe.bitboard import cell_index
+
+# Bits of a packed key transformed with a single table lookup
+_KEY_CHUNK_BITS = 8
+
+
+@lru_cache(maxsize=None)
+def transforms(width: int, height: int) -> tuple[tuple[int]]:
+    """
+    Returns the symmetries of the grid, each as a tuple mapping every bit
+    index to the bit index it is moved to.
+
+    Arguments:
+        width (int): Width of the grid.
+        height (int): Height of the grid.
+
+    Returns:
+        tuple[tuple[int]]
+    """
+
+    last_x, last_y = width - 1, height - 1
+    mappings = [
+        lambda x, y: (x, y),
+        lambda x, y: (last_x - x, y),
+        lambda x, y: (x, last_y - y),
+        lambda x, y: (last_x - x, last_y - y),
+    ]
+    if width == height:
+        mappings += [
+            lambda x, y: (y, x),
+            lambda x, y: (last_y - y, x),
+            lambda x, y: (y, last_x - x),
+            lambda x, y: (last_y - y, last_x - x),
+        ]
+
+    perms = []
+    for mapping in mappings:
+        perm = []
+        for y in range(height):
+            for x in range(width):
+                perm.append(cell_index(*mapping(x, y), width))
+        perms.append(tuple(perm))
+
+    return tuple(perms)
+
+
+@lru_cache(maxsize=None)
+def inverse_transforms(width: int, height: int) -> tuple[tuple[int]]:
+    """
+    Returns the inverse of each symmetry from :func:`transforms`, mapping a
+    transformed bit index back to the original one.
+
+    Arguments:
+        width (int): Width of the grid.
+        height (int): Height of the grid.
+
+    Returns:
+        tuple[tuple[int]]
+    """
+
+    inverses = []
+    for perm in transforms(width, height):
+        inverse = [0] * len(perm)
+        for idx, transformed_idx in enumerate(perm):
+            inverse[transformed_idx] = idx
+        inverses.append(tuple(inverse))
+
+    return tuple(inverses)
+
+
+def transform_board(board: int, perm: tuple[int]) -> int:
+    """
+    Applies a symmetry to a player bitmask.
+
+    Arguments:
+        board (int): Bitmask of the cells held by a player.
+        perm (tuple[int]): Symmetry from :func:`transforms`.
+
+    Returns:
+        int
+    """
+
+    result = 0
+    while board:
+        low = board & -board
+        result |= 1 << perm[low.bit_length() - 1]
+        board ^= low
+
+    return result
+
+
+def canonicalize(mine: int, theirs: int, width: int, height: int) -> tuple[int, int, int]:
+    """
+    Returns the representative of the given position among all its
+    symmetries, along with the index of the symmetry used to get it. Moves in
+    the representative can be mapped back with :func:`to_original`.
+
+    Arguments:
+        mine (int): Bitmask of the cells held by the side to move.
+        theirs (int): Bitmask of the cells held by the opponent.
+        width (int): Width of the grid.
+        height (int): Height of the grid.
+
+    Returns:
+        tuple[int]
+    """
+
+    best = (mine, theirs, 0)
+    for transform, perm in enumerate(transforms(width, height)):
+        if transform == 0:
+            continue
+        candidate = (transform_board(mine, perm), transform_board(theirs, perm), transform)
+        if candidate < best:
+            best = candidate
+
+    return best
+
+
+@lru_cache(maxsize=None)
+def _key_tables(width: int, height: int) -> tuple:
+    """
+    Returns lookup tables applying each symmetry from :func:`transforms` to a
+    packed key, a byte of the key at a time.
+
+    Arguments:
+        width (int): Width of the grid.
+        height (int): Height of the grid.
+
+    Returns:
+        tuple
+    """
+
+    num_cells = width * height
+    tables = []
+    for perm in transforms(width, height):
+        # The second player's bits are moved like the first player's
+        perm = perm + tuple(idx + num_cells for idx in perm)
+
+        chunks = []
+        for start in range(0, len(perm), _KEY_CHUNK_BITS):
+            bits = perm[start:start + _KEY_CHUNK_BITS]
+            table = []
+            for value in range(1 << len(bits)):
+                transformed = 0
+                for i, idx in enumerate(bits):
+                    if value >> i & 1:
+                        transformed |= 1 << idx
+                table.append(transformed)
+            chunks.append(tuple(table))
+        tables.append(tuple(chunks))
+
+    return tuple(tables)
+
+
+def canonical_key(mine: int, theirs: int, width: int, height: int) -> tuple[int, int]:
+    """
+    Returns the key of the representative of the given position among all
+    its symmetries, along with the index of the symmetry used to get it. The
+    key packs both bitmasks as ``mine | theirs << (width * height)`` and is
+    the smallest packed key under any symmetry. Moves in the representative
+    can be mapped back with :func:`to_original`.
+
+    Arguments:
+        mine (int): Bitmask of the cells held by the side to move.
+        theirs (int): Bitmask of the cells held by the opponent.
+        width (int): Width of the grid.
+        height (int): Height of the grid.
+
+    Returns:
+        tuple[int]
+    """
+
+    key = mine | theirs << (width * height)
+    best, best_transform = key, 0
+    for transform, chunks in enumerate(_key_tables(width, height)):
+        transformed = 0
+        rest = key
+        for table in chunks:
+            transformed |= table[rest & 0xFF]
+            rest >>= _KEY_CHUNK_BITS
+        if transformed < best:
+            best, best_transform = transformed, transform
+
+    return best, best_transform
+
+
+def to_canonical(idx: int, transform: int, width: int, height: int) -> int:
+    """
+    Maps a bit index in the original position to the canonical position.
+
+    Arguments:
+        idx (int): Bit index in the original position.
+        transform (int): Symmetry returned by :func:`canonicalize` or
+            :func:`canonical_key`.
+        width (int): Width of the grid.
+        height (int): Height of the grid.
+
+    Returns:
+        int
+    """
+
+    return transforms(width, height)[transform][idx]
+
+
+def to_original(idx: int, transform: int, width: int, height: int) -> int:
+    """
+    Maps a bit index in the canonical position back to the original position.
+
+    Arguments:
+        idx (int): Bit index in the canonical position.
+        transform (int): Symmetry returned by :func:`canonicalize` or
+            :func:`canonical_key`.
+        width (int): Width of the grid.
+        height (int): Height of the grid.
+
+    Returns:
+        int
+    """
+
+    return inverse_transforms(width, height)[transform][idx]
@@ -0,0 +1,507 @@
+"""
+Tablebases: the result and best move of every reachable position of a small
+m,n,k game, solved ahead of time so perfect play is a single lookup. Build
+one with:
+
+    python -m tictactoe tablebase [--size WIDTH HEIGHT K] [--workers N] [--output FILE]
+
+Positions are solved by retrograde analysis. Every move adds a letter, so the
+reachable positions split into layers by the number of letters on the grid,
+and each layer only leads to the next. The layers are found going forward
+from the empty grid, then solved backward starting from the last one: a
+position's result follows from the results of the positions its moves lead
+to, which are already known, and from the moves that end the game. Each layer
+is split into chunks solved across worker processes. Positions are stored once
+for all their rotations and reflections.
+
+A tablebase file has a header giving the grid it was built for and an index
+of blocks, followed by the blocks themselves. Each block holds a run of
+entries sorted by position key and is compressed with zlib, so a lookup
+binary searches the index, then decompresses and searches a single block.
+"""
+
+import argparse
+import bisect
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+from tictactoe.bitboard import full_mask
+from tictactoe.bitboard import win_masks
+from tictactoe.search import DRAW
+from tictactoe.search import LOSS
+from tictactoe.search import WIN
+from tictactoe.symmetry import canonical_key
+from tictactoe.symmetry import to_original
+
+MAGIC = b"TTTS"
+VERSION = 1
+
+# Default location of the tablebase, alongside this module
+DEFAULT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tablebase.bin")
+
+# Positions are keyed by both players' bitmasks packed into 64 bits, as
+# returned by canonical_key
+MAX_CELLS = 32
+
+# Entries hold the result in the top 2 bits and the number of moves left in
+# the game with perfect play in the rest
+DISTANCE_BITS = 6
+
+# Positions sent to a worker process at a time
+DEFAULT_CHUNK_SIZE = 10000
+
+# Entries in each compressed block
+BLOCK_SIZE = 1024
+
+# Decompressed blocks kept for repeated lookups
+MAX_CACHED_BLOCKS = 64
+
+# Magic, version, width, height, k, number of entries, entries per block and
+# number of blocks
+TABLEBASE_HEADER = struct.Struct("<4sBBBBIII")
+
+# Key of the first entry in the block, offset and compressed size
+BLOCK_INDEX = struct.Struct("<QQI")
+
+# Tablebases loaded so far, by path and modification time, shared by every
+# player
+_tablebases = {}
+
+
+@lru_cache(maxsize=None)
+def _cell_win_masks(width: int, height: int, k: int) -> tuple[tuple[int]]:
+    """
+    Returns the winning lines through each cell.
+
+    Arguments:
+        width (int): Width of the grid.
+        height (int): Height of the grid.
+        k (int): Number of letters in a row needed to win.
+
+    Returns:
+        tuple[tuple[int]]
+    """
+
+    masks = win_masks(width, height, k)
+    return tuple(tuple(mask for mask in masks if mask >> idx & 1)
+                 for idx in range(width * height))
+
+
+# Grid shape and the values of the next layer for each worker process, set by
+# _init_worker
+_worker_state = None
+
+
+def _init_worker(width: int, height: int, k: int, values: dict):
+    global _worker_state
+    _worker_state = (width, height, k, values)
+
+
+def _expand_chunk(keys: list[int]) -> set[int]:
+    """
+    Returns the keys of the positions reached by every move from the given
+    positions that doesn't end the game.
+
+    Arguments:
+        keys (list[int]): Keys of the positions.
+
+    Returns:
+        set[int]
+    """
+
+    width, height, k, _ = _worker_state
+    num_cells = width * height
+    mask = full_mask(width, height)
+    lines = _cell_win_masks(width, height, k)
+
+    children = set()
+    for key in keys:
+        mine, theirs = key & mask, key >> num_cells
+        occupied = mine | theirs
+        if occupied.bit_count() == num_cells - 1:
+            # Every move fills the grid
+            continue
+
+        empty = mask & ~occupied
+        while empty:
+            bit = empty & -empty
+            empty ^= bit
+            moved = mine | bit
+            if any(moved & line == line for line in lines[bit.bit_length() - 1]):
+                continue
+            children.add(canonical_key(theirs, moved, width, height)[0])
+
+    return children
+
+
+def _solve_chunk(keys: list[int]) -> list[tuple[int, int, int]]:
+    """
+    Solves the given positions from the values of the next layer, returning
+    the key, value and best move of each one.
+
+    Arguments:
+        keys (list[int]): Keys of the positions.
+
+    Returns:
+        list[tuple[int]]
+    """
+
+    width, height, k, values = _worker_state
+    num_cells = width * height
+    mask = full_mask(width, height)
+    lines = _cell_win_masks(width, height, k)
+    distance_mask = (1 << DISTANCE_BITS) - 1
+
+    solved = []
+    for key in keys:
+        mine, theirs = key & mask, key >> num_cells
+        fills = (mine | theirs).bit_count() == num_cells - 1
+
+        best_move = None
+        best_rank = None
+        best_value = None
+        empty = mask & ~(mine | theirs)
+        while empty:
+            bit = empty & -empty
+            empty ^= bit
+            idx = bit.bit_length() - 1
+            moved = mine | bit
+
+            if any(moved & line == line for line in lines[idx]):
+                result, distance = WIN, 1
+            elif fills:
+                result, distance = DRAW, 1
+            else:
+                child = values[canonical_key(theirs, moved, width, height)[0]]
+                # The opponent's win is our loss, and the other way round
+                result = WIN + LOSS - (child >> DISTANCE_BITS)
+                distance = (child & distance_mask) + 1
+
+            # Win as soon as possible, and put off a draw or loss for as
+            # long as possible
+            rank = (result, -distance if result == WIN else distance)
+            if best_rank is None or rank > best_rank:
+                best_move, best_rank = idx, rank
+                best_value = result << DISTANCE_BITS | distance
+                if result == WIN and distance == 1:
+                    break
+
+        solved.append((key, best_value, best_move))
+
+    return solved
+
+
+def _run_chunks(func, keys: list[int], workers: int, chunk_size: int, initargs: tuple):
+    """
+    Runs a function over chunks of keys across worker processes, yielding
+    the result for each chunk in order.
+
+    Arguments:
+        func: :func:`_expand_chunk` or :func:`_solve_chunk`.
+        keys (list[int]): Keys to split into chunks.
+        workers (int): Number of worker processes. With 1, chunks are run in
+            the calling process.
+        chunk_size (int): Number of keys in each chunk.
+        initargs (tuple): Arguments for :func:`_init_worker`.
+
+    Returns:
+        Iterator
+    """
+
+    chunks = [keys[i:i + chunk_size] for i in range(0, len(keys), chunk_size)]
+
+    if workers == 1 or len(chunks) == 1:
+        _init_worker(*initargs)
+        for chunk in chunks:
+            yield func(chunk)
+        return
+
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=initargs) as executor:
+        yield from executor.map(func, chunks)
+
+
+def build_tablebase(width: int, height: int, k: int = None, path: str = DEFAULT_PATH,
+                    workers: int = 1, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                    verbose: bool = False) -> int:
+    """
+    Solves every reachable position of the given game that isn't over and
+    writes the tablebase to the given path. Returns the number of entries
+    written.
+
+    Arguments:
+        width (int): Width of the grid.
+        height (int): Height of the grid.
+        k (int): Number of letters in a row needed to win. Defaults to the
+            smaller of the width and height.
+        path (str): Path to write the tablebase to.
+        workers (int): Number of worker processes.
+        chunk_size (int): Number of positions sent to a worker at a time.
+        verbose (bool): Whether to print the size of each layer.
+
+    Returns:
+        int
+    """
+
+    if k is None:
+        k = min(width, height)
+    if width * height > MAX_CELLS:
+        raise Exception(f"Tablebases only cover grids of up to {MAX_CELLS} cells")
+    if not 1 <= k <= max(width, height):
+        raise Exception("Win length does not fit on the grid")
+
+    # Find the layers going forward from the empty grid
+    layers = [[0]]
+    while True:
+        children = set()
+        for chunk_children in _run_chunks(_expand_chunk, layers[-1], workers, chunk_size,
+                                          (width, height, k, None)):
+            children |= chunk_children
+        if not children:
+            break
+        layers.append(sorted(children))
+        if verbose:
+            print(f"Layer {len(layers) - 1}: {len(children)} positions", file=sys.stderr)
+
+    # Solve them going backward from the last layer
+    entries = []
+    values = {}
+    for depth in range(len(layers) - 1, -1, -1):
+        solved = []
+        for chunk in _run_chunks(_solve_chunk, layers[depth], workers, chunk_size,
+                                 (width, height, k, values)):
+            solved += chunk
+        values = {key: value for key, value, _ in solved}
+        entries += solved
+        if verbose:
+            print(f"Solved layer {depth}", file=sys.stderr)
+
+    entries.sort()
+    _write_tablebase(path, width, height, k, entries)
+    return len(entries)
+
+
+def _write_tablebase(path: str, width: int, height: int, k: int,
+                     entries: list[tuple[int, int, int]]):
+    """
+    Writes sorted entries to a tablebase file in compressed blocks.
+
+    Arguments:
+        path (str): Path to write the tablebase to.
+        width (int): Width of the grid.
+        height (int): Height of the grid.
+        k (int): Number of letters in a row needed to win.
+        entries (list[tuple[int]]): Key, value and best move of each
+            position, sorted by key.
+    """
+
+    blocks = []
+    for start in range(0, len(entries), BLOCK_SIZE):
+        block = entries[start:start + BLOCK_SIZE]
+        keys = array("Q", (key for key, _, _ in block))
+        if sys.byteorder == "big":
+            keys.byteswap()
+        data = keys.tobytes() + bytes(value for _, value, _ in block) + \
+            bytes(move for _, _, move in block)
+        blocks.append((block[0][0], zlib.compress(data, 9)))
+
+    with open(path, "wb") as f:
+        f.write(TABLEBASE_HEADER.pack(MAGIC, VERSION, width, height, k, len(entries), BLOCK_SIZE,
+                                      len(blocks)))
+
+        offset = TABLEBASE_HEADER.size + BLOCK_INDEX.size * len(blocks)
+        for first_key, data in blocks:
+            f.write(BLOCK_INDEX.pack(first_key, offset, len(data)))
+            offset += len(data)
+
+        for _, data in blocks:
+            f.write(data)
+
+
+def load_tablebase(path: str) -> "Tablebase":
+    """
+    Loads the tablebase at the given path, reusing it if it has already been
+    loaded and hasn't been rebuilt since.
+
+    Arguments:
+        path (str): Path of the tablebase.
+
+    Returns:
+        :class:`~Tablebase`
+    """
+
+    # A missing tablebase is reported by Tablebase
+    try:
+        key = (path, os.stat(path).st_mtime_ns)
+    except OSError:
+        key = (path, None)
+
+    tablebase = _tablebases.get(key)
+    if tablebase is None:
+        tablebase = Tablebase(path)
+        _tablebases[key] = tablebase
+    return tablebase
+
+
+class Tablebase:
+    """
+    A tablebase, read through a memory map. Blocks are decompressed when
+    first needed and a few are kept for later lookups.
+
+    Arguments:
+        path (str): Path of the tablebase.
+    """
+
+    def __init__(self, path: str):
+        if not os.path.exists(path):
+            raise Exception("Tablebase not found, build it with python -m tictactoe tablebase")
+
+        with open(path, "rb") as f:
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, width, height, k, count, block_size, num_blocks = \
+            TABLEBASE_HEADER.unpack_from(self._data)
+        if magic != MAGIC:
+            raise Exception("Not a tablebase")
+        if version != VERSION:
+            raise Exception("Tablebase was written by a different version")
+
+        self.width = width
+        self.height = height
+        self.k = k
+        self._count = count
+        self._block_size = block_size
+
+        self._first_keys = []
+        self._blocks = []
+        for i in range(num_blocks):
+            first_key, offset, size = BLOCK_INDEX.unpack_from(
+                self._data, TABLEBASE_HEADER.size + i * BLOCK_INDEX.size)
+            self._first_keys.append(first_key)
+            self._blocks.append((offset, size))
+
+        self._cache = {}
+
+    def __len__(self) -> int:
+        return self._count
+
+    def probe(self, mine: int, theirs: int) -> tuple[int, int, int] | None:
+        """
+        Returns the result for the side to move, the number of moves left in
+        the game with perfect play and the bit index of the best move, or
+        None if the position can't be reached or the game is over.
+
+        Arguments:
+            mine (int): Bitmask of the cells held by the side to move.
+            theirs (int): Bitmask of the cells held by the opponent.
+
+        Returns:
+            tuple[int] or None
+        """
+
+        key, transform = canonical_key(mine, theirs, self.width, self.height)
+
+        block = bisect.bisect_right(self._first_keys, key) - 1
+        if block < 0:
+            return None
+
+        keys, values, moves = self._get_block(block)
+        i = bisect.bisect_left(keys, key)
+        if i == len(keys) or keys[i] != key:
+            return None
+
+        value = values[i]
+        return (value >> DISTANCE_BITS, value & ((1 << DISTANCE_BITS) - 1),
+                to_original(moves[i], transform, self.width, self.height))
+
+    def get_move(self, mine: int, theirs: int) -> int | None:
+        """
+        Returns the bit index of the best move for the side to move, or None
+        if the position isn't in the tablebase.
+
+        Arguments:
+            mine (int): Bitmask of the cells held by the side to move.
+            theirs (int): Bitmask of the cells held by the opponent.
+
+        Returns:
+            int or None
+        """
+
+        entry = self.probe(mine, theirs)
+        if entry is None:
+            return None
+        return entry[2]
+
+    def close(self):
+        self._data.close()
+
+    def _get_block(self, block: int) -> tuple[array, bytes, bytes]:
+        """
+        Returns the keys, values and moves of a block, decompressing it if it
+        isn't cached.
+
+        Arguments:
+            block (int): Index of the block.
+
+        Returns:
+            tuple
+        """
+
+        cached = self._cache.get(block)
+        if cached is not None:
+            return cached
+
+        offset, size = self._blocks[block]
+        data = zlib.decompress(self._data[offset:offset + size])
+        count = len(data) // 10
+
+        keys = array("Q")
+        keys.frombytes(data[:count * 8])
+        if sys.byteorder == "big":
+            keys.byteswap()
+        cached = (keys, data[count * 8:count * 9], data[count * 9:])
+
+        if len(self._cache) >= MAX_CACHED_BLOCKS:
+            del self._cache[next(iter(self._cache))]
+        self._cache[block] = cached
+        return cached
+
+
+def add_parser(subparsers):
+    """
+    Adds the tablebase command to the command line parser.
+
+    Arguments:
+        subparsers: Subparsers of the main command line parser.
+    """
+
+    parser = subparsers.add_parser("tablebase", help="solve every position of a small grid",
+                                   description="Build a tablebase by retrograde analysis.")
+    parser.add_argument("--size", type=int, nargs=3, default=[4, 4, 4],
+                        metavar=("WIDTH", "HEIGHT", "K"), help="grid shape (default: 4 4 4)")
+    parser.add_argument("--output", default=DEFAULT_PATH,
+                        help=f"file to write the tablebase to (default: {DEFAULT_PATH})")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="number of worker processes (default: one per CPU)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f"positions sent to a worker at a time (default: {DEFAULT_CHUNK_SIZE})")
+    parser.set_defaults(command=main)
+
+
+def main(args: argparse.Namespace):
+    """
+    Runs the tablebase command.
+
+    Arguments:
+        args (:class:`~argparse.Namespace`): Parsed command line arguments.
+    """
+
+    width, height, k = args.size
+    entries = build_tablebase(width, height, k, args.output, args.workers, args.chunk_size,
+                              verbose=True)
+    print(f"Wrote {entries} positions to {args.output} ({os.path.getsize(args.output)} bytes)")
@@ -0,0 +1,56 @@
+"""
+Zobrist hashing of positions. Every (player, cell) pair is given a random
+64-bit key, and the hash of a position is the XOR of the keys of every letter
+on the grid, so it can be updated with a single XOR when a letter is placed or
+removed. The keys come from a fixed seed, so hashes are the same in every
+process.
+"""
+
+import random
+from functools import lru_cache
+
+SEED = 0x7C7AC70E
+
+
+@lru_cache(maxsize=None)
+def zobrist_keys(num_cells: int, num_players: int = 2) -> tuple[tuple[int]]:
+    """
+    Returns the random keys for each player and cell.
+
+    Arguments:
+        num_cells (int): Number of cells in the grid.
+        num_players (int): Number of players.
+
+    Returns:
+        tuple[tuple[int]]
+    """
+
+    rng = random.Random(SEED)
+    return tuple(
+        tuple(rng.getrandbits(64) for _ in range(num_cells))
+        for _ in range(num_players)
+    )
+
+
+def zobrist_hash(boards: list[int], num_cells: int) -> int:
+    """
+    Computes the hash of a position from scratch.
+
+    Arguments:
+        boards (list[int]): Bitmask of the cells held by each player.
+        num_cells (int): Number of cells in the grid.
+
+    Returns:
+        int
+    """
+
+    keys = zobrist_keys(num_cells, len(boards))
+
+    result = 0
+    for player_keys, board in zip(keys, boards):
+        while board:
+            low = board & -board
+            result ^= player_keys[low.bit_length() - 1]
+            board ^= low
+
+    return result